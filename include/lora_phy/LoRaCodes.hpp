@@ -2,6 +2,11 @@
 
 #include <cstddef>
 #include <cstdint>
+#include <cstring>
+
+#ifdef __SSE2__
+#include <emmintrin.h>
+#endif
 
 /*
  * Miscellaneous encoding helpers and checksum routines used by the LoRa PHY.
@@ -370,6 +375,99 @@ static inline unsigned char encodeParity64(const unsigned char b) {
 	return ((x & 1) << 4) | ((y & 1) << 5) | (b & 0xf);
 }
 
+/***********************************************************************
+ * Table driven codeword helpers.
+ * RDD selects the code used for each 4 bit word: 0 = none, 1 = parity 5/4,
+ * 2 = parity 6/4, 3 = Hamming 7/4, 4 = Hamming 8/4, matching the functions
+ * above.  The tables are generated at compile time from the same parity
+ * equations.  All codes are linear, so the syndrome of a codeword is the XOR
+ * of the syndromes of its low and high nibbles; the 16 entry syndrome,
+ * correction and failure tables are laid out for byte shuffle lookups.
+ **********************************************************************/
+#define LORA_LUT4(f, r, i) f(r, (i)), f(r, (i) + 1), f(r, (i) + 2), f(r, (i) + 3)
+#define LORA_LUT16(f, r, i) LORA_LUT4(f, r, (i)), LORA_LUT4(f, r, (i) + 4), \
+    LORA_LUT4(f, r, (i) + 8), LORA_LUT4(f, r, (i) + 12)
+#define LORA_LUT64(f, r, i) LORA_LUT16(f, r, (i)), LORA_LUT16(f, r, (i) + 16), \
+    LORA_LUT16(f, r, (i) + 32), LORA_LUT16(f, r, (i) + 48)
+#define LORA_LUT256(f, r, i) LORA_LUT64(f, r, (i)), LORA_LUT64(f, r, (i) + 64), \
+    LORA_LUT64(f, r, (i) + 128), LORA_LUT64(f, r, (i) + 192)
+#define LORA_LUT_RDD(n, f) {LORA_LUT##n(f, 0, 0)}, {LORA_LUT##n(f, 1, 0)}, \
+    {LORA_LUT##n(f, 2, 0)}, {LORA_LUT##n(f, 3, 0)}, {LORA_LUT##n(f, 4, 0)}
+
+#define FEC_DECODE_ERROR 0x10 ///< flag in fecDecodeTable: parity error seen
+#define FEC_DECODE_BAD   0x20 ///< flag in fecDecodeTable: not correctable
+
+static constexpr unsigned fecBit(unsigned x, unsigned n) { return (x >> n) & 0x1; }
+
+static constexpr unsigned char fecEncodeEntry(unsigned rdd, unsigned x)
+{
+    return static_cast<unsigned char>((x & 0xf) |
+        (rdd == 1 ? (fecBit(x, 0) ^ fecBit(x, 1) ^ fecBit(x, 2) ^ fecBit(x, 3)) << 4 :
+         rdd >= 2 ? ((fecBit(x, 0) ^ fecBit(x, 1) ^ fecBit(x, 2)) << 4) |
+                    ((fecBit(x, 1) ^ fecBit(x, 2) ^ fecBit(x, 3)) << 5) |
+                    (rdd >= 3 ? (fecBit(x, 0) ^ fecBit(x, 1) ^ fecBit(x, 3)) << 6 : 0) |
+                    (rdd >= 4 ? (fecBit(x, 0) ^ fecBit(x, 2) ^ fecBit(x, 3)) << 7 : 0) :
+         0));
+}
+
+static constexpr unsigned char fecSyndrome(unsigned rdd, unsigned b)
+{
+    return static_cast<unsigned char>(
+        rdd == 1 ? fecBit(b, 0) ^ fecBit(b, 1) ^ fecBit(b, 2) ^ fecBit(b, 3) ^ fecBit(b, 4) :
+        rdd >= 2 ? (fecBit(b, 0) ^ fecBit(b, 1) ^ fecBit(b, 2) ^ fecBit(b, 4)) |
+                   ((fecBit(b, 1) ^ fecBit(b, 2) ^ fecBit(b, 3) ^ fecBit(b, 5)) << 1) |
+                   (rdd >= 3 ? (fecBit(b, 0) ^ fecBit(b, 1) ^ fecBit(b, 3) ^ fecBit(b, 6)) << 2 : 0) |
+                   (rdd >= 4 ? (fecBit(b, 0) ^ fecBit(b, 2) ^ fecBit(b, 3) ^ fecBit(b, 7)) << 3 : 0) :
+        0);
+}
+
+// Data bits to flip for a syndrome (single bit errors only).
+static constexpr unsigned char fecCorrection(unsigned rdd, unsigned syn)
+{
+    return static_cast<unsigned char>(
+        rdd == 4 ? (syn == 0xD ? 1 : syn == 0x7 ? 2 : syn == 0xB ? 4 : syn == 0xE ? 8 : 0) :
+        rdd == 3 ? (syn == 0x5 ? 1 : syn == 0x7 ? 2 : syn == 0x3 ? 4 : syn == 0x6 ? 8 : 0) :
+        0);
+}
+
+// True when a syndrome cannot be explained by a single bit error.  Hamming 7/4
+// corrects every syndrome; the parity codes only detect.
+static constexpr bool fecUncorrectable(unsigned rdd, unsigned syn)
+{
+    return syn != 0 && (rdd == 1 || rdd == 2 ||
+                        (rdd == 4 && fecCorrection(4, syn) == 0 &&
+                         syn != 0x1 && syn != 0x2 && syn != 0x4 && syn != 0x8));
+}
+
+static constexpr unsigned char fecDecodeEntry(unsigned rdd, unsigned b)
+{
+    return static_cast<unsigned char>(
+        ((b ^ fecCorrection(rdd, fecSyndrome(rdd, b))) & 0xf) |
+        (fecSyndrome(rdd, b) ? FEC_DECODE_ERROR : 0) |
+        (fecUncorrectable(rdd, fecSyndrome(rdd, b)) ? FEC_DECODE_BAD : 0));
+}
+
+static constexpr unsigned char fecSyndromeHiEntry(unsigned rdd, unsigned x)
+{
+    return fecSyndrome(rdd, x << 4);
+}
+
+static constexpr unsigned char fecBadEntry(unsigned rdd, unsigned syn)
+{
+    return fecUncorrectable(rdd, syn) ? 0xff : 0x00;
+}
+
+/// Codeword for each 4 bit word, indexed [RDD][nibble].
+static constexpr unsigned char fecEncodeTable[5][16] = {LORA_LUT_RDD(16, fecEncodeEntry)};
+/// Corrected nibble plus FEC_DECODE_* flags, indexed [RDD][codeword].
+static constexpr unsigned char fecDecodeTable[5][256] = {LORA_LUT_RDD(256, fecDecodeEntry)};
+/// Syndrome contributed by the low / high nibble of a codeword.
+static constexpr unsigned char fecSyndromeLoTable[5][16] = {LORA_LUT_RDD(16, fecSyndrome)};
+static constexpr unsigned char fecSyndromeHiTable[5][16] = {LORA_LUT_RDD(16, fecSyndromeHiEntry)};
+/// Data bits to flip and 0xff for uncorrectable, indexed [RDD][syndrome].
+static constexpr unsigned char fecCorrectionTable[5][16] = {LORA_LUT_RDD(16, fecCorrection)};
+static constexpr unsigned char fecBadTable[5][16] = {LORA_LUT_RDD(16, fecBadEntry)};
+
 /***********************************************************************
  * Diagonal interleaver + deinterleaver
  **********************************************************************/
@@ -430,3 +528,90 @@ static inline void diagonalDeterleaveSx2(const uint16_t *symbols, const size_t n
                 }
         }
 }
+
+/***********************************************************************
+ * Bit-matrix transpose interleaver + deinterleaver.
+ * A block of PPM codewords is a PPM x (4 + RDD) bit matrix.  Transposing it
+ * gives one word per codeword bit position, and the diagonal of the Sx
+ * interleaver is a rotation of that word by the bit position within PPM
+ * bits.  Produces exactly the output of diagonalInterleaveSx() and
+ * diagonalDeterleaveSx(), without the per bit loop and modulo.
+ **********************************************************************/
+
+// Transpose an 8x8 bit matrix held with row i in byte i and column j in bit j.
+static inline uint64_t transpose8x8(uint64_t x)
+{
+    uint64_t t;
+    t = (x ^ (x >> 7)) & 0x00AA00AA00AA00AAull;
+    x = x ^ t ^ (t << 7);
+    t = (x ^ (x >> 14)) & 0x0000CCCC0000CCCCull;
+    x = x ^ t ^ (t << 14);
+    t = (x ^ (x >> 28)) & 0x00000000F0F0F0F0ull;
+    x = x ^ t ^ (t << 28);
+    return x;
+}
+
+static inline uint16_t rotateRightPPM(uint16_t x, size_t r, size_t PPM)
+{
+    const uint32_t mask = (1u << PPM) - 1;
+    const uint32_t v = x & mask;
+    return static_cast<uint16_t>(r ? ((v >> r) | (v << (PPM - r))) & mask : v);
+}
+
+static inline void diagonalInterleaveSxFast(const uint8_t *codewords, const size_t numCodewords,
+                                            uint16_t *symbols, const size_t PPM, const size_t RDD)
+{
+        const size_t nb = 4 + RDD;
+        for (size_t blk = 0; blk < numCodewords / PPM; ++blk) {
+                uint8_t rows[16] = {};
+                std::memcpy(rows, codewords + blk * PPM, PPM);
+                uint16_t *out = symbols + blk * nb;
+#ifdef __SSE2__
+                // Shifting each 64-bit lane left by 7 - bit moves bit 'bit'
+                // of every byte into its sign bit, so one movemask collects a
+                // whole transposed row.
+                const __m128i x = _mm_loadu_si128(reinterpret_cast<const __m128i *>(rows));
+                for (size_t bit = 0; bit < nb; ++bit) {
+                        const __m128i y = _mm_sll_epi64(x, _mm_cvtsi32_si128(static_cast<int>(7 - bit)));
+                        const uint16_t t = static_cast<uint16_t>(_mm_movemask_epi8(y));
+                        out[bit] = rotateRightPPM(t, bit % PPM, PPM);
+                }
+#else
+                uint64_t lo = 0, hi = 0;
+                for (size_t i = 0; i < 8; ++i) {
+                        lo |= static_cast<uint64_t>(rows[i]) << (8 * i);
+                        hi |= static_cast<uint64_t>(rows[i + 8]) << (8 * i);
+                }
+                lo = transpose8x8(lo);
+                hi = transpose8x8(hi);
+                for (size_t bit = 0; bit < nb; ++bit) {
+                        const uint16_t t = static_cast<uint16_t>(((lo >> (8 * bit)) & 0xff) |
+                                                                 (((hi >> (8 * bit)) & 0xff) << 8));
+                        out[bit] = rotateRightPPM(t, bit % PPM, PPM);
+                }
+#endif
+        }
+}
+
+static inline void diagonalDeterleaveSxFast(const uint16_t *symbols, const size_t numSymbols,
+                                            uint8_t *codewords, const size_t PPM, const size_t RDD)
+{
+        // Unlike diagonalDeterleaveSx() the codewords are overwritten, so the
+        // output does not need to be zero-initialised.
+        const size_t nb = 4 + RDD;
+        for (size_t blk = 0; blk < numSymbols / nb; ++blk) {
+                const uint16_t *in = symbols + blk * nb;
+                uint64_t lo = 0, hi = 0;
+                for (size_t bit = 0; bit < nb; ++bit) {
+                        const size_t r = bit % PPM;
+                        const uint16_t t = rotateRightPPM(in[bit], r ? PPM - r : 0, PPM);
+                        lo |= static_cast<uint64_t>(t & 0xff) << (8 * bit);
+                        hi |= static_cast<uint64_t>(t >> 8) << (8 * bit);
+                }
+                lo = transpose8x8(lo);
+                hi = transpose8x8(hi);
+                uint8_t *out = codewords + blk * PPM;
+                for (size_t cw = 0; cw < PPM; ++cw)
+                        out[cw] = static_cast<uint8_t>(cw < 8 ? lo >> (8 * cw) : hi >> (8 * (cw - 8)));
+        }
+}
@@ -6,6 +6,10 @@
 #include <complex>
 #include <lora_phy/kissfft.hh>
 
+#ifdef __SSE2__
+#include <emmintrin.h>
+#endif
+
 /**
  * Lightweight FFT based detector.  The caller supplies the FFT input/output
  * buffers and the kissfft instance; the class does not allocate or free memory
@@ -40,22 +44,23 @@ public:
     {
         if (fftOutput == nullptr) fftOutput = fft_out;
         _fft.transform(fft_in, fftOutput);
+        return detectBins(fftOutput, power, powerAvg, fIndex);
+    }
+
+    //! select the SSE2 peak scan (float only) instead of the scalar loop
+    void setSimd(const bool simd)
+    {
+        _simd = simd;
+    }
+
+    //! argmax(abs(bins)) over an already transformed (e.g. combined) spectrum
+    size_t detectBins(const std::complex<Type> *fftOutput, Type &power, Type &powerAvg, Type &fIndex)
+    {
         size_t maxIndex = 0;
         Type maxValue = 0;
         double total = 0;
-        for (size_t i = 0; i < N; i++)
-        {
-            auto bin = fftOutput[i];
-            auto re = bin.real();
-            auto im = bin.imag();
-            auto mag2 = re*re + im*im;
-            total += mag2;
-            if (mag2 > maxValue)
-            {
-                maxIndex = i;
-                maxValue = mag2;
-            }
-        }
+        if (_simd) scanSimd(fftOutput, N, maxIndex, maxValue, total);
+        else scan(fftOutput, N, maxIndex, maxValue, total);
 
         const auto noise = std::sqrt(Type(total - maxValue));
         const auto fundamental = std::sqrt(maxValue);
@@ -74,7 +79,79 @@ public:
     }
 
 private:
+    //! first bin with the largest power and the total power
+    static void scan(const std::complex<Type> *x, const size_t N, size_t &maxIndex, Type &maxValue, double &total)
+    {
+        for (size_t i = 0; i < N; i++)
+        {
+            auto re = x[i].real();
+            auto im = x[i].imag();
+            auto mag2 = re*re + im*im;
+            total += mag2;
+            if (mag2 > maxValue)
+            {
+                maxIndex = i;
+                maxValue = mag2;
+            }
+        }
+    }
+
+    template <typename T>
+    static void scanSimd(const std::complex<T> *x, const size_t N, size_t &maxIndex, T &maxValue, double &total)
+    {
+        scan(x, N, maxIndex, maxValue, total);
+    }
+
+    //! four bins per step; each lane keeps its first maximum and the lanes
+    //! are merged lowest index first, so the result matches scan()
+    static void scanSimd(const std::complex<float> *x, const size_t N, size_t &maxIndex, float &maxValue, double &total)
+    {
+#ifdef __SSE2__
+        if (N >= 4 && N % 4 == 0)
+        {
+            const float *f = reinterpret_cast<const float *>(x);
+            __m128 best = _mm_setzero_ps();
+            __m128i bestIdx = _mm_setzero_si128();
+            __m128i idx = _mm_set_epi32(3, 2, 1, 0);
+            const __m128i four = _mm_set1_epi32(4);
+            __m128 sum = _mm_setzero_ps();
+            for (size_t i = 0; i < N; i += 4, idx = _mm_add_epi32(idx, four))
+            {
+                __m128 a = _mm_loadu_ps(f + 2*i);
+                __m128 b = _mm_loadu_ps(f + 2*i + 4);
+                a = _mm_mul_ps(a, a);
+                b = _mm_mul_ps(b, b);
+                const __m128 mag2 = _mm_add_ps(_mm_shuffle_ps(a, b, _MM_SHUFFLE(2, 0, 2, 0)),
+                                               _mm_shuffle_ps(a, b, _MM_SHUFFLE(3, 1, 3, 1)));
+                sum = _mm_add_ps(sum, mag2);
+                const __m128 gt = _mm_cmpgt_ps(mag2, best);
+                best = _mm_or_ps(_mm_and_ps(gt, mag2), _mm_andnot_ps(gt, best));
+                const __m128i gti = _mm_castps_si128(gt);
+                bestIdx = _mm_or_si128(_mm_and_si128(gti, idx), _mm_andnot_si128(gti, bestIdx));
+            }
+            float lanes[4], sums[4];
+            int32_t lanesIdx[4];
+            _mm_storeu_ps(lanes, best);
+            _mm_storeu_ps(sums, sum);
+            _mm_storeu_si128(reinterpret_cast<__m128i *>(lanesIdx), bestIdx);
+            for (int l = 0; l < 4; l++)
+            {
+                total += sums[l];
+                const size_t li = static_cast<size_t>(lanesIdx[l]);
+                if (lanes[l] > maxValue || (lanes[l] == maxValue && lanes[l] > 0 && li < maxIndex))
+                {
+                    maxValue = lanes[l];
+                    maxIndex = li;
+                }
+            }
+            return;
+        }
+#endif
+        scan(x, N, maxIndex, maxValue, total);
+    }
+
     const size_t N;
+    bool _simd{false};
     Type _powerScale;
     std::complex<Type>* fft_in;
     std::complex<Type>* fft_out;
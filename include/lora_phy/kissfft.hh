@@ -65,7 +65,7 @@ public:
     using cpx_type = std::complex<scalar_type>;
     using plan_type = kissfft_plan<T_Scalar>;
 
-    explicit kissfft(plan_type& plan)
+    explicit kissfft(const plan_type& plan)
         : _p(plan) {}
 
     static void init(plan_type& plan, int nfft, bool inverse,
@@ -76,10 +76,17 @@ public:
 
         // Generate twiddle factors
         traits.fill_twiddles(plan.twiddles, nfft, inverse);
+        factorize(plan, 4);
+    }
 
-        // Factorize nfft and store in plan
-        int n = nfft;
-        int p = 4;
+    // Factorize plan.nfft into butterfly stages, trying @p preferred_radix
+    // first (4: radix-4 stages with a final radix-2 where needed, 2: radix-2
+    // only).  The twiddles do not depend on the layout, so an initialised
+    // plan can be refactorized in place.
+    static void factorize(plan_type& plan, int preferred_radix)
+    {
+        int n = plan.nfft;
+        int p = preferred_radix == 2 ? 2 : 4;
         plan.stages = 0;
         do {
             while (n % p) {
@@ -188,7 +195,7 @@ private:
     {
         size_t k = m;
         const size_t m2 = 2*m;
-        cpx_type *tw1, *tw2;
+        const cpx_type *tw1, *tw2;
         cpx_type scratch[5];
         cpx_type epi3;
         epi3 = _p.twiddles[fstride*m];
@@ -226,8 +233,8 @@ private:
         cpx_type *Fout0, *Fout1, *Fout2, *Fout3, *Fout4;
         size_t u;
         cpx_type scratch[13];
-        cpx_type* twiddles = &_p.twiddles[0];
-        cpx_type *tw;
+        const cpx_type* twiddles = &_p.twiddles[0];
+        const cpx_type *tw;
         cpx_type ya, yb;
         ya = twiddles[fstride*m];
         yb = twiddles[fstride*2*m];
@@ -287,7 +294,7 @@ private:
     void kf_bfly_generic(cpx_type* Fout, const size_t fstride, int m, int p) const
     {
         int u, k, q1, q;
-        cpx_type* twiddles = &_p.twiddles[0];
+        const cpx_type* twiddles = &_p.twiddles[0];
         cpx_type t;
         int Norig = _p.nfft;
         cpx_type scratchbuf[kissfft_utils::KISSFFT_MAX_FFT_RADIX];
@@ -315,6 +322,6 @@ private:
         }
     }
 
-    plan_type& _p;
+    const plan_type& _p;
 };
 #endif
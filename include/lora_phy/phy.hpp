@@ -48,6 +48,33 @@ constexpr float bw_scale(bandwidth bw) {
     return bw_to_hz(bw) / 125000.0f;
 }
 
+struct lora_table_cache;
+struct lora_wisdom;
+
+/**
+ * Interchangeable implementations of the hot kernels.  Every variant of a
+ * kernel produces the same output; which one is fastest depends on the CPU
+ * and the spreading factor, so autotune() measures them and records the
+ * winners in a lora_wisdom table.
+ */
+enum class deinterleave_kernel : uint8_t {
+    reference, ///< diagonalDeterleaveSx()
+    unrolled,  ///< diagonalDeterleaveSx2(), used only for square blocks
+    transpose, ///< diagonalDeterleaveSxFast()
+};
+
+enum class fec_kernel : uint8_t {
+    scalar, ///< table lookups one codeword at a time
+    simd,   ///< byte shuffle lookups when the CPU supports SSSE3
+};
+
+struct lora_kernel_choice {
+    deinterleave_kernel deinterleave{deinterleave_kernel::transpose};
+    fec_kernel          fec{fec_kernel::simd};
+    bool                simd_detect{};  ///< SSE2 peak search in the detector
+    unsigned            fft_radix{4};   ///< 4 = radix-4 first, 2 = radix-2 only
+};
+
 struct lora_params {
     unsigned sf{};                   ///< Spreading factor
     bandwidth bw{bandwidth::bw_125}; ///< Operating bandwidth
@@ -55,8 +82,16 @@ struct lora_params {
     unsigned osr{1};                 ///< Oversampling ratio
     window_type window{window_type::window_none}; ///< Optional analysis window
     uint8_t sync_word{0x12};         ///< Two-nibble network sync word
+    const lora_table_cache* cache{}; ///< optional mapped tables used by init()
+    bool explicit_header{};          ///< prepend/parse the explicit header
+    bool crc{};                      ///< append/check the payload CRC
+    size_t payload_len{};            ///< implicit header length, 0 = infer
+    const lora_wisdom* wisdom{};     ///< optional tuned kernels used by init()
 };
 
+// Largest number of antenna branches lora_demodulate_mrc() combines.
+constexpr size_t LORA_MAX_BRANCHES = 4;
+
 /**
  * Metrics collected during demodulation/decoding.  The returned pointer from
  * get_last_metrics() refers to this structure inside the workspace and remains
@@ -66,8 +101,68 @@ struct lora_metrics {
     bool  crc_ok{};      ///< true when last block passed CRC
     float cfo{};         ///< estimated carrier frequency offset
     float time_offset{}; ///< estimated timing offset
+    size_t fec_corrected{};     ///< codewords corrected by the last decode()
+    size_t fec_uncorrectable{}; ///< codewords decode() could not correct
+    unsigned frame_cr{};        ///< coding rate 1..4 of the last decoded frame
+    bool frame_crc{};           ///< last decoded frame carried a payload CRC
+    size_t branches{};                       ///< branches combined by the last MRC demod
+    float branch_snr[LORA_MAX_BRANCHES]{};   ///< per-branch preamble SNR in dB
+};
+
+/**
+ * Precomputed FFT plans and analysis window for one parameter set.  A gateway
+ * that follows ADR or scans several profiles builds one of these per profile
+ * with init_profile() and then switches a workspace between them with
+ * select_profile(), which only swaps a pointer.  The tables are owned by the
+ * caller and must outlive every workspace that selects them.
+ */
+struct lora_profile_tables {
+    lora_params          params{};    ///< parameters the tables were built for
+    lora_kernel_choice   kernels{};   ///< kernel variants, plans laid out for fft_radix
+    kissfft_plan<float>  plan_fwd{};  ///< forward FFT plan
+    kissfft_plan<float>  plan_inv{};  ///< inverse FFT plan
+    float                window[kissfft_utils::KISSFFT_MAX_N]; ///< analysis window
+    std::complex<float>  downchirp[kissfft_utils::KISSFFT_MAX_N]; ///< reference downchirp
 };
 
+/** Layout version of table cache files; bumped whenever the file format or
+ * lora_params changes so stale caches are rejected instead of misread. */
+constexpr uint32_t LORA_TABLE_CACHE_VERSION = 3;
+
+/**
+ * Read-only view of a table cache file built with table_cache_write().  The
+ * file holds a small index followed by the twiddles, window and downchirp of
+ * every entry, each sized to its own N, so a short-lived process can copy
+ * them instead of computing them.  The cache is only valid on the
+ * architecture and build it was written by; the header records the layout
+ * version and index record size to catch mismatches.
+ */
+struct lora_table_cache {
+    const void* map{};      ///< start of the mapping
+    size_t      map_size{}; ///< length of the mapping in bytes
+    size_t      count{};    ///< number of entries
+};
+
+/** Build tables for @p count parameter sets and write them to @p path.
+ * @p scratch is caller owned storage for one entry.  Returns 0 on success or
+ * -1 on invalid parameters or I/O failure. */
+int table_cache_write(const char* path, const lora_params* cfgs, size_t count,
+                      lora_profile_tables* scratch);
+
+/** Map @p path read-only and validate its header and index.  Entry tables
+ * are only checked when looked up.  Returns 0 on success or -1 when the file
+ * is missing, stale or malformed. */
+int table_cache_open(lora_table_cache* cache, const char* path);
+
+/** Unmap a cache opened with table_cache_open(). */
+void table_cache_close(lora_table_cache* cache);
+
+/** Copy the entry matching the SF, bandwidth, oversampling and window of
+ * @p cfg into @p tables after checking its checksum.  Returns 0, or -1 when
+ * the cache does not cover @p cfg or the entry is corrupt. */
+int table_cache_find(const lora_table_cache* cache, const lora_params* cfg,
+                     lora_profile_tables* tables);
+
 /**
  * Runtime workspace owned by the caller.  All buffers referenced here must be
  * preallocated by the caller before calling init().  The library reads or
@@ -78,6 +173,7 @@ struct lora_workspace {
     uint16_t*            symbol_buf{}; ///< N entries
     std::complex<float>* fft_in{};     ///< N complex samples
     std::complex<float>* fft_out{};    ///< N*osr complex samples for modulation/demodulation
+    std::complex<float>* sdft_bins{};  ///< 2*N sliding DFT bins used by refine_timing()
 
     float*               window{};     ///< N analysis window coefficients
     window_type          window_kind{window_type::window_none};
@@ -88,37 +184,127 @@ struct lora_workspace {
     lora_metrics         metrics{};    ///< updated by processing functions
     unsigned             osr{1};       ///< oversampling ratio stored during init
     bandwidth           bw{bandwidth::bw_125}; ///< bandwidth stored during init
-    uint8_t             sync_word{0x12}; ///< configured network sync word
+    uint8_t             sync_word{0x12}; ///< configured sync word, replaced by the one demodulate() detects
+    uint8_t             expected_sync_word{0x12}; ///< configured sync word, checked against the sync symbols
+    const lora_profile_tables* profile{}; ///< active prebuilt profile, null after init()
+    unsigned            cr{4};          ///< coding rate 1..4 (4/5..4/8)
+    bool                explicit_header{}; ///< explicit header framing
+    bool                crc{};          ///< payload CRC framing
+    size_t              payload_len{};  ///< implicit header payload length
+    lora_kernel_choice  kernels{};      ///< kernel variants selected by init()
+};
+
+/**
+ * Fastest kernel variants per spreading factor for one machine.  Built by
+ * autotune() and persisted with wisdom_save() so later processes only read
+ * the file; wisdom_load() rejects files written on a different CPU model.
+ */
+constexpr size_t LORA_WISDOM_CPU_LEN = 64;
+
+struct lora_wisdom {
+    char               cpu[LORA_WISDOM_CPU_LEN]{}; ///< CPU model the entries were measured on
+    bool               valid[13]{};                ///< entry for SF i has been measured
+    lora_kernel_choice choice[13]{};               ///< indexed by spreading factor
 };
 
+/** Write the CPU model name of this machine to @p buf (at most @p len bytes,
+ * always terminated).  Falls back to "unknown". */
+void cpu_model(char* buf, size_t len);
+
+/** Time every kernel variant at @p sf (5..12) and store the fastest in
+ * @p wisdom, which is stamped with this machine's CPU model.  Not thread
+ * safe: the benchmark buffers are static.  Returns 0 on success or -1 for an
+ * invalid spreading factor. */
+int autotune(lora_wisdom* wisdom, unsigned sf);
+
+/** Test mode: run every kernel variant at @p sf on the same random input and
+ * compare the results.  Returns 0 when all variants agree, -1 otherwise. */
+int autotune_verify(unsigned sf);
+
+/** Read a wisdom file.  Returns 0 on success or -1 when the file is missing,
+ * malformed or was written on another CPU model. */
+int wisdom_load(lora_wisdom* wisdom, const char* path);
+
+/** Write @p wisdom to @p path.  Returns 0 on success or -1 on I/O failure. */
+int wisdom_save(const lora_wisdom* wisdom, const char* path);
+
+/** Load @p path when it matches this machine, autotune the spreading factors
+ * in @p sfs it does not cover and save it back if anything was measured.
+ * Returns 0 on success or -1 on invalid input or I/O failure. */
+int wisdom_prepare(lora_wisdom* wisdom, const char* path, const unsigned* sfs,
+                   size_t count);
+
+/** Kernel choice for @p sf, or null when @p wisdom does not cover it. */
+const lora_kernel_choice* wisdom_find(const lora_wisdom* wisdom, unsigned sf);
+
 // ---------------------------------------------------------------------------
 // High level API
 // ---------------------------------------------------------------------------
 
-/** Initialise the workspace for a given parameter set.  Returns 0 on success
+/** Initialise the workspace for a given parameter set.  When @c cfg->cache
+ * holds matching tables their plans and window are copied into the workspace
+ * instead of being computed, keeping the FFT layout they were built with.
+ * When @c cfg->wisdom covers the spreading factor its
+ * kernel choice is applied without measuring anything.  Returns 0 on success
  * or -EINVAL when parameters are invalid.  The workspace and the buffers it
  * references are owned by the caller and must remain valid for subsequent
  * calls. */
 int init(lora_workspace* ws, const lora_params* cfg);
 
+/** Build the plans and window for @p cfg into caller owned @p tables, with
+ * the kernel choice @c cfg->wisdom holds for the spreading factor.  Returns 0
+ * on success or -1 when the parameters are invalid. */
+int init_profile(lora_profile_tables* tables, const lora_params* cfg);
+
+/** Switch @p ws to the prebuilt @p tables and their kernel choice without
+ * recomputing anything.  The buffers referenced by @p ws must be large enough for the largest profile
+ * that will be selected.  Returns 0 on success or -1 on invalid input. */
+int select_profile(lora_workspace* ws, const lora_profile_tables* tables);
+
 /** Reset runtime counters and metric fields in @p ws without touching the
  * caller supplied buffers or FFT plans. */
 void reset(lora_workspace* ws);
 
 /** Encode @p payload into @p symbols.  @p symbols must point to a caller
  * provided buffer of at least @p symbol_cap entries.  Returns the number of
- * symbols written or -ERANGE if the buffer is too small. */
+ * symbols written or -ERANGE if the buffer is too small.
+ *
+ * The full LoRa transmit chain runs in a single pass, one interleaver block
+ * at a time: optional explicit header and CRC, Hamming/parity coding
+ * (low nibble first), codeword whitening, diagonal interleaving and Gray
+ * mapping.  The first block always carries SF codewords at coding rate 4/8,
+ * the rest use the configured rate. */
 ssize_t encode(lora_workspace* ws,
                const uint8_t* payload, size_t payload_len,
                uint16_t* symbols, size_t symbol_cap);
 
+/** Number of symbols encode() produces for a payload of @p payload_len bytes
+ * with the framing configured in @p ws. */
+size_t encoded_symbol_count(const lora_workspace* ws, size_t payload_len);
+
 /** Decode @p symbols into the caller provided @p payload buffer.  The buffer
  * must have space for @p payload_cap bytes.  Returns bytes written or a
- * negative error code on failure. */
+ * negative error code on failure.
+ *
+ * Inverse of encode(), fused the same way: each interleaver block is Gray
+ * mapped, deinterleaved, dewhitened and FEC decoded in place, and the CRC
+ * state is carried across blocks.  With an explicit header the length, coding
+ * rate and CRC flag come from the header (-1 when its checksum fails);
+ * otherwise the workspace settings are used.  ``metrics.crc_ok`` and the
+ * per-packet ``fec_corrected``/``fec_uncorrectable`` counts are updated. */
 ssize_t decode(lora_workspace* ws,
                const uint16_t* symbols, size_t symbol_count,
                uint8_t* payload, size_t payload_cap);
 
+/** Soft-decision variant of decode().  @p llrs holds sf bit LLRs per symbol
+ * as produced by demodulate_soft(); codeword bits are gathered from them
+ * through the interleaver map, dewhitened by sign and decoded with
+ * fec_decode_soft().  Framing, return values and metrics are as for
+ * decode(), except that ``fec_uncorrectable`` stays zero. */
+ssize_t decode_soft(lora_workspace* ws,
+                    const float* llrs, size_t symbol_count,
+                    uint8_t* payload, size_t payload_cap);
+
 /** Modulate symbols into complex baseband samples.  @p iq must reference a
  * buffer with capacity for @p symbol_count * (1<<sf) * osr samples.  The function
  * returns the number of samples produced or -ERANGE if @p iq_cap is
@@ -135,6 +321,14 @@ ssize_t demodulate(lora_workspace* ws,
                    const std::complex<float>* iq, size_t sample_count,
                    uint16_t* symbols, size_t symbol_cap);
 
+/** Soft output variant of demodulate().  Instead of the argmax bin each data
+ * symbol yields sf max-log bit LLRs (see symbol_llrs()) in @p llrs, which must
+ * hold @p symbol_cap * sf floats.  ``ws->fft_in`` doubles as the magnitude
+ * scratch.  Returns the number of symbols or -1 as for demodulate(). */
+ssize_t demodulate_soft(lora_workspace* ws,
+                        const std::complex<float>* iq, size_t sample_count,
+                        float* llrs, size_t symbol_cap);
+
 /** Analyse @p samples to estimate carrier frequency and timing offsets.
  * The input must contain a whole number of symbols and typically points to
  * preamble upchirps.  Estimated values are written to ``ws->metrics``.
@@ -151,6 +345,81 @@ void compensate_offsets(const lora_workspace* ws,
                         std::complex<float>* samples,
                         size_t sample_count);
 
+/** Refine ``ws->metrics.time_offset`` to single-sample resolution.  Starting
+ * @p search / 2 samples before the coarse estimate already stored in
+ * ``ws->metrics`` the window is advanced one sample at a time and the offset
+ * whose first two symbols (the sync word) concentrate the most dechirped
+ * energy in a single bin is kept.  The dechirped spectrum is tracked with a
+ * sliding DFT at O(N) per shift and re-anchored to a full FFT every
+ * @p reanchor shifts so rounding errors cannot accumulate.
+ * ``ws->sdft_bins`` must reference 2 * N caller owned elements.  Returns 0 on
+ * success or -1 when the buffer is missing or @p samples is too short. */
+int refine_timing(lora_workspace* ws,
+                  const std::complex<float>* samples, size_t sample_count,
+                  size_t search, unsigned reanchor = 64);
+
+/** Evaluate bin @p bin of the N-point forward DFT of @p x with the Goertzel
+ * recursion.  The result matches the corresponding FFT output bin. */
+std::complex<float> goertzel_bin(const std::complex<float>* x, size_t N,
+                                 size_t bin);
+
+/** Sparse-bin check used before falling back to a full FFT.  Returns true
+ * when bin @p bin of the dechirped window @p x holds more than
+ * @p min_fraction of the window energy; with the default of one half this
+ * guarantees the bin is the FFT argmax.  On success @p power, @p fIndex and
+ * (optionally) @p value are set exactly as LoRaDetector::detect() would set
+ * them for that bin. */
+bool verify_bin(const std::complex<float>* x, size_t N, size_t bin,
+                float& power, float& fIndex,
+                std::complex<float>* value = nullptr,
+                float min_fraction = 0.5f);
+
+/**
+ * State for the hierarchical preamble search.  Each symbol-long window of a
+ * dechirped stream is first checked with a short FFT over every @c decim-th
+ * sample; only windows whose coarse spectrum shows a dominant bin are
+ * promoted to the full-resolution detector, and a run of @c min_symbols
+ * confirmed windows on a consistent bin is handed to estimate_offsets().
+ * Thresholds are peak-to-average bin power ratios.  The counters accumulate
+ * across calls so the coarse stage can be tuned; with @c audit set the fine
+ * pass also runs on windows the coarse pass rejected to count misses.
+ */
+struct lora_preamble_search {
+    unsigned decim{8};            ///< coarse decimation factor (>= 2)
+    float coarse_par{10.0f};      ///< coarse peak-to-average threshold
+    float fine_par{24.0f};        ///< full-resolution peak-to-average threshold
+    unsigned min_symbols{2};      ///< consecutive windows needed to confirm
+    bool audit{false};            ///< run the fine pass on every window
+
+    size_t windows{};             ///< windows examined by the coarse pass
+    size_t promoted{};            ///< windows flagged by the coarse pass
+    size_t detections{};          ///< promoted windows confirmed by the fine pass
+    size_t false_alarms{};        ///< promoted windows rejected by the fine pass
+    size_t missed{};              ///< (audit) fine detections the coarse pass rejected
+
+    size_t coarse_n{};            ///< coarse FFT length (N / decim)
+    kissfft_plan<float> coarse_plan{};
+    std::complex<float> coarse_in[kissfft_utils::KISSFFT_MAX_N / 2];
+    std::complex<float> coarse_out[kissfft_utils::KISSFFT_MAX_N / 2];
+};
+
+/** Prepare @p s for the spreading factor configured in @p ws and clear its
+ * counters.  The decimation factor is reduced if needed so the coarse FFT
+ * keeps at least 16 bins.  Returns 0 on success or -1 on invalid input. */
+int preamble_search_init(lora_preamble_search* s, const lora_workspace* ws);
+
+/** Scan a dechirped stream for a preamble.  Returns the sample offset of the
+ * first window of the confirmed run (and updates ``ws->metrics`` through
+ * estimate_offsets()) or -1 when no preamble was found. */
+ssize_t preamble_search(lora_preamble_search* s, lora_workspace* ws,
+                        const std::complex<float>* samples,
+                        size_t sample_count);
+
+/** Fraction of fine-pass detections that the coarse pass also flagged.  Only
+ * meaningful for searches run with @c audit enabled; returns 1 when no
+ * detection has been observed. */
+float preamble_detection_probability(const lora_preamble_search* s);
+
 /** Obtain metrics from the last decode or demodulate call.  The returned
  * pointer refers to memory inside @p ws and must not be freed by the caller. */
 const lora_metrics* get_last_metrics(const lora_workspace* ws);
@@ -166,12 +435,46 @@ template <typename T> class LoRaDetector;
 
 namespace lora_phy {
 
+// Receive stages of lora_demodulate() timed by the region timers compiled in
+// with LORA_PHY_STAGE_TIMERS (CMake option of the same name).
+enum class demod_stage : uint8_t {
+    normalize, ///< amplitude scan and rescaling into scratch
+    offsets,   ///< CFO and timing estimate from the sync symbols
+    cfo,       ///< timing shift, CFO rotation and window per symbol
+    fft,       ///< forward FFT, or the single-bin sync check
+    argmax,    ///< peak search over the FFT bins
+    count,
+};
+
+#ifdef LORA_PHY_STAGE_TIMERS
+constexpr bool LORA_STAGE_TIMERS = true;
+#else
+constexpr bool LORA_STAGE_TIMERS = false;
+#endif
+
+// Counters a lora_stage_times::read_counters source may supply per read.
+constexpr size_t LORA_STAGE_COUNTERS = 5;
+
+// Accumulated per-stage time, in TSC cycles on x86 and nanoseconds
+// elsewhere.  Attach to lora_demod_workspace::stage_times; it is left
+// untouched when the timers are compiled out.  With @c read_counters set,
+// each stage also accumulates the difference of the LORA_STAGE_COUNTERS
+// values it reports before and after the stage (e.g. hardware counters).
+struct lora_stage_times {
+    uint64_t cycles[static_cast<size_t>(demod_stage::count)]{};
+    uint64_t calls[static_cast<size_t>(demod_stage::count)]{};
+    void (*read_counters)(void* ctx, uint64_t* values){};
+    void* counter_ctx{};
+    uint64_t counters[static_cast<size_t>(demod_stage::count)][LORA_STAGE_COUNTERS]{};
+};
+
 // Workspace used by the demodulator to hold FFT buffers and detector instance.
 struct lora_demod_workspace {
     static const size_t MAX_N = kissfft_utils::KISSFFT_MAX_N;
     size_t N{};
     std::complex<float> fft_in[MAX_N];
     std::complex<float> fft_out[MAX_N];
+    std::complex<float> combined[MAX_N]; ///< MRC accumulator for lora_demodulate_mrc()
     float window[MAX_N];
     window_type window_kind{window_type::window_none};
     kissfft_plan<float> fft_plan{}; ///< preallocated plan for kissfft
@@ -180,8 +483,10 @@ struct lora_demod_workspace {
     kissfft<float>* fft{};          ///< fft instance using the plan
     LoRaDetector<float>* detector{};
     lora_metrics metrics{};         ///< estimated metrics for last demod
+    uint8_t sync_word{0x12};        ///< expected sync word, confirmed with verify_bin()
     std::complex<float>* scratch{}; ///< caller-provided scratch buffer
     size_t scratch_len{};           ///< number of elements in scratch
+    lora_stage_times* stage_times{}; ///< optional per-stage timing, caller owned
 };
 
 // Initialise and clean up the demodulator workspace.  Callers must provide a
@@ -206,6 +511,132 @@ size_t lora_demodulate(lora_demod_workspace* ws,
                        uint16_t* out_symbols, unsigned osr,
                        uint8_t* out_sync = nullptr);
 
+// Maximum-ratio combining receiver for @p branch_count (1..LORA_MAX_BRANCHES)
+// synchronised, dechirped streams of @p sample_count samples each.  Timing and
+// CFO are estimated on the strongest branch as in lora_demodulate(); each
+// branch's gain, phase and noise power then come from its FFT of the two
+// sync symbols.  For every symbol the timing and CFO corrected branches are
+// summed in the time domain with conj(h)/noise weights and the sum takes one
+// FFT before the peak search, so combining adds K*N complex MACs per symbol
+// and the FFT count stays that of a single receiver.
+// Per-branch SNR is reported in ws->metrics.branch_snr.  Returns the number of
+// data symbols, or 0 for invalid arguments or fewer than two symbols.
+size_t lora_demodulate_mrc(lora_demod_workspace* ws,
+                           const std::complex<float>* const* branches,
+                           size_t branch_count, size_t sample_count,
+                           uint16_t* out_symbols, unsigned osr,
+                           uint8_t* out_sync = nullptr);
+
+// Successive interference cancellation over one buffered, dechirped stream.
+// Counters accumulate across sic_receive() calls.
+struct lora_sic {
+    int    max_delay{2};  ///< replica timing search margin beyond half a symbol, in samples
+    size_t packets{};     ///< packets decoded with a valid CRC
+    size_t recovered{};   ///< of those, packets only decoded after cancellation
+};
+
+// One packet slot for sic_receive().  The caller provides the payload buffer.
+struct lora_sic_packet {
+    uint8_t* payload{};   ///< caller buffer for the decoded payload
+    size_t   capacity{};  ///< size of @c payload
+    ssize_t  length{-1};  ///< decoded length, -1 when the slot was not filled
+    bool     cancelled{}; ///< decoded from the residual of earlier packets
+    std::complex<float> amplitude{}; ///< fitted amplitude of the subtracted replica
+    float    cfo{};       ///< fitted replica CFO in radians per sample
+    int      delay{};     ///< fitted replica timing in samples
+};
+
+// Decode colliding packets of the same SF from @p samples (dechirped as for
+// lora_demodulate(), modified in place).  Each pass looks for a packet every
+// half symbol, demodulates it with @p dws and decodes it with @p ws; it stops
+// when nothing decodes with a valid CRC or an earlier packet decodes again
+// where it was fitted.  A packet that verifies is re-encoded, re-modulated
+// with lora_modulate(), fitted to the buffer in timing (half a symbol plus
+// max_delay around where it was found), CFO and complex amplitude, and
+// subtracted, so the next pass sees the residual.  @p symbols needs room for
+// every symbol of the buffer and @p dws->scratch for the replica plus one
+// symbol.  Returns the number of packets decoded into @p packets (at most
+// @p max_packets).
+size_t sic_receive(lora_sic* sic, lora_workspace* ws, lora_demod_workspace* dws,
+                   std::complex<float>* samples, size_t sample_count,
+                   uint16_t* symbols, size_t symbol_cap,
+                   lora_sic_packet* packets, size_t max_packets);
+
+// Codeword counters accumulated by fec_decode().
+struct lora_fec_stats {
+    size_t corrected{};     ///< codewords with a parity error that was fixed
+    size_t uncorrectable{}; ///< codewords whose error could not be corrected
+};
+
+// Encode @p count 4-bit words into codewords of the code selected by @p rdd
+// (0 = none, 1 = parity 5/4, 2 = parity 6/4, 3 = Hamming 7/4,
+// 4 = Hamming 8/4).  Uses byte shuffle table lookups when the CPU supports
+// SSSE3 unless @p kernel asks for the scalar tables.  Returns the number of
+// codewords written or 0 for an invalid @p rdd.
+size_t fec_encode(const uint8_t* nibbles, size_t count, uint8_t* codewords,
+                  unsigned rdd, fec_kernel kernel = fec_kernel::simd);
+
+// Decode @p count codewords back into 4-bit words, correcting single bit
+// errors where the code allows it.  Corrected and uncorrectable codewords are
+// added to @p stats when given.  Returns the number of words written.
+size_t fec_decode(const uint8_t* codewords, size_t count, uint8_t* nibbles,
+                  unsigned rdd, lora_fec_stats* stats = nullptr,
+                  fec_kernel kernel = fec_kernel::simd);
+
+// Soft-input counterpart of fec_decode().  @p llrs holds 4 + @p rdd values
+// per codeword, bit 0 first, positive favouring a zero bit.  Each codeword is
+// decoded to the candidate with the largest correlation, which is maximum
+// likelihood for the max-log metrics from symbol_llrs() and also resolves
+// single errors the parity codes can only detect.  Codewords whose hard
+// decision differed from the chosen candidate are added to
+// @p stats->corrected.  Returns the number of words written.
+size_t fec_decode_soft(const float* llrs, size_t count, uint8_t* nibbles,
+                       unsigned rdd, lora_fec_stats* stats = nullptr);
+
+// Max-log bit LLRs of one demodulated symbol from its @p 2^sf FFT @p bins.
+// Bit b of the Gray label k ^ (k >> 1) gets
+//   llrs[b] = max |X_k| over bit b == 0  -  max |X_k| over bit b == 1,
+// so the sign is the hard decision and the values share the bin magnitude
+// scale across symbols.  @p scratch must hold 2^sf floats.
+void symbol_llrs(const std::complex<float>* bins, unsigned sf, float* llrs,
+                 float* scratch);
+
+// Length of the precomputed LFSR whitening sequence; covers the codewords of
+// the largest payload plus CRC.
+constexpr size_t LORA_WHITENING_MAX = 1024;
+
+// Table driven equivalents of Sx1272ComputeWhiteningLfsr(),
+// Sx1272ComputeWhitening() and SX1232RadioComputeWhitening().  The sequences
+// are generated once and applied as a 64-bit wide XOR; whitening and
+// de-whitening are the same operation.  whiten_lfsr() falls back to the LFSR
+// when @p bit_ofs + @p len exceeds LORA_WHITENING_MAX.
+void whiten_lfsr(uint8_t* buffer, size_t len, unsigned bit_ofs, unsigned rdd);
+void whiten_sx1272(uint8_t* buffer, size_t len, unsigned bit_ofs, unsigned rdd);
+void whiten_sx1232(uint8_t* buffer, size_t len);
+
+// Running state of the table driven payload CRC.  Feed bytes with
+// crc_update() in any number of chunks; crc_final() then equals
+// sx1272DataChecksum() over everything fed since crc_init().
+struct lora_crc_state {
+    uint16_t res{};    ///< CRC register before output masking
+    size_t   length{}; ///< bytes fed so far, selects the output mask
+};
+
+void crc_init(lora_crc_state* st);
+void crc_update(lora_crc_state* st, const uint8_t* data, size_t len);
+uint16_t crc_final(const lora_crc_state* st);
+
+// One-shot payload CRC, equivalent to sx1272DataChecksum().
+uint16_t payload_crc(const uint8_t* data, size_t len);
+
+// Check @p count packets that end in a little-endian payload CRC.  Per packet
+// results go to @p results when given; returns the number that passed.
+size_t crc_verify_bulk(const uint8_t* const* packets, const size_t* lengths,
+                       size_t count, bool* results = nullptr);
+
+// Table driven equivalent of headerChecksum().
+uint8_t header_checksum(const uint8_t* h);
+
 // Simple Hamming(8,4) based encoder. Each input byte becomes two symbols.
 size_t lora_encode(const uint8_t* bytes, size_t byte_count,
                    uint16_t* out_symbols, unsigned sf);
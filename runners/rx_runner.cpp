@@ -111,7 +111,9 @@ int main(int argc, char** argv) {
         return 1;
     }
 
-    std::vector<uint8_t> decoded(demod_syms / 2);
+    // Each symbol carries at most sf <= 12 bits, so two bytes per symbol
+    // bounds any implicit-header length decode() can infer.
+    std::vector<uint8_t> decoded(static_cast<size_t>(demod_syms) * 2);
     ssize_t decoded_bytes =
         decode(&ws, symbols.data(), demod_syms, decoded.data(), decoded.size());
     if (decoded_bytes < 0) {
@@ -0,0 +1,162 @@
+#include <lora_phy/phy.hpp>
+
+#include <cstdint>
+#include <cstdlib>
+#include <fstream>
+#include <iostream>
+#include <memory>
+#include <string>
+#include <vector>
+
+using namespace lora_phy;
+
+namespace {
+
+void usage(const char* prog) {
+    std::cerr << "Usage: " << prog
+              << " --out=FILE [--profiles=FILE] [--osr=N[,N...]]"
+                 " [--window=none|hann|both]\n";
+}
+
+std::string trim(const std::string& s) {
+    const auto start = s.find_first_not_of(" \t\r\n");
+    if (start == std::string::npos) return "";
+    const auto end = s.find_last_not_of(" \t\r\n");
+    return s.substr(start, end - start + 1);
+}
+
+// Whole-string unsigned decimal; rejects empty strings, signs and trailing
+// characters.
+bool parse_unsigned(const std::string& s, unsigned long& out) {
+    if (s.empty() || s[0] < '0' || s[0] > '9') return false;
+    char* end = nullptr;
+    out = std::strtoul(s.c_str(), &end, 10);
+    return *end == '\0';
+}
+
+// Collect the sf/bw pairs of a profiles.yaml style list.
+bool load_profiles(const std::string& path, std::vector<lora_params>& out) {
+    std::ifstream f(path);
+    if (!f) return false;
+    std::string line;
+    lora_params current{};
+    bool in_profile = false;
+    while (std::getline(f, line)) {
+        line = trim(line);
+        if (line.empty() || line[0] == '#') continue;
+        if (line[0] == '-') {
+            if (in_profile) out.push_back(current);
+            current = lora_params{};
+            in_profile = true;
+            continue;
+        }
+        auto colon = line.find(':');
+        if (colon == std::string::npos) continue;
+        std::string key = trim(line.substr(0, colon));
+        std::string val = trim(line.substr(colon + 1));
+        if (key != "sf" && key != "bw") continue;
+        unsigned long v = 0;
+        if (!parse_unsigned(val, v)) return false;
+        if (key == "sf")
+            current.sf = static_cast<unsigned>(v);
+        else
+            current.bw = static_cast<bandwidth>(v);
+    }
+    if (in_profile) out.push_back(current);
+    return true;
+}
+
+bool parse_osr_list(const std::string& list, std::vector<unsigned>& out) {
+    size_t pos = 0;
+    while (pos <= list.size()) {
+        size_t comma = list.find(',', pos);
+        if (comma == std::string::npos) comma = list.size();
+        unsigned long v = 0;
+        if (!parse_unsigned(list.substr(pos, comma - pos), v) || v == 0) return false;
+        out.push_back(static_cast<unsigned>(v));
+        pos = comma + 1;
+    }
+    return !out.empty();
+}
+
+} // namespace
+
+int main(int argc, char** argv) {
+    std::string out_path;
+    std::string profiles_path = "tests/profiles.yaml";
+    std::vector<unsigned> osrs;
+    std::vector<window_type> windows = {window_type::window_none};
+
+    for (int i = 1; i < argc; ++i) {
+        std::string arg = argv[i];
+        if (arg.rfind("--out=", 0) == 0) {
+            out_path = arg.substr(6);
+        } else if (arg.rfind("--profiles=", 0) == 0) {
+            profiles_path = arg.substr(11);
+        } else if (arg.rfind("--osr=", 0) == 0) {
+            if (!parse_osr_list(arg.substr(6), osrs)) {
+                std::cerr << "Invalid oversampling list\n";
+                usage(argv[0]);
+                return 1;
+            }
+        } else if (arg.rfind("--window=", 0) == 0) {
+            std::string w = arg.substr(9);
+            if (w == "none")
+                windows = {window_type::window_none};
+            else if (w == "hann")
+                windows = {window_type::window_hann};
+            else if (w == "both")
+                windows = {window_type::window_none, window_type::window_hann};
+            else {
+                std::cerr << "Unsupported window\n";
+                return 1;
+            }
+        } else if (arg == "--help" || arg == "-h") {
+            usage(argv[0]);
+            return 0;
+        } else {
+            std::cerr << "Unknown argument: " << arg << "\n";
+            usage(argv[0]);
+            return 1;
+        }
+    }
+
+    if (out_path.empty()) {
+        usage(argv[0]);
+        return 1;
+    }
+    if (osrs.empty()) osrs.push_back(1);
+
+    std::vector<lora_params> profiles;
+    if (!load_profiles(profiles_path, profiles)) {
+        std::cerr << "Failed to load " << profiles_path << "\n";
+        return 1;
+    }
+
+    // One entry per distinct sf/bw/osr/window combination.
+    std::vector<lora_params> cfgs;
+    for (const auto& prof : profiles) {
+        for (unsigned osr : osrs) {
+            for (window_type w : windows) {
+                lora_params p = prof;
+                p.osr = osr;
+                p.window = w;
+                bool dup = false;
+                for (const auto& c : cfgs)
+                    dup = dup || (c.sf == p.sf && c.bw == p.bw &&
+                                  c.osr == p.osr && c.window == p.window);
+                if (!dup) cfgs.push_back(p);
+            }
+        }
+    }
+
+    std::unique_ptr<lora_profile_tables> scratch(new lora_profile_tables);
+    if (table_cache_write(out_path.c_str(), cfgs.data(), cfgs.size(),
+                          scratch.get()) != 0) {
+        std::cerr << "Failed to write " << out_path << "\n";
+        return 1;
+    }
+    std::cout << "Wrote " << cfgs.size() << " table sets to " << out_path
+              << "\n";
+    return 0;
+}
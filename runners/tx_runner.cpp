@@ -85,15 +85,12 @@ int main(int argc, char** argv) {
         return 1;
     }
 
-    const size_t symbol_cap = payload.size() * 2; // Hamming(8,4)
     const size_t N = size_t(1) << params.sf;
 
-    std::vector<uint16_t> symbols(symbol_cap);
     std::vector<std::complex<float>> fft_in(N);
     std::vector<std::complex<float>> fft_out(N);
 
     lora_workspace ws{};
-    ws.symbol_buf = symbols.data();
     ws.fft_in = fft_in.data();
     ws.fft_out = fft_out.data();
 
@@ -102,6 +99,9 @@ int main(int argc, char** argv) {
         return 1;
     }
 
+    std::vector<uint16_t> symbols(encoded_symbol_count(&ws, payload.size()));
+    ws.symbol_buf = symbols.data();
+
     ssize_t symbol_count = encode(&ws, payload.data(), payload.size(),
                                   symbols.data(), symbols.size());
     if (symbol_count < 0) {
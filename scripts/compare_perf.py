@@ -1,46 +1,142 @@
+"""Compare two performance_test CSVs and report significant changes.
+
+Each CSV row is one repetition of one profile, or of one cell in the
+``matrix_<RUN_ID>.csv``, ``cold_<RUN_ID>.csv`` and ``head_to_head_<RUN_ID>.csv``
+files, whose ``profile`` column names the cell.  Every column other than the
+row identifiers is a metric; all are lower-is-better except ``pps``,
+``speedup`` and IPC.  In head-to-head files only ``lora_phy_ns`` and
+``speedup`` are judged; ``lora_sdr_ns`` times the reference chain.  For every
+profile and metric the medians of the two runs are compared; a change counts
+only when the bootstrap confidence interval of the relative median difference
+excludes zero and its magnitude reaches ``--min-effect``; a metric whose
+baseline median is zero counts as an unbounded change once its new median is
+not.  Regressions and improvements are ranked by effect size.
+"""
+
+import argparse
 import csv
-import sys
-from typing import Dict
+import math
+import random
+import statistics
+from typing import Dict, List, Tuple
+
+STAGE_SUFFIX = "_cycles_per_symbol"
+
+# Columns identifying a row rather than measuring it.
+ID_COLUMNS = {"run_id", "profile", "rep", "sf", "N",
+              # benchmark matrix cells (logs/matrix_<RUN_ID>.csv)
+              "cr", "osr", "window", "payload", "op",
+              # cold-cache rows (logs/cold_<RUN_ID>.csv)
+              "mode", "workspaces", "working_set_bytes", "workspace_bytes",
+              # head-to-head rows (logs/head_to_head_<RUN_ID>.csv): the
+              # reference chain's time is context, not a lora_phy metric
+              "lora_sdr_ns"}
 
+# Samples per profile, keyed by metric name.
+Samples = Dict[str, Dict[str, List[float]]]
 
-def load(path: str) -> Dict[str, Dict[str, float]]:
-    data: Dict[str, Dict[str, float]] = {}
+
+def load(path: str) -> Samples:
+    data: Samples = {}
     with open(path, newline="") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            data[row["profile"]] = {
-                "pps": float(row["pps"]),
-                "cycles_per_symbol": float(row["cycles_per_symbol"]),
-            }
+            metrics = data.setdefault(row["profile"], {})
+            for key, val in row.items():
+                # Optional columns (stage timers) are empty when compiled out.
+                if key not in ID_COLUMNS and val:
+                    metrics.setdefault(key, []).append(float(val))
     return data
 
 
+def higher_is_better(metric: str) -> bool:
+    return metric in ("pps", "speedup") or metric.endswith("ipc")
+
+
+def relative_change(base: List[float], new: List[float]) -> float:
+    b = statistics.median(base)
+    n = statistics.median(new)
+    if b:
+        return (n - b) / b
+    # Nothing to scale by: a counter that was zero (e.g. LLC misses) and is
+    # not any more has changed without bound.
+    return math.copysign(math.inf, n) if n else 0.0
+
+
+def bootstrap_ci(base: List[float], new: List[float], rounds: int,
+                 confidence: float, rng: random.Random) -> Tuple[float, float]:
+    """Percentile interval of the relative median change, resampling both runs."""
+    changes = []
+    for _ in range(rounds):
+        b = [rng.choice(base) for _ in base]
+        n = [rng.choice(new) for _ in new]
+        changes.append(relative_change(b, n))
+    changes.sort()
+    tail = (1.0 - confidence) / 2.0
+    lo = changes[int(tail * (rounds - 1))]
+    hi = changes[int((1.0 - tail) * (rounds - 1))]
+    return lo, hi
+
+
 def main() -> int:
-    if len(sys.argv) != 3:
-        print("usage: compare_perf.py <baseline.csv> <new.csv>")
-        return 1
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("new")
+    parser.add_argument("--min-effect", type=float, default=0.03,
+                        help="smallest relative median change reported (default 0.03)")
+    parser.add_argument("--confidence", type=float, default=0.95,
+                        help="bootstrap confidence level (default 0.95)")
+    parser.add_argument("--bootstrap", type=int, default=2000,
+                        help="bootstrap resamples (default 2000)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
 
-    base = load(sys.argv[1])
-    new = load(sys.argv[2])
+    base = load(args.baseline)
+    new = load(args.new)
+    rng = random.Random(args.seed)
 
+    # (|effect|, effect, profile, metric, base median, new median, ci)
     reg = []
+    imp = []
+    few = set()
     for profile, metrics in new.items():
         if profile not in base:
             continue
-        b = base[profile]
-        if metrics["pps"] < b["pps"] or metrics["cycles_per_symbol"] > b["cycles_per_symbol"]:
-            reg.append((profile, b, metrics))
+        for metric, samples in metrics.items():
+            b = base[profile].get(metric)
+            if not b:
+                continue
+            if len(b) < 3 or len(samples) < 3:
+                few.add(profile)
+            change = relative_change(b, samples)
+            lo, hi = bootstrap_ci(b, samples, args.bootstrap, args.confidence, rng)
+            # Positive effect means slower, whatever the metric's direction.
+            sign = -1.0 if higher_is_better(metric) else 1.0
+            effect = sign * change
+            lo, hi = sorted((sign * lo, sign * hi))
+            if abs(effect) < args.min_effect or lo <= 0.0 <= hi:
+                continue
+            entry = (abs(effect), effect, profile, metric, statistics.median(b),
+                     statistics.median(samples), (lo, hi))
+            (reg if effect > 0 else imp).append(entry)
+
+    for title, rows in (("REGRESSIONS", reg), ("IMPROVEMENTS", imp)):
+        if not rows:
+            continue
+        print(title)
+        for _, effect, profile, metric, b, n, (lo, hi) in sorted(rows, reverse=True):
+            name = metric[: -len(STAGE_SUFFIX)] if metric.endswith(STAGE_SUFFIX) else metric
+            print(f"  {profile} [{name}]: median {b:.2f}->{n:.2f}, slowdown "
+                  f"{effect * 100:+.1f}% (CI {lo * 100:+.1f}%..{hi * 100:+.1f}%)")
+    if few:
+        print("note: fewer than 3 repetitions for " + ", ".join(sorted(few)) +
+              "; intervals are not meaningful")
 
     if reg:
         print("REGRESSION DETECTED")
-        for profile, b, n in reg:
-            print(
-                f"{profile}: pps {b['pps']:.2f}->{n['pps']:.2f}, cycles/sym {b['cycles_per_symbol']:.2f}->{n['cycles_per_symbol']:.2f}"
-            )
         return 2
-    else:
-        print("No regressions detected.")
-        return 0
+    print("No regressions detected.")
+    return 0
 
 
 if __name__ == "__main__":
@@ -0,0 +1,373 @@
+#include <lora_phy/phy.hpp>
+#include <lora_phy/LoRaCodes.hpp>
+#include <lora_phy/LoRaDetector.hpp>
+
+#include <algorithm>
+#include <chrono>
+#include <cmath>
+#include <cstdio>
+#include <cstring>
+#include <random>
+
+namespace lora_phy {
+
+namespace {
+
+const unsigned kMinSf = 5;
+const unsigned kMaxSf = 12;
+const int kRepeats = 5;
+
+// Best of kRepeats runs of @p fn in nanoseconds; the minimum filters out
+// preemption and frequency ramps better than the mean.
+template <typename Fn>
+double best_time(Fn fn) {
+    double best = 0.0;
+    for (int r = 0; r < kRepeats; ++r) {
+        auto t0 = std::chrono::steady_clock::now();
+        fn();
+        auto t1 = std::chrono::steady_clock::now();
+        double ns = std::chrono::duration<double, std::nano>(t1 - t0).count();
+        if (r == 0 || ns < best) best = ns;
+    }
+    return best;
+}
+
+// Buffers for one spreading factor.  Large enough for SF12, so autotune()
+// and autotune_verify() keep a single static instance off the stack.
+struct bench_buffers {
+    kissfft_plan<float>  plan;
+    std::complex<float>  in[kissfft_utils::KISSFFT_MAX_N];
+    std::complex<float>  out[kissfft_utils::KISSFFT_MAX_N];
+    std::complex<float>  spare[kissfft_utils::KISSFFT_MAX_N];
+    uint16_t             symbols[512];
+    uint8_t              payload[64];
+    uint8_t              decoded[64];
+};
+
+// Workspace decoding a full frame at coding rate @p cr.
+void frame_workspace(lora_workspace* ws, bench_buffers* b, unsigned sf, unsigned cr) {
+    *ws = lora_workspace{};
+    ws->fft_in = b->in;
+    ws->fft_out = b->out;
+    lora_params p{};
+    p.sf = sf;
+    p.cr = cr;
+    p.explicit_header = true;
+    p.crc = true;
+    init(ws, &p);
+}
+
+// Frames at every coding rate, so the deinterleaver sees each block shape.
+template <typename Fn>
+void for_each_frame(bench_buffers* b, unsigned sf, std::mt19937& rng, Fn fn) {
+    for (unsigned cr = 1; cr <= 4; ++cr) {
+        lora_workspace ws;
+        frame_workspace(&ws, b, sf, cr);
+        for (auto& x : b->payload) x = static_cast<uint8_t>(rng());
+        ssize_t n = encode(&ws, b->payload, sizeof(b->payload), b->symbols,
+                           sizeof(b->symbols) / sizeof(b->symbols[0]));
+        if (n > 0) fn(&ws, static_cast<size_t>(n));
+    }
+}
+
+deinterleave_kernel tune_deinterleave(bench_buffers* b, unsigned sf) {
+    const deinterleave_kernel kernels[] = {deinterleave_kernel::reference,
+                                           deinterleave_kernel::unrolled,
+                                           deinterleave_kernel::transpose};
+    deinterleave_kernel best = deinterleave_kernel::transpose;
+    double best_ns = 0.0;
+    for (deinterleave_kernel k : kernels) {
+        std::mt19937 rng(sf);
+        double ns = 0.0;
+        for_each_frame(b, sf, rng, [&](lora_workspace* ws, size_t n) {
+            ws->kernels.deinterleave = k;
+            ns += best_time([&] {
+                for (int i = 0; i < 16; ++i)
+                    decode(ws, b->symbols, n, b->decoded, sizeof(b->decoded));
+            });
+        });
+        if (k == kernels[0] || ns < best_ns) {
+            best_ns = ns;
+            best = k;
+        }
+    }
+    return best;
+}
+
+fec_kernel tune_fec(bench_buffers* b) {
+    uint8_t* cw = reinterpret_cast<uint8_t*>(b->in);
+    uint8_t* nib = reinterpret_cast<uint8_t*>(b->out);
+    const size_t count = 4096;
+    for (size_t i = 0; i < count; ++i) cw[i] = static_cast<uint8_t>(i * 37);
+    double ns[2];
+    const fec_kernel kernels[2] = {fec_kernel::scalar, fec_kernel::simd};
+    for (int k = 0; k < 2; ++k)
+        ns[k] = best_time([&] {
+            for (unsigned rdd = 1; rdd <= 4; ++rdd)
+                fec_decode(cw, count, nib, rdd, nullptr, kernels[k]);
+        });
+    return ns[1] < ns[0] ? fec_kernel::simd : fec_kernel::scalar;
+}
+
+bool tune_detect(bench_buffers* b, unsigned sf) {
+    const size_t N = size_t(1) << sf;
+    kissfft<float>::init(b->plan, static_cast<int>(N), false);
+    kissfft<float> fft(b->plan);
+    LoRaDetector<float> detector(N, b->in, b->out, fft);
+    std::mt19937 rng(sf);
+    std::normal_distribution<float> n(0.0f, 1.0f);
+    for (size_t i = 0; i < N; ++i) b->out[i] = std::complex<float>(n(rng), n(rng));
+    double ns[2];
+    volatile size_t sink = 0;
+    for (int simd = 0; simd < 2; ++simd) {
+        detector.setSimd(simd != 0);
+        ns[simd] = best_time([&] {
+            float p, pav, fi;
+            for (int i = 0; i < 64; ++i) sink = sink + detector.detectBins(b->out, p, pav, fi);
+        });
+    }
+    return ns[1] < ns[0];
+}
+
+unsigned tune_fft(bench_buffers* b, unsigned sf) {
+    const int N = 1 << sf;
+    kissfft<float>::init(b->plan, N, false);
+    for (int i = 0; i < N; ++i) b->in[i] = std::polar(1.0f, 0.1f * static_cast<float>(i));
+    const unsigned radices[2] = {4, 2};
+    double ns[2];
+    for (int r = 0; r < 2; ++r) {
+        kissfft<float>::factorize(b->plan, static_cast<int>(radices[r]));
+        kissfft<float> fft(b->plan);
+        ns[r] = best_time([&] {
+            for (int i = 0; i < 16; ++i) fft.transform(b->in, b->out);
+        });
+    }
+    return ns[1] < ns[0] ? 2u : 4u;
+}
+
+bool verify_deinterleave(bench_buffers* b, unsigned sf) {
+    const deinterleave_kernel kernels[] = {deinterleave_kernel::reference,
+                                           deinterleave_kernel::unrolled};
+    std::mt19937 rng(sf + 100);
+    bool ok = true;
+    for_each_frame(b, sf, rng, [&](lora_workspace* ws, size_t n) {
+        // Corrupt a symbol so the error counters take part in the comparison.
+        b->symbols[n - 1] ^= 1;
+        uint8_t expect[sizeof(b->decoded)];
+        ws->kernels.deinterleave = deinterleave_kernel::transpose;
+        ssize_t len = decode(ws, b->symbols, n, expect, sizeof(expect));
+        const lora_metrics m = ws->metrics;
+        for (deinterleave_kernel k : kernels) {
+            ws->kernels.deinterleave = k;
+            ssize_t got = decode(ws, b->symbols, n, b->decoded, sizeof(b->decoded));
+            if (got != len || ws->metrics.crc_ok != m.crc_ok ||
+                ws->metrics.fec_corrected != m.fec_corrected ||
+                ws->metrics.fec_uncorrectable != m.fec_uncorrectable ||
+                (len > 0 && std::memcmp(expect, b->decoded, static_cast<size_t>(len))))
+                ok = false;
+        }
+    });
+    return ok;
+}
+
+bool verify_fec() {
+    uint8_t cw[256], nib[2][256], enc[2][16];
+    uint8_t words[16];
+    for (unsigned i = 0; i < 256; ++i) cw[i] = static_cast<uint8_t>(i);
+    for (unsigned i = 0; i < 16; ++i) words[i] = static_cast<uint8_t>(i);
+    const fec_kernel kernels[2] = {fec_kernel::scalar, fec_kernel::simd};
+    for (unsigned rdd = 0; rdd <= 4; ++rdd) {
+        lora_fec_stats stats[2];
+        for (int k = 0; k < 2; ++k) {
+            fec_decode(cw, 256, nib[k], rdd, &stats[k], kernels[k]);
+            fec_encode(words, 16, enc[k], rdd, kernels[k]);
+        }
+        if (std::memcmp(nib[0], nib[1], 256) || std::memcmp(enc[0], enc[1], 16) ||
+            stats[0].corrected != stats[1].corrected ||
+            stats[0].uncorrectable != stats[1].uncorrectable)
+            return false;
+    }
+    return true;
+}
+
+bool verify_detect(bench_buffers* b, unsigned sf) {
+    const size_t N = size_t(1) << sf;
+    kissfft<float>::init(b->plan, static_cast<int>(N), false);
+    kissfft<float> fft(b->plan);
+    LoRaDetector<float> detector(N, b->in, b->out, fft);
+    std::mt19937 rng(sf + 200);
+    std::normal_distribution<float> n(0.0f, 1.0f);
+    for (int trial = 0; trial < 32; ++trial) {
+        for (size_t i = 0; i < N; ++i) b->out[i] = std::complex<float>(n(rng), n(rng));
+        // Ties resolve to the lowest bin in both scans.
+        if (trial % 2) b->out[rng() % N] = b->out[rng() % N] = std::complex<float>(9.0f, 0.0f);
+        float p[2], pav[2], fi[2];
+        size_t idx[2];
+        for (int simd = 0; simd < 2; ++simd) {
+            detector.setSimd(simd != 0);
+            idx[simd] = detector.detectBins(b->out, p[simd], pav[simd], fi[simd]);
+        }
+        if (idx[0] != idx[1] || p[0] != p[1] || fi[0] != fi[1] ||
+            std::abs(pav[0] - pav[1]) > 1e-3f)
+            return false;
+    }
+    return true;
+}
+
+bool verify_fft(bench_buffers* b, unsigned sf) {
+    const int N = 1 << sf;
+    std::mt19937 rng(sf + 300);
+    std::normal_distribution<float> n(0.0f, 1.0f);
+    for (int i = 0; i < N; ++i) b->in[i] = std::complex<float>(n(rng), n(rng));
+    kissfft<float>::init(b->plan, N, false);
+    kissfft<float>(b->plan).transform(b->in, b->out);
+    kissfft<float>::factorize(b->plan, 2);
+    std::complex<float>* radix2 = b->spare;
+    kissfft<float>(b->plan).transform(b->in, radix2);
+    const float tol = 1e-4f * std::sqrt(static_cast<float>(N)) * static_cast<float>(sf);
+    for (int i = 0; i < N; ++i)
+        if (std::abs(b->out[i] - radix2[i]) > tol) return false;
+    return true;
+}
+
+} // namespace
+
+void cpu_model(char* buf, size_t len) {
+    if (!buf || len == 0) return;
+    std::snprintf(buf, len, "unknown");
+    FILE* f = std::fopen("/proc/cpuinfo", "r");
+    if (!f) return;
+    char line[256];
+    while (std::fgets(line, sizeof(line), f)) {
+        if (std::strncmp(line, "model name", 10) != 0) continue;
+        const char* v = std::strchr(line, ':');
+        if (!v) break;
+        ++v;
+        while (*v == ' ' || *v == '\t') ++v;
+        std::snprintf(buf, len, "%s", v);
+        buf[std::strcspn(buf, "\r\n")] = '\0';
+        break;
+    }
+    std::fclose(f);
+}
+
+const lora_kernel_choice* wisdom_find(const lora_wisdom* wisdom, unsigned sf) {
+    if (!wisdom || sf > kMaxSf || !wisdom->valid[sf]) return nullptr;
+    return &wisdom->choice[sf];
+}
+
+int autotune(lora_wisdom* wisdom, unsigned sf) {
+    if (!wisdom || sf < kMinSf || sf > kMaxSf) return -1;
+    static bench_buffers buffers;
+    bench_buffers* b = &buffers;
+    char cpu[LORA_WISDOM_CPU_LEN];
+    cpu_model(cpu, sizeof(cpu));
+    if (std::strcmp(cpu, wisdom->cpu) != 0) {
+        *wisdom = lora_wisdom();
+        std::memcpy(wisdom->cpu, cpu, sizeof(cpu));
+    }
+    lora_kernel_choice c;
+    c.deinterleave = tune_deinterleave(b, sf);
+    c.fec = tune_fec(b);
+    c.simd_detect = tune_detect(b, sf);
+    c.fft_radix = tune_fft(b, sf);
+    wisdom->choice[sf] = c;
+    wisdom->valid[sf] = true;
+    return 0;
+}
+
+int autotune_verify(unsigned sf) {
+    if (sf < kMinSf || sf > kMaxSf) return -1;
+    static bench_buffers buffers;
+    bench_buffers* b = &buffers;
+    bool ok = verify_deinterleave(b, sf) && verify_fec() && verify_detect(b, sf) &&
+              verify_fft(b, sf);
+    return ok ? 0 : -1;
+}
+
+// Text format, one spreading factor per line:
+//   cpu: <model name>
+//   sf7: deinterleave=transpose fec=simd detect=simd fft_radix=4
+namespace {
+
+const char* const kDeinterleaveNames[] = {"reference", "unrolled", "transpose"};
+const char* const kFecNames[] = {"scalar", "simd"};
+
+} // namespace
+
+int wisdom_save(const lora_wisdom* wisdom, const char* path) {
+    if (!wisdom || !path) return -1;
+    FILE* f = std::fopen(path, "w");
+    if (!f) return -1;
+    std::fprintf(f, "cpu: %s\n", wisdom->cpu);
+    for (unsigned sf = kMinSf; sf <= kMaxSf; ++sf) {
+        if (!wisdom->valid[sf]) continue;
+        const lora_kernel_choice& c = wisdom->choice[sf];
+        std::fprintf(f, "sf%u: deinterleave=%s fec=%s detect=%s fft_radix=%u\n", sf,
+                     kDeinterleaveNames[static_cast<int>(c.deinterleave)],
+                     kFecNames[static_cast<int>(c.fec)],
+                     c.simd_detect ? "simd" : "scalar", c.fft_radix);
+    }
+    return std::fclose(f) == 0 ? 0 : -1;
+}
+
+int wisdom_load(lora_wisdom* wisdom, const char* path) {
+    if (!wisdom || !path) return -1;
+    FILE* f = std::fopen(path, "r");
+    if (!f) return -1;
+    lora_wisdom w;
+    char line[256];
+    bool ok = std::fgets(line, sizeof(line), f) && std::strncmp(line, "cpu: ", 5) == 0;
+    if (ok) {
+        line[std::strcspn(line, "\r\n")] = '\0';
+        const size_t n = std::min(std::strlen(line + 5), sizeof(w.cpu) - 1);
+        std::memcpy(w.cpu, line + 5, n);
+        w.cpu[n] = '\0';
+        char cpu[LORA_WISDOM_CPU_LEN];
+        cpu_model(cpu, sizeof(cpu));
+        ok = std::strcmp(cpu, w.cpu) == 0;
+    }
+    while (ok && std::fgets(line, sizeof(line), f)) {
+        unsigned sf, radix;
+        char deint[16], fec[16], detect[16];
+        if (std::sscanf(line, "sf%u: deinterleave=%15s fec=%15s detect=%15s fft_radix=%u",
+                        &sf, deint, fec, detect, &radix) != 5 ||
+            sf < kMinSf || sf > kMaxSf || (radix != 2 && radix != 4)) {
+            ok = false;
+            break;
+        }
+        lora_kernel_choice& c = w.choice[sf];
+        int k = 0;
+        while (k < 3 && std::strcmp(deint, kDeinterleaveNames[k])) ++k;
+        int j = 0;
+        while (j < 2 && std::strcmp(fec, kFecNames[j])) ++j;
+        if (k == 3 || j == 2 || (std::strcmp(detect, "simd") && std::strcmp(detect, "scalar"))) {
+            ok = false;
+            break;
+        }
+        c.deinterleave = static_cast<deinterleave_kernel>(k);
+        c.fec = static_cast<fec_kernel>(j);
+        c.simd_detect = std::strcmp(detect, "simd") == 0;
+        c.fft_radix = radix;
+        w.valid[sf] = true;
+    }
+    std::fclose(f);
+    if (!ok) return -1;
+    *wisdom = w;
+    return 0;
+}
+
+int wisdom_prepare(lora_wisdom* wisdom, const char* path, const unsigned* sfs,
+                   size_t count) {
+    if (!wisdom || !path || (!sfs && count)) return -1;
+    if (wisdom_load(wisdom, path) != 0) *wisdom = lora_wisdom();
+    bool measured = false;
+    for (size_t i = 0; i < count; ++i) {
+        if (wisdom_find(wisdom, sfs[i])) continue;
+        if (autotune(wisdom, sfs[i]) != 0) return -1;
+        measured = true;
+    }
+    return measured ? wisdom_save(wisdom, path) : 0;
+}
+
+} // namespace lora_phy
@@ -0,0 +1,116 @@
+#include <lora_phy/LoRaCodes.hpp>
+#include <lora_phy/phy.hpp>
+
+#include <cstring>
+
+namespace lora_phy {
+
+namespace {
+
+// sx1272DataChecksum() keeps res' = T(res) ^ d, where T shifts the register
+// by eight bits through crc16sx().  T is linear, so eight bytes fold into
+//   res' = A8[res >> 8] ^ A7[res & 0xff] ^ A6[d0] ^ ... ^ A1[d5] ^ d6 << 8 ^ d7
+// with A_k[x] = T^k(x << 8).  The output mask comes from an 8-bit LFSR of
+// period 255 stepped once per byte, so it only depends on length % 255.  The
+// header checksum is linear in its 12 input bits and splits the same way.
+struct crc_tables {
+    static const size_t kMaskPeriod = 255;
+
+    uint16_t a[8][256];           ///< a[k - 1][x] = T^k(x << 8)
+    uint16_t mask[kMaskPeriod];   ///< final mask by length % 255
+    uint8_t  header0[256];        ///< header checksum contribution of h[0]
+    uint8_t  header1[16];         ///< contribution of the low nibble of h[1]
+
+    crc_tables() {
+        for (unsigned x = 0; x < 256; ++x) {
+            uint16_t s = static_cast<uint16_t>(x << 8);
+            for (unsigned k = 0; k < 8; ++k) {
+                s = crc16sx(s, 0x1021);
+                a[k][x] = s;
+            }
+        }
+        uint8_t v = 0xff;
+        for (size_t len = 0; len < kMaskPeriod; ++len) {
+            uint8_t next = static_cast<uint8_t>(xsum8(v & 0xB8) | (v << 1));
+            mask[len] = static_cast<uint16_t>(v | (next << 8));
+            v = next;
+        }
+        for (unsigned x = 0; x < 256; ++x) {
+            const uint8_t h[2] = {static_cast<uint8_t>(x), 0};
+            header0[x] = headerChecksum(h);
+        }
+        for (unsigned x = 0; x < 16; ++x) {
+            const uint8_t h[2] = {0, static_cast<uint8_t>(x)};
+            header1[x] = headerChecksum(h);
+        }
+    }
+};
+
+const crc_tables& tables() {
+    static const crc_tables t;
+    return t;
+}
+
+} // namespace
+
+void crc_init(lora_crc_state* st) {
+    if (!st) return;
+    st->res = 0;
+    st->length = 0;
+}
+
+void crc_update(lora_crc_state* st, const uint8_t* data, size_t len) {
+    if (!st || (!data && len)) return;
+    const crc_tables& t = tables();
+    uint16_t res = st->res;
+    size_t i = 0;
+    for (; i + 8 <= len; i += 8) {
+        const uint8_t* d = data + i;
+        res = static_cast<uint16_t>(
+            t.a[7][res >> 8] ^ t.a[6][res & 0xff] ^ t.a[5][d[0]] ^
+            t.a[4][d[1]] ^ t.a[3][d[2]] ^ t.a[2][d[3]] ^ t.a[1][d[4]] ^
+            t.a[0][d[5]] ^ (d[6] << 8) ^ d[7]);
+    }
+    for (; i < len; ++i)
+        res = static_cast<uint16_t>(t.a[0][res >> 8] ^ (res << 8) ^ data[i]);
+    st->res = res;
+    st->length += len;
+}
+
+uint16_t crc_final(const lora_crc_state* st) {
+    if (!st) return 0;
+    return static_cast<uint16_t>(
+        st->res ^ tables().mask[st->length % crc_tables::kMaskPeriod]);
+}
+
+uint16_t payload_crc(const uint8_t* data, size_t len) {
+    lora_crc_state st;
+    crc_init(&st);
+    crc_update(&st, data, len);
+    return crc_final(&st);
+}
+
+size_t crc_verify_bulk(const uint8_t* const* packets, const size_t* lengths,
+                       size_t count, bool* results) {
+    if (!packets || !lengths) return 0;
+    size_t passed = 0;
+    for (size_t i = 0; i < count; ++i) {
+        bool ok = false;
+        if (packets[i] && lengths[i] >= 2) {
+            const uint8_t* p = packets[i];
+            size_t n = lengths[i] - 2;
+            uint16_t provided = static_cast<uint16_t>(p[n] | (p[n + 1] << 8));
+            ok = payload_crc(p, n) == provided;
+        }
+        if (results) results[i] = ok;
+        passed += ok;
+    }
+    return passed;
+}
+
+uint8_t header_checksum(const uint8_t* h) {
+    const crc_tables& t = tables();
+    return static_cast<uint8_t>(t.header0[h[0]] ^ t.header1[h[1] & 0x0f]);
+}
+
+} // namespace lora_phy
@@ -5,6 +5,14 @@
 #include <cmath>
 #include <new>
 
+#ifdef LORA_PHY_STAGE_TIMERS
+#if defined(__x86_64__) || defined(__i386__)
+#include <x86intrin.h>
+#else
+#include <chrono>
+#endif
+#endif
+
 namespace lora_phy {
 
 void lora_demod_init(lora_demod_workspace* ws, unsigned sf,
@@ -46,36 +54,70 @@ void lora_demod_free(lora_demod_workspace* ws)
     ws->scratch_len = 0;
 }
 
-size_t lora_demodulate(lora_demod_workspace* ws,
-                       const std::complex<float>* samples, size_t sample_count,
-                       uint16_t* out_symbols, unsigned osr,
-                       uint8_t* out_sync)
-{
-    const size_t N = ws->N;                    // base samples per symbol
-    const size_t step = N * osr;                // oversampled samples per symbol
-    const size_t total_symbols = sample_count / step;
-    const bool have_sync = total_symbols >= 2;
+namespace {
 
-    // Ensure incoming samples fit within the canonical [-1.0, 1.0] range.
-    const std::complex<float>* norm_samples = samples;
-    float max_amp = 0.0f;
-    for (size_t i = 0; i < sample_count; ++i) {
-        float r = std::abs(samples[i].real());
-        float im = std::abs(samples[i].imag());
-        float m = std::max(r, im);
-        if (m > max_amp) max_amp = m;
-    }
-    if (max_amp > 1.0f) {
-        if (!ws->scratch || ws->scratch_len < sample_count) {
-            return 0;
-        }
-        float scale = 1.0f / max_amp;
-        for (size_t i = 0; i < sample_count; ++i) {
-            ws->scratch[i] = samples[i] * scale;
-        }
-        norm_samples = ws->scratch;
+#ifdef LORA_PHY_STAGE_TIMERS
+inline uint64_t stage_clock() {
+#if defined(__x86_64__) || defined(__i386__)
+    return __rdtsc();
+#else
+    return static_cast<uint64_t>(std::chrono::duration_cast<std::chrono::nanoseconds>(
+        std::chrono::steady_clock::now().time_since_epoch()).count());
+#endif
+}
+
+// Adds the time (and counter deltas) until the end of the enclosing scope to
+// one stage.
+class stage_scope {
+public:
+    stage_scope(lora_stage_times* t, demod_stage s)
+        : _t(t), _s(static_cast<size_t>(s)), _start(0) {
+        if (!_t) return;
+        if (_t->read_counters) _t->read_counters(_t->counter_ctx, _counters);
+        _start = stage_clock();
+    }
+    ~stage_scope() {
+        if (!_t) return;
+        _t->cycles[_s] += stage_clock() - _start;
+        ++_t->calls[_s];
+        if (!_t->read_counters) return;
+        uint64_t end[LORA_STAGE_COUNTERS];
+        _t->read_counters(_t->counter_ctx, end);
+        for (size_t k = 0; k < LORA_STAGE_COUNTERS; ++k)
+            _t->counters[_s][k] += end[k] - _counters[k];
     }
+private:
+    lora_stage_times* _t;
+    size_t _s;
+    uint64_t _start;
+    uint64_t _counters[LORA_STAGE_COUNTERS];
+};
+
+#define LORA_STAGE_CAT2(a, b) a##b
+#define LORA_STAGE_CAT(a, b) LORA_STAGE_CAT2(a, b)
+#define LORA_STAGE(ws, stage) \
+    stage_scope LORA_STAGE_CAT(stage_scope_, __LINE__)((ws)->stage_times, demod_stage::stage)
+#else
+#define LORA_STAGE(ws, stage) static_cast<void>(0)
+#endif
+
+// Expected sync-word bins for an N point FFT.
+void sync_bins(size_t N, uint8_t sync_word, size_t expected[2], unsigned& shift) {
+    unsigned sf_bits = 0;
+    for (size_t tmp = N; tmp > 1; tmp >>= 1) ++sf_bits;
+    shift = sf_bits > 4 ? (sf_bits - 4) : 0;
+    expected[0] = static_cast<size_t>(sync_word >> 4) << shift;
+    expected[1] = static_cast<size_t>(sync_word & 0x0f) << shift;
+}
 
+// Estimate CFO and timing from the two sync symbols into ws->metrics.  The
+// estimation symbols are first checked against the expected bins with
+// single-bin DFTs; the full FFT is only computed when the expected bin does
+// not dominate the window.
+void estimate_sync(lora_demod_workspace* ws, const std::complex<float>* samples,
+                   size_t total_symbols, unsigned osr, const size_t expected[2]) {
+    const size_t N = ws->N;
+    const size_t step = N * osr;
     const size_t est_syms = std::min(total_symbols, size_t(2));
     float sum_index = 0.0f;
     float phase_diff = 0.0f;
@@ -83,7 +125,7 @@ size_t lora_demodulate(lora_demod_workspace* ws,
     bool have_prev = false;
     unsigned sum_t = 0;
     for (size_t s = 0; s < est_syms; ++s) {
-        const std::complex<float>* sym_base = norm_samples + s * step;
+        const std::complex<float>* sym_base = samples + s * step;
         float best_p = -1e30f;
         size_t best_idx = 0;
         float best_fi = 0.0f;
@@ -97,7 +139,12 @@ size_t lora_demodulate(lora_demod_workspace* ws,
                 ws->detector->feed(i, samp);
             }
             float p, pav, findex;
-            size_t idx = ws->detector->detect(p, pav, findex);
+            size_t idx = expected[s];
+            std::complex<float> bin;
+            if (!verify_bin(ws->fft_in, N, idx, p, findex, &bin)) {
+                idx = ws->detector->detect(p, pav, findex);
+                bin = ws->fft_out[idx];
+            }
             if (p > best_p || (p == best_p && idx < best_idx)) {
                 // Select the lowest index on equal power to guarantee
                 // deterministic behaviour when multiple bins share the
@@ -106,7 +153,7 @@ size_t lora_demodulate(lora_demod_workspace* ws,
                 best_idx = idx;
                 best_fi = findex;
                 best_t = t;
-                best_bin = ws->fft_out[idx];
+                best_bin = bin;
             }
         }
         sum_t += best_t;
@@ -133,35 +180,105 @@ size_t lora_demodulate(lora_demod_workspace* ws,
     float avg_t = static_cast<float>(sum_t) / static_cast<float>(est_syms);
     ws->metrics.time_offset = avg_t -
                               frac * static_cast<float>(N) * static_cast<float>(osr);
+}
 
+// Load symbol @p s, timing and CFO corrected, into the detector input.
+void feed_symbol(lora_demod_workspace* ws, const std::complex<float>* samples,
+                 size_t sample_count, size_t s, unsigned osr) {
+    const size_t N = ws->N;
+    const size_t step = N * osr;
     int t_off = static_cast<int>(std::round(ws->metrics.time_offset));
     float rate = -2.0f * float(M_PI) * ws->metrics.cfo / static_cast<float>(N);
+    size_t base = s * step;
+    if (t_off > 0) {
+        if (base + size_t(t_off) + step <= sample_count)
+            base += size_t(t_off);
+    } else if (t_off < 0) {
+        size_t off = size_t(-t_off);
+        if (off <= base) base -= off;
+    }
+    const std::complex<float>* sym_samps = samples + base;
+    float start = rate * (static_cast<float>(s * N) +
+                          static_cast<float>(t_off) / static_cast<float>(osr));
+    for (size_t i = 0; i < N; ++i) {
+        float ph = start + rate * static_cast<float>(i);
+        float cs = std::cos(ph);
+        float sn = std::sin(ph);
+        std::complex<float> samp = sym_samps[i * osr] *
+                                   std::complex<float>(cs, sn);
+        if (ws->window_kind != window_type::window_none)
+            samp *= ws->window[i];
+        ws->detector->feed(i, samp);
+    }
+}
+
+} // namespace
+
+size_t lora_demodulate(lora_demod_workspace* ws,
+                       const std::complex<float>* samples, size_t sample_count,
+                       uint16_t* out_symbols, unsigned osr,
+                       uint8_t* out_sync)
+{
+    const size_t N = ws->N;                    // base samples per symbol
+    const size_t step = N * osr;                // oversampled samples per symbol
+    const size_t total_symbols = sample_count / step;
+    const bool have_sync = total_symbols >= 2;
+
+    // Ensure incoming samples fit within the canonical [-1.0, 1.0] range.
+    const std::complex<float>* norm_samples = samples;
+    {
+        LORA_STAGE(ws, normalize);
+        float max_amp = 0.0f;
+        for (size_t i = 0; i < sample_count; ++i) {
+            float r = std::abs(samples[i].real());
+            float im = std::abs(samples[i].imag());
+            float m = std::max(r, im);
+            if (m > max_amp) max_amp = m;
+        }
+        if (max_amp > 1.0f) {
+            if (!ws->scratch || ws->scratch_len < sample_count) {
+                return 0;
+            }
+            float scale = 1.0f / max_amp;
+            for (size_t i = 0; i < sample_count; ++i) {
+                ws->scratch[i] = samples[i] * scale;
+            }
+            norm_samples = ws->scratch;
+        }
+    }
+
+    size_t expected[2];
+    unsigned shift;
+    sync_bins(N, ws->sync_word, expected, shift);
+    {
+        LORA_STAGE(ws, offsets);
+        estimate_sync(ws, norm_samples, total_symbols, osr, expected);
+    }
+
     uint16_t sw0 = 0, sw1 = 0;
     size_t out_idx = 0;
     for (size_t s = 0; s < total_symbols; ++s) {
-        size_t base = s * step;
-        if (t_off > 0) {
-            if (base + size_t(t_off) + step <= sample_count)
-                base += size_t(t_off);
-        } else if (t_off < 0) {
-            size_t off = size_t(-t_off);
-            if (off <= base) base -= off;
-        }
-        const std::complex<float>* sym_samps = norm_samples + base;
-        float start = rate * (static_cast<float>(s * N) +
-                              static_cast<float>(t_off) / static_cast<float>(osr));
-        for (size_t i = 0; i < N; ++i) {
-            float ph = start + rate * static_cast<float>(i);
-            float cs = std::cos(ph);
-            float sn = std::sin(ph);
-            std::complex<float> samp = sym_samps[i * osr] *
-                                       std::complex<float>(cs, sn);
-            if (ws->window_kind != window_type::window_none)
-                samp *= ws->window[i];
-            ws->detector->feed(i, samp);
+        {
+            LORA_STAGE(ws, cfo);
+            feed_symbol(ws, norm_samples, sample_count, s, osr);
         }
         float p, pav, findex;
-        size_t idx = ws->detector->detect(p, pav, findex);
+        size_t idx;
+        bool verified;
+        {
+            // detect() split in two so the FFT and the peak search are
+            // timed separately.
+            LORA_STAGE(ws, fft);
+            verified = have_sync && s < 2 &&
+                       verify_bin(ws->fft_in, N, expected[s], p, findex);
+            if (!verified) ws->fft->transform(ws->fft_in, ws->fft_out);
+        }
+        if (!verified) {
+            LORA_STAGE(ws, argmax);
+            idx = ws->detector->detectBins(ws->fft_out, p, pav, findex);
+        } else {
+            idx = expected[s];
+        }
         if (have_sync) {
             if (s == 0)
                 sw0 = static_cast<uint16_t>(idx);
@@ -176,13 +293,6 @@ size_t lora_demodulate(lora_demod_workspace* ws,
 
     if (out_sync) {
         if (have_sync) {
-            unsigned sf_bits = 0;
-            size_t tmp = N;
-            while (tmp > 1) {
-                tmp >>= 1;
-                ++sf_bits;
-            }
-            unsigned shift = sf_bits > 4 ? (sf_bits - 4) : 0;
             uint8_t hi = static_cast<uint8_t>(sw0 >> shift) & 0x0f;
             uint8_t lo = static_cast<uint8_t>(sw1 >> shift) & 0x0f;
             *out_sync = static_cast<uint8_t>((hi << 4) | lo);
@@ -194,5 +304,111 @@ size_t lora_demodulate(lora_demod_workspace* ws,
     return have_sync ? out_idx : total_symbols;
 }
 
+size_t lora_demodulate_mrc(lora_demod_workspace* ws,
+                           const std::complex<float>* const* branches,
+                           size_t branch_count, size_t sample_count,
+                           uint16_t* out_symbols, unsigned osr,
+                           uint8_t* out_sync)
+{
+    if (!ws || !branches || !out_symbols || branch_count == 0 ||
+        branch_count > LORA_MAX_BRANCHES)
+        return 0;
+    const size_t N = ws->N;
+    const size_t step = N * osr;
+    const size_t total_symbols = sample_count / step;
+    if (total_symbols < 2) return 0;
+
+    size_t expected[2];
+    unsigned shift;
+    sync_bins(N, ws->sync_word, expected, shift);
+
+    // The streams share one clock, so timing and CFO come from the branch
+    // with the most energy in the sync symbols.
+    size_t ref = 0;
+    float best_energy = -1.0f;
+    for (size_t b = 0; b < branch_count; ++b) {
+        float e = 0.0f;
+        for (size_t i = 0; i < 2 * step; ++i) e += std::norm(branches[b][i]);
+        if (e > best_energy) {
+            best_energy = e;
+            ref = b;
+        }
+    }
+    estimate_sync(ws, branches[ref], total_symbols, osr, expected);
+
+    // Per-branch channel from the two sync symbols: the expected bin gives
+    // gain and phase, the remaining bins the noise power.  The transmitted
+    // phase of each symbol is removed by referring it to the reference
+    // branch, leaving only the branch's own rotation.
+    std::complex<float> peak[LORA_MAX_BRANCHES][2];
+    float noise[LORA_MAX_BRANCHES] = {};
+    for (size_t b = 0; b < branch_count; ++b) {
+        for (size_t s = 0; s < 2; ++s) {
+            feed_symbol(ws, branches[b], sample_count, s, osr);
+            ws->fft->transform(ws->fft_in, ws->fft_out);
+            float total = 0.0f;
+            for (size_t i = 0; i < N; ++i) total += std::norm(ws->fft_out[i]);
+            peak[b][s] = ws->fft_out[expected[s]];
+            noise[b] += std::max(0.0f, total - std::norm(peak[b][s])) /
+                        static_cast<float>(2 * (N - 1));
+        }
+    }
+    std::complex<float> weight[LORA_MAX_BRANCHES];
+    float max_weight = 0.0f;
+    for (size_t b = 0; b < branch_count; ++b) {
+        std::complex<float> h(0.0f, 0.0f);
+        for (size_t s = 0; s < 2; ++s) {
+            float r = std::abs(peak[ref][s]);
+            if (r > 0.0f) h += peak[b][s] * std::conj(peak[ref][s]) / r;
+        }
+        h *= 0.5f;
+        const float n = std::max(noise[b], 1e-20f);
+        // Per-sample SNR, i.e. without the FFT's N-fold processing gain.
+        ws->metrics.branch_snr[b] = 10.0f * std::log10(
+            std::max(std::norm(h), 1e-20f) / (n * static_cast<float>(N)));
+        weight[b] = std::conj(h) / n;
+        max_weight = std::max(max_weight, std::abs(weight[b]));
+    }
+    // Only the relative weights matter; keep the combined bins in range.
+    for (size_t b = 0; b < branch_count; ++b)
+        weight[b] = max_weight > 0.0f ? weight[b] / max_weight
+                                      : std::complex<float>(1.0f, 0.0f);
+    for (size_t b = branch_count; b < LORA_MAX_BRANCHES; ++b) ws->metrics.branch_snr[b] = 0.0f;
+    ws->metrics.branches = branch_count;
+
+    // Maximum-ratio combine the corrected branch samples, then pick the peak.
+    // The weights are flat across bins and the FFT is linear, so combining
+    // before the transform gives the combined spectrum for one FFT per symbol.
+    uint16_t sw0 = 0, sw1 = 0;
+    size_t out_idx = 0;
+    for (size_t s = 0; s < total_symbols; ++s) {
+        for (size_t b = 0; b < branch_count; ++b) {
+            feed_symbol(ws, branches[b], sample_count, s, osr);
+            const std::complex<float> w = weight[b];
+            if (b == 0) {
+                for (size_t i = 0; i < N; ++i) ws->combined[i] = w * ws->fft_in[i];
+            } else {
+                for (size_t i = 0; i < N; ++i) ws->combined[i] += w * ws->fft_in[i];
+            }
+        }
+        ws->fft->transform(ws->combined, ws->fft_out);
+        float p, pav, findex;
+        size_t idx = ws->detector->detectBins(ws->fft_out, p, pav, findex);
+        if (s == 0)
+            sw0 = static_cast<uint16_t>(idx);
+        else if (s == 1)
+            sw1 = static_cast<uint16_t>(idx);
+        else
+            out_symbols[out_idx++] = static_cast<uint16_t>(idx);
+    }
+
+    if (out_sync) {
+        uint8_t hi = static_cast<uint8_t>(sw0 >> shift) & 0x0f;
+        uint8_t lo = static_cast<uint8_t>(sw1 >> shift) & 0x0f;
+        *out_sync = static_cast<uint8_t>((hi << 4) | lo);
+    }
+    return out_idx;
+}
+
 } // namespace lora_phy
 
@@ -11,8 +11,8 @@ size_t lora_encode(const uint8_t* bytes, size_t byte_count,
     {
         uint8_t hi = bytes[i] >> 4;
         uint8_t lo = bytes[i] & 0x0f;
-        out_symbols[sym_idx++] = encodeHamming84sx(hi);
-        out_symbols[sym_idx++] = encodeHamming84sx(lo);
+        out_symbols[sym_idx++] = fecEncodeTable[4][hi];
+        out_symbols[sym_idx++] = fecEncodeTable[4][lo];
     }
     return sym_idx;
 }
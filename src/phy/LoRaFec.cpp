@@ -0,0 +1,192 @@
+#include <lora_phy/LoRaCodes.hpp>
+#include <lora_phy/phy.hpp>
+
+#ifdef __SSE2__
+#include <emmintrin.h>
+#endif
+
+#if (defined(__x86_64__) || defined(__i386__)) && defined(__GNUC__)
+#include <tmmintrin.h>
+#define LORA_FEC_SSSE3 1
+#endif
+
+namespace lora_phy {
+
+namespace {
+
+void encode_scalar(const uint8_t* nibbles, size_t count, uint8_t* codewords,
+                   unsigned rdd) {
+    const unsigned char* table = fecEncodeTable[rdd];
+    for (size_t i = 0; i < count; ++i) codewords[i] = table[nibbles[i] & 0x0f];
+}
+
+void decode_scalar(const uint8_t* codewords, size_t count, uint8_t* nibbles,
+                   unsigned rdd, lora_fec_stats* stats) {
+    const unsigned char* table = fecDecodeTable[rdd];
+    size_t corrected = 0, bad = 0;
+    for (size_t i = 0; i < count; ++i) {
+        unsigned char e = table[codewords[i]];
+        nibbles[i] = e & 0x0f;
+        corrected += (e & (FEC_DECODE_ERROR | FEC_DECODE_BAD)) == FEC_DECODE_ERROR;
+        bad += (e & FEC_DECODE_BAD) != 0;
+    }
+    if (stats) {
+        stats->corrected += corrected;
+        stats->uncorrectable += bad;
+    }
+}
+
+#ifdef LORA_FEC_SSSE3
+
+// Sixteen codewords per iteration: every table is 16 entries, so each lookup
+// is a single byte shuffle.
+__attribute__((target("ssse3")))
+void encode_ssse3(const uint8_t* nibbles, size_t count, uint8_t* codewords,
+                  unsigned rdd) {
+    const __m128i table = _mm_loadu_si128(
+        reinterpret_cast<const __m128i*>(fecEncodeTable[rdd]));
+    const __m128i low = _mm_set1_epi8(0x0f);
+    size_t i = 0;
+    for (; i + 16 <= count; i += 16) {
+        __m128i x = _mm_loadu_si128(reinterpret_cast<const __m128i*>(nibbles + i));
+        x = _mm_shuffle_epi8(table, _mm_and_si128(x, low));
+        _mm_storeu_si128(reinterpret_cast<__m128i*>(codewords + i), x);
+    }
+    encode_scalar(nibbles + i, count - i, codewords + i, rdd);
+}
+
+__attribute__((target("ssse3,popcnt")))
+void decode_ssse3(const uint8_t* codewords, size_t count, uint8_t* nibbles,
+                  unsigned rdd, lora_fec_stats* stats) {
+    const __m128i syn_lo = _mm_loadu_si128(
+        reinterpret_cast<const __m128i*>(fecSyndromeLoTable[rdd]));
+    const __m128i syn_hi = _mm_loadu_si128(
+        reinterpret_cast<const __m128i*>(fecSyndromeHiTable[rdd]));
+    const __m128i corr = _mm_loadu_si128(
+        reinterpret_cast<const __m128i*>(fecCorrectionTable[rdd]));
+    const __m128i fail = _mm_loadu_si128(
+        reinterpret_cast<const __m128i*>(fecBadTable[rdd]));
+    const __m128i low = _mm_set1_epi8(0x0f);
+    const __m128i zero = _mm_setzero_si128();
+    size_t corrected = 0, bad = 0;
+    size_t i = 0;
+    for (; i + 16 <= count; i += 16) {
+        __m128i b = _mm_loadu_si128(reinterpret_cast<const __m128i*>(codewords + i));
+        __m128i lo = _mm_and_si128(b, low);
+        __m128i hi = _mm_and_si128(_mm_srli_epi16(b, 4), low);
+        __m128i syn = _mm_xor_si128(_mm_shuffle_epi8(syn_lo, lo),
+                                    _mm_shuffle_epi8(syn_hi, hi));
+        __m128i out = _mm_and_si128(_mm_xor_si128(b, _mm_shuffle_epi8(corr, syn)), low);
+        _mm_storeu_si128(reinterpret_cast<__m128i*>(nibbles + i), out);
+        unsigned err = ~static_cast<unsigned>(_mm_movemask_epi8(_mm_cmpeq_epi8(syn, zero))) & 0xffffu;
+        unsigned fails = static_cast<unsigned>(_mm_movemask_epi8(_mm_shuffle_epi8(fail, syn)));
+        corrected += static_cast<size_t>(__builtin_popcount(err & ~fails));
+        bad += static_cast<size_t>(__builtin_popcount(fails));
+    }
+    if (stats) {
+        stats->corrected += corrected;
+        stats->uncorrectable += bad;
+    }
+    decode_scalar(codewords + i, count - i, nibbles + i, rdd, stats);
+}
+
+bool have_ssse3() {
+    static const bool supported =
+        __builtin_cpu_supports("ssse3") && __builtin_cpu_supports("popcnt");
+    return supported;
+}
+
+#endif
+
+// Codebook in antipodal form: sign[rdd][i][c] is +1 when bit i of the
+// codeword for nibble c is zero and -1 otherwise, so a candidate's
+// correlation with the received LLRs is a sum of products over its bits.
+struct soft_codebook {
+    float sign[5][8][16];
+
+    soft_codebook() {
+        for (unsigned rdd = 0; rdd <= 4; ++rdd)
+            for (unsigned i = 0; i < 8; ++i)
+                for (unsigned c = 0; c < 16; ++c)
+                    sign[rdd][i][c] = (fecEncodeTable[rdd][c] >> i) & 1 ? -1.0f : 1.0f;
+    }
+};
+
+const soft_codebook& codebook() {
+    static const soft_codebook t;
+    return t;
+}
+
+// Correlate one codeword's LLRs with all sixteen candidates.
+void correlate(const float (*sign)[16], const float* llr, unsigned bits,
+               float metric[16]) {
+#ifdef __SSE2__
+    __m128 acc[4] = {_mm_setzero_ps(), _mm_setzero_ps(), _mm_setzero_ps(),
+                     _mm_setzero_ps()};
+    for (unsigned i = 0; i < bits; ++i) {
+        const __m128 l = _mm_set1_ps(llr[i]);
+        for (unsigned q = 0; q < 4; ++q)
+            acc[q] = _mm_add_ps(acc[q], _mm_mul_ps(l, _mm_loadu_ps(sign[i] + 4 * q)));
+    }
+    for (unsigned q = 0; q < 4; ++q) _mm_storeu_ps(metric + 4 * q, acc[q]);
+#else
+    for (unsigned c = 0; c < 16; ++c) metric[c] = 0.0f;
+    for (unsigned i = 0; i < bits; ++i)
+        for (unsigned c = 0; c < 16; ++c) metric[c] += llr[i] * sign[i][c];
+#endif
+}
+
+} // namespace
+
+size_t fec_encode(const uint8_t* nibbles, size_t count, uint8_t* codewords,
+                  unsigned rdd, fec_kernel kernel) {
+    if (!nibbles || !codewords || rdd > 4) return 0;
+#ifdef LORA_FEC_SSSE3
+    if (kernel == fec_kernel::simd && have_ssse3()) {
+        encode_ssse3(nibbles, count, codewords, rdd);
+        return count;
+    }
+#else
+    (void)kernel;
+#endif
+    encode_scalar(nibbles, count, codewords, rdd);
+    return count;
+}
+
+size_t fec_decode(const uint8_t* codewords, size_t count, uint8_t* nibbles,
+                  unsigned rdd, lora_fec_stats* stats, fec_kernel kernel) {
+    if (!codewords || !nibbles || rdd > 4) return 0;
+#ifdef LORA_FEC_SSSE3
+    if (kernel == fec_kernel::simd && have_ssse3()) {
+        decode_ssse3(codewords, count, nibbles, rdd, stats);
+        return count;
+    }
+#else
+    (void)kernel;
+#endif
+    decode_scalar(codewords, count, nibbles, rdd, stats);
+    return count;
+}
+
+size_t fec_decode_soft(const float* llrs, size_t count, uint8_t* nibbles,
+                       unsigned rdd, lora_fec_stats* stats) {
+    if (!llrs || !nibbles || rdd > 4) return 0;
+    const unsigned bits = 4 + rdd;
+    const float (*sign)[16] = codebook().sign[rdd];
+    size_t corrected = 0;
+    float metric[16];
+    for (size_t n = 0; n < count; ++n, llrs += bits) {
+        correlate(sign, llrs, bits, metric);
+        unsigned best = 0;
+        for (unsigned c = 1; c < 16; ++c)
+            if (metric[c] > metric[best]) best = c;
+        unsigned hard = 0;
+        for (unsigned i = 0; i < bits; ++i) hard |= (llrs[i] < 0.0f ? 1u : 0u) << i;
+        nibbles[n] = static_cast<uint8_t>(best);
+        corrected += fecEncodeTable[rdd][best] != hard;
+    }
+    if (stats) stats->corrected += corrected;
+    return count;
+}
+
+} // namespace lora_phy
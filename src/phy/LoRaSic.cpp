@@ -0,0 +1,180 @@
+#include <lora_phy/ChirpGenerator.hpp>
+#include <lora_phy/phy.hpp>
+
+#include <algorithm>
+#include <cmath>
+#include <cstdlib>
+#include <cstring>
+
+namespace lora_phy {
+
+namespace {
+
+// sum(y[i + delay] * conj(r[i])) over the overlap of the two buffers.
+std::complex<float> correlate(const std::complex<float>* y, size_t y_len,
+                              const std::complex<float>* r, size_t r_len,
+                              int delay, float omega) {
+    std::complex<double> acc(0.0, 0.0);
+    for (size_t i = 0; i < r_len; ++i) {
+        long k = static_cast<long>(i) + delay;
+        if (k < 0 || static_cast<size_t>(k) >= y_len) continue;
+        std::complex<float> ri = r[i];
+        if (omega != 0.0f) ri *= std::polar(1.0f, omega * static_cast<float>(i));
+        acc += std::complex<double>(y[k] * std::conj(ri));
+    }
+    return std::complex<float>(acc);
+}
+
+// Sum over the replica's symbols of |correlation|^2 at @p delay.  Each symbol
+// correlates fully only when its boundaries line up with the packet's, and
+// dropping the phase between symbols makes the sum insensitive to CFO.
+double symbol_energy(const std::complex<float>* y, size_t y_len,
+                     const std::complex<float>* r, size_t r_len, size_t step,
+                     long delay) {
+    double e = 0.0;
+    for (size_t s = 0; s * step < r_len; ++s)
+        e += std::norm(correlate(y, y_len, r + s * step, step,
+                                 static_cast<int>(delay + static_cast<long>(s * step)),
+                                 0.0f));
+    return e;
+}
+
+} // namespace
+
+size_t sic_receive(lora_sic* sic, lora_workspace* ws,
+                   lora_demod_workspace* dws,
+                   std::complex<float>* samples, size_t sample_count,
+                   uint16_t* symbols, size_t symbol_cap,
+                   lora_sic_packet* packets, size_t max_packets) {
+    if (!sic || !ws || !dws || !dws->detector || !samples || !symbols || !packets)
+        return 0;
+    const size_t N = dws->N;
+    const unsigned osr = ws->osr ? ws->osr : 1u;
+    const size_t step = N * osr;
+    const size_t total_symbols = sample_count / step;
+    if (total_symbols < 2 || symbol_cap < total_symbols - 2) return 0;
+    unsigned sf = 0;
+    while ((size_t(1) << sf) < N) ++sf;
+
+    size_t decoded = 0;
+    for (size_t p = 0; p < max_packets; ++p) {
+        lora_sic_packet& pkt = packets[p];
+        pkt.length = -1;
+        pkt.cancelled = p > 0;
+        // The demodulator expects the sync word at the start of its input, so
+        // look for the packet every half symbol, where it is never more than a
+        // quarter symbol off; two symbols are checked for the sync word before
+        // the rest is demodulated.
+        const size_t hop = step / 2;
+        size_t start = 0;
+        ssize_t len = -1;
+        for (; start + 2 * step <= sample_count; start += hop) {
+            const std::complex<float>* at = samples + start;
+            uint8_t sync = 0;
+            lora_demodulate(dws, at, 2 * step, symbols, osr, &sync);
+            if (sync != dws->sync_word) continue;
+            size_t n = lora_demodulate(dws, at, sample_count - start, symbols, osr);
+            if (n == 0) continue;
+            len = decode(ws, symbols, n, pkt.payload, pkt.capacity);
+            if (len >= 0 && ws->metrics.crc_ok) break;
+            len = -1;
+        }
+        if (len < 0) break;
+        const long seed = static_cast<long>(start) +
+                          std::lround(dws->metrics.time_offset);
+        // An earlier packet decoded again where it was fitted was not
+        // cancelled; stop rather than report it twice.  The same payload
+        // elsewhere is a retransmission and is kept.
+        bool repeat = false;
+        for (size_t q = 0; q < p && !repeat; ++q)
+            repeat = packets[q].length == len &&
+                     std::labs(seed - packets[q].delay) <= static_cast<long>(step / 2) &&
+                     std::memcmp(packets[q].payload, pkt.payload, static_cast<size_t>(len)) == 0;
+        if (repeat) break;
+        pkt.length = len;
+        ++decoded;
+        ++sic->packets;
+        if (pkt.cancelled) ++sic->recovered;
+        if (p + 1 == max_packets) break;
+
+        // Rebuild the packet as transmitted, dechirped like the input, with
+        // the coding rate and CRC flag its header carried.  The replica and
+        // one downchirp period live in the demod scratch buffer.
+        const unsigned cr = ws->cr;
+        const bool crc = ws->crc;
+        ws->cr = ws->metrics.frame_cr;
+        ws->crc = ws->metrics.frame_crc;
+        ssize_t m = encode(ws, pkt.payload, static_cast<size_t>(len), symbols,
+                           symbol_cap);
+        ws->cr = cr;
+        ws->crc = crc;
+        if (m < 0) break;
+        const size_t ref_len = (static_cast<size_t>(m) + 2) * step;
+        if (!dws->scratch || dws->scratch_len < ref_len + step) break;
+        std::complex<float>* ref = dws->scratch;
+        std::complex<float>* down = dws->scratch + ref_len;
+        lora_modulate(symbols, static_cast<size_t>(m), ref, sf, osr, ws->bw, 1.0f,
+                      dws->sync_word);
+        float phase = 0.0f;
+        genChirp(down, static_cast<int>(N), static_cast<int>(osr),
+                 static_cast<int>(step), 0.0f, true, 1.0f, phase, bw_scale(ws->bw));
+        double energy = 0.0;
+        for (size_t i = 0; i < ref_len; ++i) {
+            ref[i] *= down[i % step];
+            energy += std::norm(ref[i]);
+        }
+
+        // Integer timing.  The demodulator only pins the packet to where it
+        // was found: symbols still decode up to half a symbol off.  Search
+        // that range plus max_delay on a coarse grid, then binary search the
+        // slope of the single peak around the best point.
+        const long half = static_cast<long>(step / 2) + std::max(sic->max_delay, 0);
+        const long stride = std::max(static_cast<long>(step / 16), 1L);
+        long delay = seed;
+        double best = -1.0;
+        for (long d = seed - half; d <= seed + half; d += stride) {
+            double e = symbol_energy(samples, sample_count, ref, ref_len, step, d);
+            if (e > best) {
+                best = e;
+                delay = d;
+            }
+        }
+        long lo = std::max(delay - stride, seed - half);
+        long hi = std::min(delay + stride, seed + half);
+        while (lo < hi) {
+            const long mid = lo + (hi - lo) / 2;
+            if (symbol_energy(samples, sample_count, ref, ref_len, step, mid) <
+                symbol_energy(samples, sample_count, ref, ref_len, step, mid + 1))
+                lo = mid + 1;
+            else
+                hi = mid;
+        }
+        delay = lo;
+        // CFO from the phase advance between per-symbol correlations, then
+        // the complex amplitude by least squares with that CFO applied.
+        std::complex<float> prev(0.0f, 0.0f), drift(0.0f, 0.0f);
+        for (size_t s = 0; s * step < ref_len; ++s) {
+            std::complex<float> c =
+                correlate(samples, sample_count, ref + s * step, step,
+                          static_cast<int>(delay + static_cast<long>(s * step)), 0.0f);
+            if (s > 0) drift += c * std::conj(prev);
+            prev = c;
+        }
+        const float omega = std::arg(drift) / static_cast<float>(step);
+        const std::complex<float> amp =
+            correlate(samples, sample_count, ref, ref_len, static_cast<int>(delay), omega) /
+            static_cast<float>(energy);
+
+        for (size_t i = 0; i < ref_len; ++i) {
+            long k = static_cast<long>(i) + delay;
+            if (k < 0 || static_cast<size_t>(k) >= sample_count) continue;
+            samples[k] -= amp * ref[i] * std::polar(1.0f, omega * static_cast<float>(i));
+        }
+        pkt.amplitude = amp;
+        pkt.cfo = omega;
+        pkt.delay = static_cast<int>(delay);
+    }
+    return decoded;
+}
+
+} // namespace lora_phy
@@ -0,0 +1,88 @@
+#include <lora_phy/phy.hpp>
+
+#include <algorithm>
+#include <cmath>
+
+#ifdef __SSE2__
+#include <emmintrin.h>
+#endif
+
+namespace lora_phy {
+
+namespace {
+
+// Bin magnitudes |X_k| into @p mag.
+void magnitudes(const std::complex<float>* bins, size_t N, float* mag) {
+    const float* x = reinterpret_cast<const float*>(bins);
+    size_t k = 0;
+#ifdef __SSE2__
+    for (; k + 4 <= N; k += 4) {
+        __m128 a = _mm_loadu_ps(x + 2 * k);
+        __m128 b = _mm_loadu_ps(x + 2 * k + 4);
+        a = _mm_mul_ps(a, a);
+        b = _mm_mul_ps(b, b);
+        __m128 re = _mm_shuffle_ps(a, b, _MM_SHUFFLE(2, 0, 2, 0));
+        __m128 im = _mm_shuffle_ps(a, b, _MM_SHUFFLE(3, 1, 3, 1));
+        _mm_storeu_ps(mag + k, _mm_sqrt_ps(_mm_add_ps(re, im)));
+    }
+#endif
+    for (; k < N; ++k) mag[k] = std::abs(bins[k]);
+}
+
+// Largest value of each lane over @p L entries, L a multiple of four.
+void lane_max(const float* v, size_t L, float out[4]) {
+#ifdef __SSE2__
+    __m128 acc = _mm_loadu_ps(v);
+    for (size_t j = 4; j < L; j += 4) acc = _mm_max_ps(acc, _mm_loadu_ps(v + j));
+    _mm_storeu_ps(out, acc);
+#else
+    for (size_t l = 0; l < 4; ++l) out[l] = v[l];
+    for (size_t j = 4; j < L; j += 4)
+        for (size_t l = 0; l < 4; ++l) out[l] = std::max(out[l], v[j + l]);
+#endif
+}
+
+// v[j] = max(v[2j], v[2j+1]) for j < L/2, in place.
+void pair_max(float* v, size_t L) {
+    size_t j = 0;
+#ifdef __SSE2__
+    for (; 2 * j + 8 <= L; j += 4) {
+        __m128 a = _mm_loadu_ps(v + 2 * j);
+        __m128 b = _mm_loadu_ps(v + 2 * j + 4);
+        __m128 even = _mm_shuffle_ps(a, b, _MM_SHUFFLE(2, 0, 2, 0));
+        __m128 odd = _mm_shuffle_ps(a, b, _MM_SHUFFLE(3, 1, 3, 1));
+        _mm_storeu_ps(v + j, _mm_max_ps(even, odd));
+    }
+#endif
+    for (; 2 * j < L; ++j) v[j] = std::max(v[2 * j], v[2 * j + 1]);
+}
+
+} // namespace
+
+// Bit b of the Gray label k ^ (k >> 1) is one exactly for the blocks of 2^b
+// bins whose index is 1 or 2 modulo 4.  Reducing the magnitudes pairwise one
+// level per bit therefore yields every max-log term with O(N) work in total
+// instead of a pass over all N bins per bit.
+void symbol_llrs(const std::complex<float>* bins, unsigned sf, float* llrs,
+                 float* scratch) {
+    if (!bins || !llrs || !scratch || sf == 0) return;
+    const size_t N = size_t(1) << sf;
+    magnitudes(bins, N, scratch);
+    size_t L = N;
+    for (unsigned b = 0; b < sf; ++b, L >>= 1) {
+        float max0, max1;
+        if (L >= 4) {
+            float m[4];
+            lane_max(scratch, L, m);
+            max0 = std::max(m[0], m[3]);
+            max1 = std::max(m[1], m[2]);
+        } else {
+            max0 = scratch[0];
+            max1 = scratch[1];
+        }
+        llrs[b] = max0 - max1;
+        pair_max(scratch, L);
+    }
+}
+
+} // namespace lora_phy
@@ -0,0 +1,338 @@
+#include <lora_phy/phy.hpp>
+#include <lora_phy/ChirpGenerator.hpp>
+#include "workspace_access.hpp"
+
+#include <algorithm>
+#include <cmath>
+
+namespace lora_phy {
+
+namespace {
+
+// Shared state for the sliding DFT.  Dechirping the window that starts one
+// sample later is equivalent to dechirping the current window, dropping the
+// oldest sample, appending the newest one and shifting the spectrum by
+// ``shift`` bins.  The spectrum Y[m] of a window is therefore stored as
+// Y[m] = P * z[(m - R) % N] with P = exp(j * theta * count) and
+// R = shift * count, so that each advance costs one complex multiply-add per
+// bin and needs no copy.
+struct sliding_dft {
+    size_t N{};
+    unsigned osr{};
+    unsigned shift{};                           ///< bins moved per sample
+    float theta{};                              ///< phase advance per sample
+    const std::complex<float>* chirp{};         ///< N reference downchirp samples
+    std::complex<float> chirp_end;              ///< downchirp extended to sample N
+    const std::complex<float>* rot{};           ///< N twiddles exp(+j2*pi*m/N)
+    const kissfft<float>* fft{};
+    std::complex<float>* fft_in{};
+};
+
+struct sliding_window {
+    std::complex<float>* z{}; ///< N rotated bins
+    size_t count{};           ///< shifts since the last anchor
+};
+
+// Ratio between the strongest bin and the mean bin power of a spectrum.
+static float peak_to_average(const std::complex<float>* bins, size_t n,
+                             size_t& peak_idx) {
+    float peak = 0.0f, total = 0.0f;
+    peak_idx = 0;
+    for (size_t i = 0; i < n; ++i) {
+        float p = std::norm(bins[i]);
+        total += p;
+        if (p > peak) {
+            peak = p;
+            peak_idx = i;
+        }
+    }
+    return total > 0.0f ? peak * static_cast<float>(n) / total : 0.0f;
+}
+
+// Fraction of the window energy held by its strongest bin.
+static float concentration(float peak, float total) {
+    return total > 0.0f ? peak / total : 0.0f;
+}
+
+// Recompute the window spectrum from scratch with a full FFT.
+static float anchor(const sliding_dft& s, sliding_window& w,
+                    const std::complex<float>* x) {
+    for (size_t i = 0; i < s.N; ++i)
+        s.fft_in[i] = x[i * s.osr] * s.chirp[i];
+    s.fft->transform(s.fft_in, w.z);
+    w.count = 0;
+    float peak = 0.0f, total = 0.0f;
+    for (size_t i = 0; i < s.N; ++i) {
+        float p = std::norm(w.z[i]);
+        total += p;
+        if (p > peak) peak = p;
+    }
+    return concentration(peak, total);
+}
+
+// Advance the window starting at @p x by one (oversampled) sample.
+static float slide(const sliding_dft& s, sliding_window& w,
+                   const std::complex<float>* x) {
+    const std::complex<float> oldest = x[0] * s.chirp[0];
+    const std::complex<float> newest = x[s.N * s.osr] * s.chirp_end;
+    const float ph = std::fmod(s.theta * static_cast<float>(w.count),
+                               2.0f * float(M_PI));
+    const std::complex<float> delta =
+        (newest - oldest) * std::polar(1.0f, -ph);
+    ++w.count;
+    const size_t mask = s.N - 1;
+    const size_t r = (w.count * s.shift) & mask;
+    float peak = 0.0f, total = 0.0f;
+    for (size_t j = 0; j < s.N; ++j) {
+        std::complex<float> v = s.rot[(j + r) & mask] * (w.z[j] + delta);
+        w.z[j] = v;
+        float p = std::norm(v);
+        total += p;
+        if (p > peak) peak = p;
+    }
+    return concentration(peak, total);
+}
+
+} // namespace
+
+int refine_timing(lora_workspace* ws,
+                  const std::complex<float>* samples, size_t sample_count,
+                  size_t search, unsigned reanchor) {
+    if (!ws || !samples || !ws->sdft_bins || !ws->fft_in || !ws->fft_out)
+        return -1;
+    unsigned sf = deduce_sf(ws);
+    unsigned osr = get_osr(ws);
+    size_t N = size_t(1) << sf;
+    size_t step = N * osr;
+    if (sample_count < 2 * step || search == 0) return -1;
+    if (reanchor == 0) reanchor = 1;
+
+    // Candidate window starts keep both sync symbols and the sample needed
+    // for the next slide inside the buffer.
+    const size_t last = sample_count - 2 * step;
+    long first = std::lround(ws->metrics.time_offset) -
+                 static_cast<long>(search / 2);
+    if (first < 0) first = 0;
+    const size_t begin = std::min(static_cast<size_t>(first), last);
+    const size_t end = std::min(begin + search, last + 1);
+
+    const float bw_scale = lora_phy::bw_scale(ws->bw);
+    float tmp = 0.0f;
+    genChirp(ws->fft_out, static_cast<int>(N), 1, static_cast<int>(N),
+             0.0f, true, 1.0f, tmp, bw_scale);
+    const float f_min = -float(M_PI) * bw_scale;
+    const float f_step = 2.0f * float(M_PI) * bw_scale / static_cast<float>(N);
+
+    kissfft<float> fft(fwd_plan(ws));
+    sliding_dft s;
+    s.N = N;
+    s.osr = osr;
+    s.shift = static_cast<unsigned>(bw_scale);
+    s.theta = f_min + f_step;
+    s.chirp = ws->fft_out;
+    s.chirp_end = ws->fft_out[N - 1] *
+                  std::polar(1.0f, -(f_min + static_cast<float>(N + 1) * f_step));
+    s.rot = inv_plan(ws).twiddles;
+    s.fft = &fft;
+    s.fft_in = ws->fft_in;
+
+    sliding_window w0, w1;
+    w0.z = ws->sdft_bins;
+    w1.z = ws->sdft_bins + N;
+
+    float best_score = -1.0f;
+    size_t best_k = begin;
+    for (unsigned p = 0; p < osr && begin + p < end; ++p) {
+        size_t k = begin + p;
+        float score = anchor(s, w0, samples + k) +
+                      anchor(s, w1, samples + k + step);
+        for (size_t n = 1;; ++n) {
+            if (score > best_score || (score == best_score && k < best_k)) {
+                best_score = score;
+                best_k = k;
+            }
+            if (k + osr >= end) break;
+            const size_t prev = k;
+            k += osr;
+            if (n % reanchor == 0) {
+                score = anchor(s, w0, samples + k) +
+                        anchor(s, w1, samples + k + step);
+            } else {
+                score = slide(s, w0, samples + prev) +
+                        slide(s, w1, samples + prev + step);
+            }
+        }
+    }
+
+    ws->metrics.time_offset = static_cast<float>(best_k);
+    return 0;
+}
+
+std::complex<float> goertzel_bin(const std::complex<float>* x, size_t N,
+                                 size_t bin) {
+    const float w = 2.0f * float(M_PI) * static_cast<float>(bin) /
+                    static_cast<float>(N);
+    const float coeff = 2.0f * std::cos(w);
+    std::complex<float> s1(0.0f, 0.0f), s2(0.0f, 0.0f);
+    for (size_t n = 0; n < N; ++n) {
+        std::complex<float> s0 = x[n] + coeff * s1 - s2;
+        s2 = s1;
+        s1 = s0;
+    }
+    // X[k] = exp(jw) * s[N-1] - s[N-2] since exp(-jwN) == 1 for integer bins.
+    return std::polar(1.0f, w) * s1 - s2;
+}
+
+bool verify_bin(const std::complex<float>* x, size_t N, size_t bin,
+                float& power, float& fIndex, std::complex<float>* value,
+                float min_fraction) {
+    if (!x || N == 0) return false;
+    bin %= N;
+    const size_t left_bin = bin > 0 ? bin - 1 : N - 1;
+    const size_t right_bin = bin < N - 1 ? bin + 1 : 0;
+    const float w = 2.0f * float(M_PI) / static_cast<float>(N);
+    const float wc = w * static_cast<float>(bin);
+    const float wl = w * static_cast<float>(left_bin);
+    const float wr = w * static_cast<float>(right_bin);
+    const float cc = 2.0f * std::cos(wc);
+    const float cl = 2.0f * std::cos(wl);
+    const float cr = 2.0f * std::cos(wr);
+
+    // Three Goertzel recursions and the window energy in a single pass.
+    std::complex<float> c1(0.0f, 0.0f), c2(0.0f, 0.0f);
+    std::complex<float> l1(0.0f, 0.0f), l2(0.0f, 0.0f);
+    std::complex<float> r1(0.0f, 0.0f), r2(0.0f, 0.0f);
+    double energy = 0.0;
+    for (size_t n = 0; n < N; ++n) {
+        const std::complex<float> v = x[n];
+        energy += std::norm(v);
+        std::complex<float> c0 = v + cc * c1 - c2;
+        c2 = c1;
+        c1 = c0;
+        std::complex<float> l0 = v + cl * l1 - l2;
+        l2 = l1;
+        l1 = l0;
+        std::complex<float> r0 = v + cr * r1 - r2;
+        r2 = r1;
+        r1 = r0;
+    }
+    const std::complex<float> center = std::polar(1.0f, wc) * c1 - c2;
+    const float peak = std::norm(center);
+    // Parseval: the spectrum holds N times the time-domain energy.
+    const double total = energy * static_cast<double>(N);
+    if (total <= 0.0 || peak <= min_fraction * total) return false;
+
+    const float fundamental = std::sqrt(peak);
+    const float left = std::abs(std::polar(1.0f, wl) * l1 - l2);
+    const float right = std::abs(std::polar(1.0f, wr) * r1 - r2);
+    power = 20.0f * std::log10(fundamental) -
+            20.0f * std::log10(static_cast<float>(N));
+    const float demon = (2.0f * fundamental) - right - left;
+    fIndex = demon == 0.0f ? 0.0f : 0.5f * (right - left) / demon;
+    if (value) *value = center;
+    return true;
+}
+
+int preamble_search_init(lora_preamble_search* s, const lora_workspace* ws) {
+    if (!s || !ws || fwd_plan(ws).nfft <= 0) return -1;
+    size_t N = static_cast<size_t>(fwd_plan(ws).nfft);
+    unsigned decim = s->decim < 2 ? 2u : s->decim;
+    while (decim > 2 && N / decim < 16) decim >>= 1;
+    if (N / decim < 2) return -1;
+    s->decim = decim;
+    s->coarse_n = N / decim;
+    kissfft<float>::init(s->coarse_plan, static_cast<int>(s->coarse_n), false);
+    s->windows = 0;
+    s->promoted = 0;
+    s->detections = 0;
+    s->false_alarms = 0;
+    s->missed = 0;
+    return 0;
+}
+
+ssize_t preamble_search(lora_preamble_search* s, lora_workspace* ws,
+                        const std::complex<float>* samples,
+                        size_t sample_count) {
+    if (!s || !ws || !samples || !ws->fft_in || !ws->fft_out ||
+        s->coarse_n == 0)
+        return -1;
+    unsigned sf = deduce_sf(ws);
+    unsigned osr = get_osr(ws);
+    size_t N = size_t(1) << sf;
+    size_t step = N * osr;
+    size_t total_windows = sample_count / step;
+    unsigned need = s->min_symbols ? s->min_symbols : 1u;
+
+    kissfft<float> coarse_fft(s->coarse_plan);
+    kissfft<float> fft(fwd_plan(ws));
+    const float* window = analysis_window(ws);
+    LoRaDetector<float> detector(N, ws->fft_in, ws->fft_out, fft);
+
+    size_t run_start = 0;
+    unsigned run_len = 0;
+    size_t run_bin = 0;
+    for (size_t w = 0; w < total_windows; ++w) {
+        const std::complex<float>* win = samples + w * step;
+        ++s->windows;
+
+        // Coarse pass: every decim-th sample of the window through a short FFT.
+        // A dechirped tone on bin b lands on bin b mod coarse_n.
+        const size_t cstride = size_t(s->decim) * osr;
+        for (size_t i = 0; i < s->coarse_n; ++i)
+            s->coarse_in[i] = win[i * cstride];
+        coarse_fft.transform(s->coarse_in, s->coarse_out);
+        size_t coarse_idx;
+        bool flagged =
+            peak_to_average(s->coarse_out, s->coarse_n, coarse_idx) >=
+            s->coarse_par;
+        if (flagged) ++s->promoted;
+
+        bool confirmed = false;
+        size_t bin = 0;
+        if (flagged || s->audit) {
+            for (size_t i = 0; i < N; ++i) {
+                std::complex<float> samp = win[i * osr];
+                if (ws->window_kind != window_type::window_none && window)
+                    samp *= window[i];
+                detector.feed(i, samp);
+            }
+            float p, pav, findex;
+            bin = detector.detect(p, pav, findex);
+            bool fine = peak_to_average(ws->fft_out, N, bin) >= s->fine_par;
+            if (flagged) {
+                if (fine) ++s->detections;
+                else ++s->false_alarms;
+            } else if (fine) {
+                ++s->missed;
+            }
+            confirmed = flagged && fine;
+        }
+
+        if (!confirmed) {
+            run_len = 0;
+            continue;
+        }
+        size_t diff = (bin + N - run_bin) % N;
+        if (run_len > 0 && (diff <= 1 || diff == N - 1)) {
+            ++run_len;
+        } else {
+            run_start = w;
+            run_len = 1;
+        }
+        run_bin = bin;
+        if (run_len >= need) {
+            estimate_offsets(ws, samples + run_start * step, need * step);
+            return static_cast<ssize_t>(run_start * step);
+        }
+    }
+    return -1;
+}
+
+float preamble_detection_probability(const lora_preamble_search* s) {
+    if (!s) return 0.0f;
+    size_t seen = s->detections + s->missed;
+    if (seen == 0) return 1.0f;
+    return static_cast<float>(s->detections) / static_cast<float>(seen);
+}
+
+} // namespace lora_phy
@@ -0,0 +1,269 @@
+#include <lora_phy/phy.hpp>
+#include "table_cache_access.hpp"
+
+#include <cstdio>
+#include <cstring>
+
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+namespace lora_phy {
+
+namespace {
+
+const char kMagic[8] = {'L', 'O', 'R', 'A', 'T', 'B', 'L', '\0'};
+
+// On-disk header.  The entry index follows at index_offset; each index record
+// points at that entry's tables, which are sized to its own N and aligned for
+// direct use from the mapping.
+struct cache_header {
+    char     magic[8];
+    uint32_t version;
+    uint32_t record_size;
+    uint64_t count;
+    uint64_t index_checksum;
+    uint64_t index_offset;
+};
+
+// kissfft_plan without its twiddles, which live with the entry's tables.
+struct cache_plan {
+    int32_t nfft;
+    int32_t inverse;
+    int32_t stages;
+    int32_t radix[kissfft_utils::KISSFFT_MAX_FACTORS];
+    int32_t remainder[kissfft_utils::KISSFFT_MAX_FACTORS];
+};
+
+// One index record.  The tables at offset hold the forward and inverse
+// twiddles, the downchirp and the window, N elements each, zero padded to
+// size; checksum covers all size bytes.
+struct cache_record {
+    lora_params        params;
+    lora_kernel_choice kernels;
+    cache_plan         fwd;
+    cache_plan         inv;
+    uint64_t           offset;
+    uint64_t           size;
+    uint64_t           checksum;
+};
+
+const uint64_t kIndexOffset = 64;
+const uint64_t kAlign = 64;
+static_assert(sizeof(cache_header) <= kIndexOffset, "header exceeds index offset");
+static_assert(sizeof(cache_record) % 8 == 0, "index records are hashed by word");
+
+// 64-bit FNV-1a over whole words; @p n is a multiple of eight.
+static uint64_t fnv1a(uint64_t h, const void* p, size_t n) {
+    const unsigned char* bytes = static_cast<const unsigned char*>(p);
+    for (size_t i = 0; i < n; i += 8) {
+        uint64_t w;
+        std::memcpy(&w, bytes + i, sizeof(w));
+        h ^= w;
+        h *= 0x100000001b3ull;
+    }
+    return h;
+}
+
+const uint64_t kFnvBasis = 0xcbf29ce484222325ull;
+
+static uint64_t align_up(uint64_t n) { return (n + kAlign - 1) / kAlign * kAlign; }
+
+// Bytes of tables for a spreading factor, before padding.
+static uint64_t table_bytes(unsigned sf) {
+    const uint64_t N = uint64_t(1) << sf;
+    return N * (3 * sizeof(std::complex<float>) + sizeof(float));
+}
+
+static void pack_plan(cache_plan& out, const kissfft_plan<float>& plan) {
+    out.nfft = plan.nfft;
+    out.inverse = plan.inverse ? 1 : 0;
+    out.stages = plan.stages;
+    for (size_t i = 0; i < kissfft_utils::KISSFFT_MAX_FACTORS; ++i) {
+        out.radix[i] = plan.stageRadix[i];
+        out.remainder[i] = plan.stageRemainder[i];
+    }
+}
+
+static void unpack_plan(kissfft_plan<float>& out, const cache_plan& plan,
+                        const std::complex<float>* twiddles) {
+    out.nfft = plan.nfft;
+    out.inverse = plan.inverse != 0;
+    out.stages = plan.stages;
+    for (size_t i = 0; i < kissfft_utils::KISSFFT_MAX_FACTORS; ++i) {
+        out.stageRadix[i] = plan.radix[i];
+        out.stageRemainder[i] = plan.remainder[i];
+    }
+    std::memcpy(out.twiddles, twiddles,
+                static_cast<size_t>(plan.nfft) * sizeof(*twiddles));
+}
+
+static const cache_record* records(const lora_table_cache* cache) {
+    return reinterpret_cast<const cache_record*>(
+        static_cast<const unsigned char*>(cache->map) + kIndexOffset);
+}
+
+static bool write_at(std::FILE* f, uint64_t offset, const void* p, size_t n) {
+    return std::fseek(f, static_cast<long>(offset), SEEK_SET) == 0 &&
+           std::fwrite(p, 1, n, f) == n;
+}
+
+} // namespace
+
+int table_cache_write(const char* path, const lora_params* cfgs, size_t count,
+                      lora_profile_tables* scratch) {
+    if (!path || (!cfgs && count) || !scratch) return -1;
+    std::FILE* f = std::fopen(path, "wb");
+    if (!f) return -1;
+
+    cache_header hdr;
+    std::memset(&hdr, 0, sizeof(hdr));
+    std::memcpy(hdr.magic, kMagic, sizeof(kMagic));
+    hdr.version = LORA_TABLE_CACHE_VERSION;
+    hdr.record_size = static_cast<uint32_t>(sizeof(cache_record));
+    hdr.count = count;
+    hdr.index_checksum = kFnvBasis;
+    hdr.index_offset = kIndexOffset;
+
+    static const unsigned char zeros[kAlign] = {};
+    uint64_t offset = align_up(kIndexOffset + count * sizeof(cache_record));
+    bool ok = true;
+    for (size_t i = 0; ok && i < count; ++i) {
+        ok = init_profile(scratch, &cfgs[i]) == 0;
+        if (!ok) break;
+        const size_t N = size_t(1) << cfgs[i].sf;
+        const size_t cpx = N * sizeof(std::complex<float>);
+        const uint64_t used = table_bytes(cfgs[i].sf);
+
+        // Clear padding so the file and its checksums are reproducible.
+        cache_record rec;
+        std::memset(static_cast<void*>(&rec), 0, sizeof(rec));
+        rec.params = scratch->params;
+        rec.kernels = scratch->kernels;
+        pack_plan(rec.fwd, scratch->plan_fwd);
+        pack_plan(rec.inv, scratch->plan_inv);
+        rec.offset = offset;
+        rec.size = align_up(used);
+        uint64_t h = kFnvBasis;
+        h = fnv1a(h, scratch->plan_fwd.twiddles, cpx);
+        h = fnv1a(h, scratch->plan_inv.twiddles, cpx);
+        h = fnv1a(h, scratch->downchirp, cpx);
+        h = fnv1a(h, scratch->window, N * sizeof(float));
+        rec.checksum = fnv1a(h, zeros, static_cast<size_t>(rec.size - used));
+
+        ok = write_at(f, offset, scratch->plan_fwd.twiddles, cpx) &&
+             std::fwrite(scratch->plan_inv.twiddles, 1, cpx, f) == cpx &&
+             std::fwrite(scratch->downchirp, 1, cpx, f) == cpx &&
+             std::fwrite(scratch->window, 1, N * sizeof(float), f) == N * sizeof(float) &&
+             std::fwrite(zeros, 1, rec.size - used, f) == rec.size - used &&
+             write_at(f, kIndexOffset + i * sizeof(rec), &rec, sizeof(rec));
+        hdr.index_checksum = fnv1a(hdr.index_checksum, &rec, sizeof(rec));
+        offset += rec.size;
+    }
+    if (ok) {
+        unsigned char head[kIndexOffset] = {};
+        std::memcpy(head, &hdr, sizeof(hdr));
+        ok = write_at(f, 0, head, sizeof(head));
+    }
+    ok = std::fclose(f) == 0 && ok;
+    if (!ok) std::remove(path);
+    return ok ? 0 : -1;
+}
+
+int table_cache_open(lora_table_cache* cache, const char* path) {
+    if (!cache || !path) return -1;
+    *cache = lora_table_cache{};
+    int fd = ::open(path, O_RDONLY);
+    if (fd < 0) return -1;
+    struct stat st;
+    if (::fstat(fd, &st) != 0 ||
+        static_cast<uint64_t>(st.st_size) < kIndexOffset) {
+        ::close(fd);
+        return -1;
+    }
+    size_t size = static_cast<size_t>(st.st_size);
+    void* map = ::mmap(nullptr, size, PROT_READ, MAP_PRIVATE, fd, 0);
+    ::close(fd);
+    if (map == MAP_FAILED) return -1;
+
+    // Only the header and index are checked here; each entry's tables are
+    // checked when it is looked up, so opening a large cache does not read
+    // every entry.
+    cache_header hdr;
+    std::memcpy(&hdr, map, sizeof(hdr));
+    bool ok = std::memcmp(hdr.magic, kMagic, sizeof(kMagic)) == 0 &&
+              hdr.version == LORA_TABLE_CACHE_VERSION &&
+              hdr.record_size == sizeof(cache_record) &&
+              hdr.index_offset == kIndexOffset &&
+              hdr.count <= (size - kIndexOffset) / sizeof(cache_record);
+    cache->map = map;
+    cache->map_size = size;
+    cache->count = static_cast<size_t>(hdr.count);
+    if (ok)
+        ok = fnv1a(kFnvBasis, records(cache), cache->count * sizeof(cache_record)) ==
+             hdr.index_checksum;
+    for (size_t i = 0; ok && i < cache->count; ++i) {
+        const cache_record& rec = records(cache)[i];
+        ok = (size_t(1) << rec.params.sf) <= kissfft_utils::KISSFFT_MAX_N &&
+             rec.fwd.nfft == (1 << rec.params.sf) &&
+             rec.inv.nfft == rec.fwd.nfft &&
+             rec.size == align_up(table_bytes(rec.params.sf)) &&
+             rec.offset % kAlign == 0 && rec.offset <= size &&
+             rec.size <= size - rec.offset;
+    }
+    if (!ok) {
+        ::munmap(map, size);
+        *cache = lora_table_cache{};
+        return -1;
+    }
+    return 0;
+}
+
+void table_cache_close(lora_table_cache* cache) {
+    if (!cache || !cache->map) return;
+    ::munmap(const_cast<void*>(cache->map), cache->map_size);
+    *cache = lora_table_cache{};
+}
+
+int table_cache_copy(const lora_table_cache* cache, const lora_params* cfg,
+                     kissfft_plan<float>* fwd, kissfft_plan<float>* inv,
+                     float* window, std::complex<float>* downchirp,
+                     lora_params* params, lora_kernel_choice* kernels) {
+    if (!cache || !cache->map || !cfg) return -1;
+    unsigned osr = cfg->osr ? cfg->osr : 1u;
+    for (size_t i = 0; i < cache->count; ++i) {
+        const cache_record& rec = records(cache)[i];
+        const lora_params& p = rec.params;
+        if (p.sf != cfg->sf || p.bw != cfg->bw || p.osr != osr ||
+            p.window != cfg->window)
+            continue;
+        const unsigned char* data =
+            static_cast<const unsigned char*>(cache->map) + rec.offset;
+        if (fnv1a(kFnvBasis, data, static_cast<size_t>(rec.size)) != rec.checksum)
+            return -1;
+        const size_t N = size_t(1) << p.sf;
+        const std::complex<float>* tw =
+            reinterpret_cast<const std::complex<float>*>(data);
+        if (fwd) unpack_plan(*fwd, rec.fwd, tw);
+        if (inv) unpack_plan(*inv, rec.inv, tw + N);
+        if (downchirp) std::memcpy(downchirp, tw + 2 * N, N * sizeof(*tw));
+        if (window)
+            std::memcpy(window, reinterpret_cast<const float*>(tw + 3 * N),
+                        N * sizeof(float));
+        if (params) *params = p;
+        if (kernels) *kernels = rec.kernels;
+        return 0;
+    }
+    return -1;
+}
+
+int table_cache_find(const lora_table_cache* cache, const lora_params* cfg,
+                     lora_profile_tables* tables) {
+    if (!tables) return -1;
+    return table_cache_copy(cache, cfg, &tables->plan_fwd, &tables->plan_inv,
+                            tables->window, tables->downchirp, &tables->params,
+                            &tables->kernels);
+}
+
+} // namespace lora_phy
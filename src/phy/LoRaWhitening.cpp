@@ -0,0 +1,94 @@
+#include <lora_phy/LoRaCodes.hpp>
+#include <lora_phy/phy.hpp>
+
+#include <cstring>
+
+namespace lora_phy {
+
+namespace {
+
+// Whitening is an XOR with a fixed sequence, so each table is simply the
+// reference generator applied to a zero buffer.  The Sx1272 sequence table is
+// periodic (510 bytes) and the SX1232 PN9 byte sequence repeats every 511
+// bytes; both are unrolled past one period so any start offset can be served
+// from a contiguous run.
+struct whitening_tables {
+    static const size_t kSx1272Period = 510;
+    static const size_t kSx1232Period = 511;
+
+    uint8_t lfsr[2][LORA_WHITENING_MAX];    ///< [RDD == 1] interleaved LFSR output
+    uint8_t sx1272[2][2 * kSx1272Period];   ///< [RDD == 1] sequence based output
+    uint8_t sx1232[2 * kSx1232Period];      ///< PN9 sequence
+
+    whitening_tables() {
+        std::memset(this, 0, sizeof(*this));
+        // RDD 4 keeps all eight bits of the first LFSR set; RDD 1 uses the
+        // second seed, whose mask is 0x1f anyway.
+        Sx1272ComputeWhiteningLfsr(lfsr[0], LORA_WHITENING_MAX, 0, 4);
+        Sx1272ComputeWhiteningLfsr(lfsr[1], LORA_WHITENING_MAX, 0, 1);
+        Sx1272ComputeWhitening(sx1272[0], sizeof(sx1272[0]), 0, 4);
+        Sx1272ComputeWhitening(sx1272[1], sizeof(sx1272[1]), 0, 1);
+        SX1232RadioComputeWhitening(sx1232, kSx1232Period);
+        std::memcpy(sx1232 + kSx1232Period, sx1232, kSx1232Period);
+    }
+};
+
+const whitening_tables& tables() {
+    static const whitening_tables t;
+    return t;
+}
+
+// buf ^= seq & mask, eight bytes at a time.
+void xor_masked(uint8_t* buf, const uint8_t* seq, size_t len, uint8_t mask) {
+    const uint64_t wide = 0x0101010101010101ull * mask;
+    size_t i = 0;
+    for (; i + 8 <= len; i += 8) {
+        uint64_t a, b;
+        std::memcpy(&a, buf + i, 8);
+        std::memcpy(&b, seq + i, 8);
+        a ^= b & wide;
+        std::memcpy(buf + i, &a, 8);
+    }
+    for (; i < len; ++i) buf[i] ^= seq[i] & mask;
+}
+
+// XOR with a periodic sequence stored as two periods, starting at @p start.
+void xor_periodic(uint8_t* buf, size_t len, const uint8_t* seq, size_t period,
+                  size_t start, uint8_t mask) {
+    start %= period;
+    while (len) {
+        size_t run = len < period ? len : period;
+        xor_masked(buf, seq + start, run, mask);
+        buf += run;
+        len -= run;
+    }
+}
+
+} // namespace
+
+void whiten_lfsr(uint8_t* buffer, size_t len, unsigned bit_ofs, unsigned rdd) {
+    if (!buffer || rdd < 1 || rdd > 4) return;
+    if (bit_ofs + len > LORA_WHITENING_MAX) {
+        // Beyond the table; fall back to stepping the LFSRs.
+        Sx1272ComputeWhiteningLfsr(buffer, static_cast<uint16_t>(len),
+                                   static_cast<int>(bit_ofs), rdd);
+        return;
+    }
+    const uint8_t mask = static_cast<uint8_t>(0xff >> (4 - rdd));
+    xor_masked(buffer, tables().lfsr[rdd == 1] + bit_ofs, len, mask);
+}
+
+void whiten_sx1272(uint8_t* buffer, size_t len, unsigned bit_ofs, unsigned rdd) {
+    if (!buffer || rdd < 1 || rdd > 4) return;
+    const uint8_t mask = static_cast<uint8_t>((1u << (4 + rdd)) - 1);
+    xor_periodic(buffer, len, tables().sx1272[rdd == 1],
+                 whitening_tables::kSx1272Period, bit_ofs, mask);
+}
+
+void whiten_sx1232(uint8_t* buffer, size_t len) {
+    if (!buffer) return;
+    xor_periodic(buffer, len, tables().sx1232, whitening_tables::kSx1232Period,
+                 0, 0xff);
+}
+
+} // namespace lora_phy
@@ -2,23 +2,80 @@
 #include <lora_phy/LoRaCodes.hpp>
 #include <lora_phy/LoRaDetector.hpp>
 #include <lora_phy/ChirpGenerator.hpp>
+#include "workspace_access.hpp"
+#include "table_cache_access.hpp"
 
 #include <cmath>
 #include <algorithm>
+#include <cstring>
 
 namespace lora_phy {
 
 namespace {
 
-static unsigned deduce_sf(const lora_workspace* ws) {
-    unsigned sf = 0;
-    size_t n = static_cast<size_t>(ws->plan_fwd.nfft);
-    while ((size_t(1) << sf) < n) ++sf;
-    return sf;
+static void fill_window(float* window, int N, window_type kind) {
+    if (kind == window_type::window_hann) {
+        for (int i = 0; i < N; ++i) {
+            window[i] =
+                0.5f - 0.5f * std::cos(2.0f * float(M_PI) *
+                                        static_cast<float>(i) /
+                                        (static_cast<float>(N) - 1.0f));
+        }
+    } else {
+        for (int i = 0; i < N; ++i) window[i] = 1.0f;
+    }
+}
+
+// Framing options shared by init() and select_profile().  Coding rates
+// outside 1..4 (4/5..4/8) select 4/8, the code lora_encode() always used.
+static void apply_coding(lora_workspace* ws, const lora_params* cfg) {
+    ws->cr = (cfg->cr >= 1 && cfg->cr <= 4) ? cfg->cr : 4u;
+    ws->explicit_header = cfg->explicit_header;
+    ws->crc = cfg->crc;
+    ws->payload_len = cfg->payload_len;
+}
+
+// Kernel variants from cfg->wisdom, or the defaults when it does not cover
+// the spreading factor.
+static void apply_kernels(lora_workspace* ws, const lora_params* cfg) {
+    const lora_kernel_choice* k = wisdom_find(cfg->wisdom, cfg->sf);
+    ws->kernels = k ? *k : lora_kernel_choice{};
+}
+
+// Deinterleave one block with the selected kernel.  diagonalDeterleaveSx2()
+// reads PPM symbols per block, so it only applies to square blocks
+// (PPM == 4 + RDD); elsewhere the transpose kernel stands in for it.
+static void deinterleave_block(deinterleave_kernel k, const uint16_t* symbols,
+                               uint8_t* cw, size_t ppm, unsigned rdd) {
+    if (k == deinterleave_kernel::reference) {
+        std::memset(cw, 0, ppm);
+        diagonalDeterleaveSx(symbols, 4 + rdd, cw, ppm, rdd);
+    } else if (k == deinterleave_kernel::unrolled && ppm == 4 + rdd) {
+        std::memset(cw, 0, ppm);
+        diagonalDeterleaveSx2(symbols, 4 + rdd, cw, ppm, rdd);
+    } else {
+        diagonalDeterleaveSxFast(symbols, 4 + rdd, cw, ppm, rdd);
+    }
 }
 
-static unsigned get_osr(const lora_workspace* ws) {
-    return ws->osr ? ws->osr : 1u;
+// Layout of an encoded frame.  Header codewords and payload nibbles share the
+// first block, which is always coded at 4/8.
+struct frame_layout {
+    size_t header_cw;  ///< header codewords in the first block
+    size_t nibbles;    ///< payload plus CRC nibbles
+    size_t codewords;  ///< total codewords, a multiple of PPM
+    size_t symbols;    ///< total symbols
+};
+
+static frame_layout layout_frame(const lora_workspace* ws, unsigned ppm,
+                                 size_t payload_len) {
+    frame_layout l;
+    l.header_cw = ws->explicit_header ? N_HEADER_CODEWORDS : 0;
+    l.nibbles = 2 * (payload_len + (ws->crc ? 2 : 0));
+    l.codewords = roundUp(static_cast<unsigned>(l.nibbles + l.header_cw), ppm);
+    if (l.codewords == 0) l.codewords = ppm;
+    l.symbols = N_HEADER_SYMBOLS + (l.codewords / ppm - 1) * (4 + ws->cr);
+    return l;
 }
 
 } // namespace
@@ -26,25 +83,66 @@ static unsigned get_osr(const lora_workspace* ws) {
 int init(lora_workspace* ws, const lora_params* cfg) {
     if (!ws || !cfg) return -1;
     const int N = 1 << cfg->sf;
-    kissfft<float>::init(ws->plan_fwd, N, false);
-    kissfft<float>::init(ws->plan_inv, N, true);
+    apply_kernels(ws, cfg);
+    // Plans copied from the cache keep the FFT layout they were built with.
+    lora_kernel_choice cached;
+    if (cfg->cache && table_cache_copy(cfg->cache, cfg, &ws->plan_fwd, &ws->plan_inv,
+                                       ws->window, nullptr, nullptr, &cached) == 0) {
+        ws->kernels.fft_radix = cached.fft_radix;
+    } else {
+        kissfft<float>::init(ws->plan_fwd, N, false);
+        kissfft<float>::init(ws->plan_inv, N, true);
+        if (ws->kernels.fft_radix != 4) {
+            kissfft<float>::factorize(ws->plan_fwd, static_cast<int>(ws->kernels.fft_radix));
+            kissfft<float>::factorize(ws->plan_inv, static_cast<int>(ws->kernels.fft_radix));
+        }
+        if (ws->window) fill_window(ws->window, N, cfg->window);
+    }
+    ws->profile = nullptr;
     ws->metrics = {};
     ws->osr = cfg->osr ? cfg->osr : 1u;
     ws->bw = cfg->bw;
     ws->sync_word = cfg->sync_word;
+    ws->expected_sync_word = cfg->sync_word;
     ws->window_kind = cfg->window;
-    if (ws->window) {
-        if (ws->window_kind == window_type::window_hann) {
-            for (int i = 0; i < N; ++i) {
-                ws->window[i] =
-                    0.5f - 0.5f * std::cos(2.0f * float(M_PI) *
-                                            static_cast<float>(i) /
-                                            (static_cast<float>(N) - 1.0f));
-            }
-        } else {
-            for (int i = 0; i < N; ++i) ws->window[i] = 1.0f;
-        }
+    apply_coding(ws, cfg);
+    return 0;
+}
+
+int init_profile(lora_profile_tables* tables, const lora_params* cfg) {
+    if (!tables || !cfg) return -1;
+    if ((size_t(1) << cfg->sf) > kissfft_utils::KISSFFT_MAX_N) return -1;
+    const int N = 1 << cfg->sf;
+    tables->params = *cfg;
+    tables->params.cache = nullptr;
+    tables->params.wisdom = nullptr;
+    if (tables->params.osr == 0) tables->params.osr = 1;
+    const lora_kernel_choice* k = wisdom_find(cfg->wisdom, cfg->sf);
+    tables->kernels = k ? *k : lora_kernel_choice{};
+    kissfft<float>::init(tables->plan_fwd, N, false);
+    kissfft<float>::init(tables->plan_inv, N, true);
+    if (tables->kernels.fft_radix != 4) {
+        kissfft<float>::factorize(tables->plan_fwd, static_cast<int>(tables->kernels.fft_radix));
+        kissfft<float>::factorize(tables->plan_inv, static_cast<int>(tables->kernels.fft_radix));
     }
+    fill_window(tables->window, N, cfg->window);
+    float phase = 0.0f;
+    genChirp(tables->downchirp, N, 1, N, 0.0f, true, 1.0f, phase,
+             bw_scale(cfg->bw));
+    return 0;
+}
+
+int select_profile(lora_workspace* ws, const lora_profile_tables* tables) {
+    if (!ws || !tables || tables->plan_fwd.nfft <= 0) return -1;
+    ws->profile = tables;
+    ws->metrics = {};
+    ws->osr = tables->params.osr;
+    ws->bw = tables->params.bw;
+    ws->sync_word = tables->params.sync_word;
+    ws->expected_sync_word = tables->params.sync_word;
+    ws->window_kind = tables->params.window;
+    ws->kernels = tables->kernels;
+    apply_coding(ws, &tables->params);
     return 0;
 }
 
@@ -52,14 +150,78 @@ void reset(lora_workspace* ws) {
     if (ws) ws->metrics = {};
 }
 
+size_t encoded_symbol_count(const lora_workspace* ws, size_t payload_len) {
+    if (!ws) return 0;
+    return layout_frame(ws, deduce_sf(ws), payload_len).symbols;
+}
+
 ssize_t encode(lora_workspace* ws,
                const uint8_t* payload, size_t payload_len,
                uint16_t* symbols, size_t symbol_cap) {
-    if (!ws || !payload || !symbols) return -1;
-    unsigned sf = deduce_sf(ws);
-    size_t produced = lora_encode(payload, payload_len, symbols, sf);
-    if (produced > symbol_cap) return -1;
-    return static_cast<ssize_t>(produced);
+    if (!ws || (!payload && payload_len) || !symbols) return -1;
+    const unsigned sf = deduce_sf(ws);
+    const unsigned ppm = sf;
+    const unsigned rdd = ws->cr;
+    if (ppm < N_HEADER_CODEWORDS || ppm > 12) return -1;
+    if (ws->explicit_header && payload_len > 255) return -1;
+    const frame_layout l = layout_frame(ws, ppm, payload_len);
+    if (l.symbols > symbol_cap) return -1;
+
+    // Bytes past the payload are the CRC (little endian), then zero padding.
+    // The CRC absorbs payload bytes as blocks consume them.
+    lora_crc_state crc;
+    crc_init(&crc);
+    size_t crc_fed = 0;
+    auto nibble_at = [&](size_t k) -> uint8_t {
+        size_t i = k / 2;
+        uint8_t b = 0;
+        if (i < payload_len) {
+            b = payload[i];
+        } else if (ws->crc && i < payload_len + 2) {
+            uint16_t value = crc_final(&crc);
+            b = static_cast<uint8_t>(i == payload_len ? value & 0xff : value >> 8);
+        }
+        return static_cast<uint8_t>((k & 1) ? b >> 4 : b & 0x0f);
+    };
+
+    uint8_t cw[16];
+    uint16_t* out = symbols;
+    size_t nib = 0;
+    size_t whiten_ofs = 0;
+    for (size_t blk = 0; blk < l.codewords / ppm; ++blk) {
+        const unsigned blk_rdd = blk == 0 ? HEADER_RDD : rdd;
+        size_t c = 0;
+        if (blk == 0 && l.header_cw) {
+            uint8_t hdr[3];
+            hdr[0] = static_cast<uint8_t>(payload_len);
+            hdr[1] = static_cast<uint8_t>((ws->crc ? 1 : 0) | (rdd << 1));
+            hdr[2] = header_checksum(hdr);
+            cw[c++] = fecEncodeTable[HEADER_RDD][hdr[0] >> 4];
+            cw[c++] = fecEncodeTable[HEADER_RDD][hdr[0] & 0x0f];
+            cw[c++] = fecEncodeTable[HEADER_RDD][hdr[1] & 0x0f];
+            cw[c++] = fecEncodeTable[HEADER_RDD][hdr[2] >> 4];
+            cw[c++] = fecEncodeTable[HEADER_RDD][hdr[2] & 0x0f];
+        }
+        const size_t first = c;
+        if (ws->crc) {
+            // Absorb the payload bytes this block touches into the CRC.
+            size_t upto = std::min(payload_len, (nib + ppm - first + 1) / 2);
+            if (upto > crc_fed) {
+                crc_update(&crc, payload + crc_fed, upto - crc_fed);
+                crc_fed = upto;
+            }
+        }
+        for (; c < ppm; ++c)
+            cw[c] = fecEncodeTable[blk_rdd][nibble_at(nib++)];
+        whiten_lfsr(cw + first, ppm - first, static_cast<unsigned>(whiten_ofs),
+                    blk_rdd);
+        whiten_ofs += ppm - first;
+        diagonalInterleaveSxFast(cw, ppm, out, ppm, blk_rdd);
+        for (unsigned i = 0; i < 4 + blk_rdd; ++i)
+            out[i] = grayToBinary16(out[i]);
+        out += 4 + blk_rdd;
+    }
+    return static_cast<ssize_t>(out - symbols);
 }
 
 ssize_t modulate(lora_workspace* ws,
@@ -86,8 +248,18 @@ void estimate_offsets(lora_workspace* ws,
     size_t symbols = sample_count / step;
     if (symbols == 0) return;
 
-    kissfft<float> fft(ws->plan_fwd);
+    kissfft<float> fft(fwd_plan(ws));
+    const float* window = analysis_window(ws);
     LoRaDetector<float> detector(N, ws->fft_in, ws->fft_out, fft);
+    detector.setSimd(ws->kernels.simd_detect);
+
+    // The first two symbols carry the configured sync word; confirm the
+    // expected bins with single-bin DFTs before paying for a full FFT.
+    unsigned shift = sf > 4 ? (sf - 4) : 0;
+    const size_t expected[2] = {
+        static_cast<size_t>(ws->expected_sync_word >> 4) << shift,
+        static_cast<size_t>(ws->expected_sync_word & 0x0f) << shift,
+    };
 
     float sum_index = 0.0f;
     float phase_diff = 0.0f;
@@ -104,18 +276,23 @@ void estimate_offsets(lora_workspace* ws,
         for (unsigned t = 0; t < osr; ++t) {
             for (size_t i = 0; i < N; ++i) {
                 std::complex<float> samp = sym[t + i * osr];
-                if (ws->window_kind != window_type::window_none && ws->window)
-                    samp *= ws->window[i];
+                if (ws->window_kind != window_type::window_none && window)
+                    samp *= window[i];
                 detector.feed(i, samp);
             }
             float p, pav, findex;
-            size_t idx = detector.detect(p, pav, findex);
+            size_t idx = s < 2 ? expected[s] : 0;
+            std::complex<float> bin;
+            if (s >= 2 || !verify_bin(ws->fft_in, N, idx, p, findex, &bin)) {
+                idx = detector.detect(p, pav, findex);
+                bin = ws->fft_out[idx];
+            }
             if (p > best_p) {
                 best_p = p;
                 best_idx = idx;
                 best_f = findex;
                 best_t = t;
-                best_bin = ws->fft_out[idx];
+                best_bin = bin;
             }
         }
         sum_t += best_t;
@@ -175,10 +352,14 @@ void compensate_offsets(const lora_workspace* ws,
     }
 }
 
-ssize_t demodulate(lora_workspace* ws,
-                   const std::complex<float>* iq, size_t sample_count,
-                   uint16_t* symbols, size_t symbol_cap) {
-    if (!ws || !iq || !symbols) return -1;
+namespace {
+
+// Symbol loop shared by demodulate() and demodulate_soft().  @p emit(k, idx)
+// is called for each data symbol after its FFT, while the bins are still in
+// ws->fft_out.
+template <typename Emit>
+ssize_t demod_stream(lora_workspace* ws, const std::complex<float>* iq,
+                     size_t sample_count, size_t symbol_cap, Emit emit) {
     unsigned sf = deduce_sf(ws);
     unsigned osr = get_osr(ws);
     size_t N = size_t(1) << sf;
@@ -192,16 +373,29 @@ ssize_t demodulate(lora_workspace* ws,
     size_t est_samples = std::min(sample_count, step * size_t(2));
     estimate_offsets(ws, iq, est_samples);
 
-    kissfft<float> fft(ws->plan_fwd);
+    kissfft<float> fft(fwd_plan(ws));
+    const float* window = analysis_window(ws);
     LoRaDetector<float> detector(N, ws->fft_in, ws->fft_out, fft);
+    detector.setSimd(ws->kernels.simd_detect);
     int t_off = static_cast<int>(std::round(ws->metrics.time_offset));
     float rate = -2.0f * float(M_PI) * ws->metrics.cfo / static_cast<float>(N);
+    unsigned shift = sf > 4 ? (sf - 4) : 0;
+    const size_t expected[2] = {
+        static_cast<size_t>(ws->expected_sync_word >> 4) << shift,
+        static_cast<size_t>(ws->expected_sync_word & 0x0f) << shift,
+    };
+    // A selected profile carries a prebuilt downchirp; otherwise it is
+    // regenerated into fft_out, which the detector overwrites every symbol.
+    const std::complex<float>* down =
+        ws->profile ? ws->profile->downchirp : ws->fft_out;
     uint16_t sw0 = 0, sw1 = 0;
     for (size_t s = 0; s < total_symbols; ++s) {
-        float tmp = 0.0f;
-        float bw_scale = lora_phy::bw_scale(ws->bw);
-        genChirp(ws->fft_out, static_cast<int>(N), 1, static_cast<int>(N),
-                 0.0f, true, 1.0f, tmp, bw_scale);
+        if (!ws->profile) {
+            float tmp = 0.0f;
+            float bw_scale = lora_phy::bw_scale(ws->bw);
+            genChirp(ws->fft_out, static_cast<int>(N), 1, static_cast<int>(N),
+                     0.0f, true, 1.0f, tmp, bw_scale);
+        }
         size_t base = s * step;
         if (t_off > 0) {
             if (base + size_t(t_off) + step <= sample_count)
@@ -218,41 +412,208 @@ ssize_t demodulate(lora_workspace* ws,
             float cs = std::cos(ph);
             float sn = std::sin(ph);
             std::complex<float> samp =
-                sym[i * osr] * ws->fft_out[i] * std::complex<float>(cs, sn);
-            if (ws->window_kind != window_type::window_none && ws->window)
-                samp *= ws->window[i];
+                sym[i * osr] * down[i] * std::complex<float>(cs, sn);
+            if (ws->window_kind != window_type::window_none && window)
+                samp *= window[i];
             detector.feed(i, samp);
         }
         float p, pav, findex;
-        size_t idx = detector.detect(p, pav, findex);
+        size_t idx;
+        if (s < 2 && verify_bin(ws->fft_in, N, expected[s], p, findex))
+            idx = expected[s];
+        else
+            idx = detector.detect(p, pav, findex);
         if (s == 0)
             sw0 = static_cast<uint16_t>(idx);
         else if (s == 1)
             sw1 = static_cast<uint16_t>(idx);
         else
-            symbols[s - 2] = static_cast<uint16_t>(idx);
+            emit(s - 2, idx);
     }
-    unsigned shift = sf > 4 ? (sf - 4) : 0;
     ws->sync_word = static_cast<uint8_t>(((sw0 >> shift) & 0x0f) << 4 |
                                          ((sw1 >> shift) & 0x0f));
     return static_cast<ssize_t>(num_symbols);
 }
 
+} // namespace
+
+ssize_t demodulate(lora_workspace* ws,
+                   const std::complex<float>* iq, size_t sample_count,
+                   uint16_t* symbols, size_t symbol_cap) {
+    if (!ws || !iq || !symbols) return -1;
+    return demod_stream(ws, iq, sample_count, symbol_cap,
+                        [&](size_t k, size_t idx) {
+                            symbols[k] = static_cast<uint16_t>(idx);
+                        });
+}
+
+ssize_t demodulate_soft(lora_workspace* ws,
+                        const std::complex<float>* iq, size_t sample_count,
+                        float* llrs, size_t symbol_cap) {
+    if (!ws || !iq || !llrs) return -1;
+    const unsigned sf = deduce_sf(ws);
+    // fft_in is free once the detector has transformed it.
+    float* scratch = reinterpret_cast<float*>(ws->fft_in);
+    return demod_stream(ws, iq, sample_count, symbol_cap,
+                        [&](size_t k, size_t) {
+                            symbol_llrs(ws->fft_out, sf, llrs + k * sf, scratch);
+                        });
+}
+
+namespace {
+
+// Frame walk shared by decode() and decode_soft().  @p block turns the
+// interleaver block starting at symbol @p sym into ppm decoded nibbles:
+//   block(sym, rdd, first, whiten_ofs, nib, stats)
+// with codewords from @p first on whitened at LFSR offset @p whiten_ofs.
+template <typename BlockDecoder>
+ssize_t decode_frame(lora_workspace* ws, size_t symbol_count,
+                     uint8_t* payload, size_t payload_cap, BlockDecoder block) {
+    ws->metrics.crc_ok = false;
+    ws->metrics.fec_corrected = 0;
+    ws->metrics.fec_uncorrectable = 0;
+    ws->metrics.frame_cr = 0;
+    ws->metrics.frame_crc = false;
+    const unsigned sf = deduce_sf(ws);
+    const unsigned ppm = sf;
+    if (ppm < N_HEADER_CODEWORDS || ppm > 12) return -1;
+    if (symbol_count < N_HEADER_SYMBOLS) return -1;
+
+    lora_fec_stats stats;
+    uint8_t nib[16];
+    size_t whiten_ofs = 0;
+    auto decode_block = [&](size_t sym, unsigned rdd, size_t first) {
+        block(sym, rdd, first, static_cast<unsigned>(whiten_ofs), nib, &stats);
+        whiten_ofs += ppm - first;
+    };
+
+    // The first block is always coded at 4/8 and starts with the explicit
+    // header when one is configured.
+    decode_block(0, HEADER_RDD, ws->explicit_header ? N_HEADER_CODEWORDS : 0);
+    unsigned rdd = ws->cr;
+    bool has_crc = ws->crc;
+    size_t first = 0;
+    size_t length;
+    if (ws->explicit_header) {
+        uint8_t hdr[3];
+        hdr[0] = static_cast<uint8_t>(nib[0] << 4 | nib[1]);
+        hdr[1] = nib[2];
+        hdr[2] = static_cast<uint8_t>(nib[3] << 4 | nib[4]);
+        rdd = (hdr[1] >> 1) & 0x7;
+        if (header_checksum(hdr) != hdr[2] || rdd < 1 || rdd > 4) {
+            ws->metrics.fec_corrected = stats.corrected;
+            ws->metrics.fec_uncorrectable = stats.uncorrectable;
+            return -1;
+        }
+        length = hdr[0];
+        has_crc = (hdr[1] & 1) != 0;
+        first = N_HEADER_CODEWORDS;
+    } else {
+        size_t blocks = 1 + (symbol_count - N_HEADER_SYMBOLS) / (4 + rdd);
+        size_t bytes = (blocks * ppm) / 2;
+        length = ws->payload_len ? ws->payload_len
+                                 : bytes - std::min<size_t>(bytes, has_crc ? 2 : 0);
+    }
+    ws->metrics.frame_cr = rdd;
+    ws->metrics.frame_crc = has_crc;
+    if (length > payload_cap) return -1;
+
+    // Walk the remaining blocks, assembling bytes low nibble first and
+    // carrying the CRC over payload bytes as they complete.
+    const size_t total = length + (has_crc ? 2 : 0);
+    const size_t needed_cw = first + 2 * total;
+    const size_t blocks = needed_cw <= ppm ? 1 : (needed_cw + ppm - 1) / ppm;
+    if (N_HEADER_SYMBOLS + (blocks - 1) * (4 + rdd) > symbol_count) return -1;
+
+    lora_crc_state crc;
+    crc_init(&crc);
+    uint8_t crc_bytes[2] = {0, 0};
+    size_t byte_idx = 0;
+    size_t crc_fed = 0;
+    bool high = false;
+    uint8_t cur = 0;
+    size_t sym = N_HEADER_SYMBOLS;
+    for (size_t blk = 0; blk < blocks && byte_idx < total; ++blk) {
+        if (blk > 0) {
+            decode_block(sym, rdd, 0);
+            sym += 4 + rdd;
+        }
+        for (size_t c = blk == 0 ? first : 0; c < ppm && byte_idx < total; ++c) {
+            if (!high) {
+                cur = nib[c];
+                high = true;
+                continue;
+            }
+            cur = static_cast<uint8_t>(cur | nib[c] << 4);
+            high = false;
+            if (byte_idx < length)
+                payload[byte_idx] = cur;
+            else
+                crc_bytes[byte_idx - length] = cur;
+            ++byte_idx;
+        }
+        if (has_crc) {
+            size_t upto = std::min(byte_idx, length);
+            crc_update(&crc, payload + crc_fed, upto - crc_fed);
+            crc_fed = upto;
+        }
+    }
+
+    if (has_crc) {
+        uint16_t provided = static_cast<uint16_t>(crc_bytes[0] | crc_bytes[1] << 8);
+        ws->metrics.crc_ok = crc_final(&crc) == provided;
+    }
+    ws->metrics.fec_corrected = stats.corrected;
+    ws->metrics.fec_uncorrectable = stats.uncorrectable;
+    return static_cast<ssize_t>(length);
+}
+
+} // namespace
+
 ssize_t decode(lora_workspace* ws,
                const uint16_t* symbols, size_t symbol_count,
                uint8_t* payload, size_t payload_cap) {
     if (!ws || !symbols || !payload) return -1;
-    size_t produced = lora_decode(symbols, symbol_count, payload);
-    if (produced > payload_cap) return -1;
-    if (produced >= 4) {
-        size_t data_len = produced - 4;
-        uint16_t provided = payload[produced - 2] | (payload[produced - 1] << 8);
-        uint16_t calc = sx1272DataChecksum(payload + 2, data_len);
-        ws->metrics.crc_ok = (provided == calc);
-    } else {
-        ws->metrics.crc_ok = false;
-    }
-    return static_cast<ssize_t>(produced);
+    const size_t ppm = deduce_sf(ws);
+    uint8_t cw[16];
+    uint16_t blk_syms[8];
+    // Gray map, deinterleave, dewhiten and decode one block.
+    auto block = [&](size_t sym, unsigned rdd, size_t first, unsigned whiten_ofs,
+                     uint8_t* nib, lora_fec_stats* stats) {
+        for (unsigned i = 0; i < 4 + rdd; ++i)
+            blk_syms[i] = binaryToGray16(symbols[sym + i]);
+        deinterleave_block(ws->kernels.deinterleave, blk_syms, cw, ppm, rdd);
+        whiten_lfsr(cw + first, ppm - first, whiten_ofs, rdd);
+        fec_decode(cw, ppm, nib, rdd, stats, ws->kernels.fec);
+    };
+    return decode_frame(ws, symbol_count, payload, payload_cap, block);
+}
+
+ssize_t decode_soft(lora_workspace* ws,
+                    const float* llrs, size_t symbol_count,
+                    uint8_t* payload, size_t payload_cap) {
+    if (!ws || !llrs || !payload) return -1;
+    const size_t sf = deduce_sf(ws);
+    const size_t ppm = sf;
+    float cw_llrs[16 * 8];
+    uint8_t mask[16];
+    // Gather each codeword bit's LLR straight from the symbol that carries
+    // it (codeword c, bit j sits in bit (c - j) mod ppm of symbol j), and
+    // dewhiten by flipping the sign wherever the sequence has a one.
+    auto block = [&](size_t sym, unsigned rdd, size_t first, unsigned whiten_ofs,
+                     uint8_t* nib, lora_fec_stats* stats) {
+        const size_t nb = 4 + rdd;
+        std::fill(mask, mask + ppm, uint8_t(0));
+        whiten_lfsr(mask + first, ppm - first, whiten_ofs, rdd);
+        for (size_t c = 0; c < ppm; ++c) {
+            for (size_t j = 0; j < nb; ++j) {
+                float l = llrs[(sym + j) * sf + (c + ppm - j) % ppm];
+                cw_llrs[c * nb + j] = (mask[c] >> j) & 1 ? -l : l;
+            }
+        }
+        fec_decode_soft(cw_llrs, ppm, nib, rdd, stats);
+    };
+    return decode_frame(ws, symbol_count, payload, payload_cap, block);
 }
 
 const lora_metrics* get_last_metrics(const lora_workspace* ws) {
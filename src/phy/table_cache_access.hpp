@@ -0,0 +1,18 @@
+#pragma once
+#include <lora_phy/phy.hpp>
+
+#include <complex>
+
+// Internal entry point shared by table_cache_find() and init() for copying
+// tables out of a mapped cache.  Not installed with the public headers.
+namespace lora_phy {
+
+// Copy the tables of the entry matching @p cfg into whichever outputs are
+// non-null, after checking the entry's checksum.  Returns 0, or -1 when the
+// cache does not cover @p cfg or the entry is corrupt.
+int table_cache_copy(const lora_table_cache* cache, const lora_params* cfg,
+                     kissfft_plan<float>* fwd, kissfft_plan<float>* inv,
+                     float* window, std::complex<float>* downchirp,
+                     lora_params* params, lora_kernel_choice* kernels);
+
+} // namespace lora_phy
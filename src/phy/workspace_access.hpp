@@ -0,0 +1,34 @@
+#pragma once
+#include <lora_phy/phy.hpp>
+
+#include <cstddef>
+
+// Internal helpers shared by phy.cpp and LoRaSync.cpp for reading the
+// active profile of a workspace.  Not installed with the public headers.
+namespace lora_phy {
+
+// Plans and window of the active profile, or the workspace's own after init().
+inline const kissfft_plan<float>& fwd_plan(const lora_workspace* ws) {
+    return ws->profile ? ws->profile->plan_fwd : ws->plan_fwd;
+}
+
+inline const kissfft_plan<float>& inv_plan(const lora_workspace* ws) {
+    return ws->profile ? ws->profile->plan_inv : ws->plan_inv;
+}
+
+inline const float* analysis_window(const lora_workspace* ws) {
+    return ws->profile ? ws->profile->window : ws->window;
+}
+
+inline unsigned deduce_sf(const lora_workspace* ws) {
+    unsigned sf = 0;
+    size_t n = static_cast<size_t>(fwd_plan(ws).nfft);
+    while ((size_t(1) << sf) < n) ++sf;
+    return sf;
+}
+
+inline unsigned get_osr(const lora_workspace* ws) {
+    return ws->osr ? ws->osr : 1u;
+}
+
+} // namespace lora_phy
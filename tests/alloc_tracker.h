@@ -27,15 +27,25 @@ struct Guard {
 
 } // namespace alloc_tracker
 
-inline void* operator new(std::size_t size) {
+// Allocate with malloc() rather than forwarding to the nothrow operator new:
+// libstdc++ implements that one on top of the replaced operator new, which
+// recurses once these definitions are emitted out of line.  The default
+// operator delete releases with free(); keeping the bodies out of line stops
+// GCC from pairing the inlined malloc() with it in -Wmismatched-new-delete.
+#if defined(__GNUC__)
+#define ALLOC_TRACKER_NOINLINE __attribute__((noinline))
+#else
+#define ALLOC_TRACKER_NOINLINE
+#endif
+
+ALLOC_TRACKER_NOINLINE inline void* operator new(std::size_t size) {
     alloc_tracker::counter().fetch_add(1, std::memory_order_relaxed);
-    if (void* p = ::operator new(size, std::nothrow)) return p;
+    if (void* p = std::malloc(size ? size : 1)) return p;
     throw std::bad_alloc();
 }
 
-inline void* operator new[](std::size_t size) {
+ALLOC_TRACKER_NOINLINE inline void* operator new[](std::size_t size) {
     alloc_tracker::counter().fetch_add(1, std::memory_order_relaxed);
-    if (void* p = ::operator new[](size, std::nothrow)) return p;
+    if (void* p = std::malloc(size ? size : 1)) return p;
     throw std::bad_alloc();
 }
-
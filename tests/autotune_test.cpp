@@ -0,0 +1,183 @@
+#include <lora_phy/phy.hpp>
+#include <cstdint>
+#include <cstdio>
+#include <cstring>
+#include <fstream>
+#include <iostream>
+#include <iterator>
+#include <memory>
+#include <random>
+#include <string>
+#include <vector>
+
+#include <unistd.h>
+
+// Encode and decode a frame at @p cr with kernels taken from @p wisdom.
+static bool decode_with(const lora_phy::lora_wisdom* wisdom, unsigned sf, unsigned cr,
+                        lora_phy::lora_kernel_choice* used) {
+    const size_t N = size_t(1) << sf;
+    std::vector<std::complex<float>> fft_in(N), fft_out(N);
+    lora_phy::lora_workspace ws{};
+    ws.fft_in = fft_in.data();
+    ws.fft_out = fft_out.data();
+    lora_phy::lora_params p{};
+    p.sf = sf;
+    p.cr = cr;
+    p.explicit_header = true;
+    p.crc = true;
+    p.wisdom = wisdom;
+    if (lora_phy::init(&ws, &p) != 0) return false;
+    *used = ws.kernels;
+    std::mt19937 rng(sf * 10 + cr);
+    std::vector<uint8_t> payload(20), out(20);
+    for (auto& b : payload) b = static_cast<uint8_t>(rng());
+    std::vector<uint16_t> syms(lora_phy::encoded_symbol_count(&ws, payload.size()));
+    lora_phy::encode(&ws, payload.data(), payload.size(), syms.data(), syms.size());
+    return lora_phy::decode(&ws, syms.data(), syms.size(), out.data(), out.size()) ==
+               static_cast<ssize_t>(payload.size()) &&
+           ws.metrics.crc_ok && out == payload;
+}
+
+int autotune_test_main() {
+    bool ok = true;
+    for (unsigned sf = 5; sf <= 12; ++sf) {
+        if (lora_phy::autotune_verify(sf) != 0) {
+            std::cerr << "kernel variants disagree at sf" << sf << "\n";
+            ok = false;
+        }
+    }
+    if (lora_phy::autotune_verify(4) == 0 || lora_phy::autotune_verify(13) == 0)
+        ok = false;
+
+    const std::string path =
+        "/tmp/lora_wisdom_test_" + std::to_string(::getpid()) + ".txt";
+    const unsigned sfs[] = {7, 9};
+    lora_phy::lora_wisdom w;
+    if (lora_phy::wisdom_prepare(&w, path.c_str(), sfs, 2) != 0 ||
+        !lora_phy::wisdom_find(&w, 7) || !lora_phy::wisdom_find(&w, 9) ||
+        lora_phy::wisdom_find(&w, 8)) {
+        std::cerr << "wisdom_prepare failed\n";
+        ok = false;
+    }
+
+    // Every combination of variants decodes the same frames.
+    lora_phy::lora_wisdom forced;
+    char cpu[lora_phy::LORA_WISDOM_CPU_LEN];
+    lora_phy::cpu_model(cpu, sizeof(cpu));
+    std::memcpy(forced.cpu, cpu, sizeof(cpu));
+    for (int d = 0; d < 3; ++d) {
+        for (int f = 0; f < 2; ++f) {
+            lora_phy::lora_kernel_choice c;
+            c.deinterleave = static_cast<lora_phy::deinterleave_kernel>(d);
+            c.fec = static_cast<lora_phy::fec_kernel>(f);
+            c.simd_detect = (d + f) % 2 != 0;
+            c.fft_radix = f ? 2 : 4;
+            forced.choice[8] = c;
+            forced.valid[8] = true;
+            for (unsigned cr = 1; cr <= 4; ++cr) {
+                lora_phy::lora_kernel_choice used;
+                if (!decode_with(&forced, 8, cr, &used) ||
+                    used.deinterleave != c.deinterleave || used.fft_radix != c.fft_radix) {
+                    std::cerr << "decode with deinterleave " << d << " fec " << f
+                              << " cr " << cr << " failed\n";
+                    ok = false;
+                }
+            }
+        }
+    }
+
+    // A second process reuses the file instead of measuring again.
+    forced.choice[7].deinterleave = lora_phy::deinterleave_kernel::reference;
+    forced.choice[7].fft_radix = 2;
+    forced.valid[7] = true;
+    forced.valid[8] = false;
+    lora_phy::lora_wisdom loaded;
+    if (lora_phy::wisdom_save(&forced, path.c_str()) != 0 ||
+        lora_phy::wisdom_prepare(&loaded, path.c_str(), sfs, 1) != 0 ||
+        !lora_phy::wisdom_find(&loaded, 7) ||
+        lora_phy::wisdom_find(&loaded, 7)->deinterleave !=
+            lora_phy::deinterleave_kernel::reference ||
+        lora_phy::wisdom_find(&loaded, 7)->fft_radix != 2 ||
+        lora_phy::wisdom_find(&loaded, 9)) {
+        std::cerr << "wisdom file not reused\n";
+        ok = false;
+    }
+
+    // Prebuilt tables carry the kernel choice they were built with, and
+    // select_profile() switches to it.
+    {
+        std::unique_ptr<lora_phy::lora_profile_tables> t7(new lora_phy::lora_profile_tables),
+            t8(new lora_phy::lora_profile_tables);
+        lora_phy::lora_params p7{}, p8{};
+        p7.sf = 7;
+        p7.wisdom = &forced;
+        p8.sf = 8;
+        p8.wisdom = &forced;
+        lora_phy::init_profile(t7.get(), &p7);
+        lora_phy::init_profile(t8.get(), &p8);
+        std::vector<std::complex<float>> fft_in(256), fft_out(256);
+        lora_phy::lora_workspace ws{};
+        ws.fft_in = fft_in.data();
+        ws.fft_out = fft_out.data();
+        bool tables_ok = t7->params.wisdom == nullptr && t7->kernels.fft_radix == 2 &&
+                         t7->plan_fwd.stageRadix[0] == 2 && t8->kernels.fft_radix == 4;
+        tables_ok = tables_ok && lora_phy::select_profile(&ws, t7.get()) == 0 &&
+                    ws.kernels.fft_radix == 2 &&
+                    ws.kernels.deinterleave == lora_phy::deinterleave_kernel::reference;
+        tables_ok = tables_ok && lora_phy::select_profile(&ws, t8.get()) == 0 &&
+                    ws.kernels.fft_radix == 4;
+
+        // Cached tables keep their FFT layout whatever the wisdom says, and
+        // the file does not depend on where the wisdom lives in memory.
+        const std::string cache_path =
+            "/tmp/lora_wisdom_cache_test_" + std::to_string(::getpid()) + ".bin";
+        std::unique_ptr<lora_phy::lora_wisdom> copy(new lora_phy::lora_wisdom(forced));
+        std::vector<char> first;
+        for (int pass = 0; pass < 2; ++pass) {
+            p7.wisdom = pass ? copy.get() : &forced;
+            tables_ok = tables_ok &&
+                        lora_phy::table_cache_write(cache_path.c_str(), &p7, 1, t8.get()) == 0;
+            std::ifstream f(cache_path, std::ios::binary);
+            std::vector<char> bytes((std::istreambuf_iterator<char>(f)),
+                                    std::istreambuf_iterator<char>());
+            if (pass == 0)
+                first = bytes;
+            else
+                tables_ok = tables_ok && bytes == first;
+        }
+        lora_phy::lora_table_cache cache;
+        tables_ok = tables_ok && lora_phy::table_cache_open(&cache, cache_path.c_str()) == 0;
+        copy->choice[7].fft_radix = 4;
+        lora_phy::lora_params cached{};
+        cached.sf = 7;
+        cached.cache = &cache;
+        cached.wisdom = copy.get();
+        tables_ok = tables_ok && lora_phy::init(&ws, &cached) == 0 &&
+                    ws.plan_fwd.stageRadix[0] == 2 && ws.kernels.fft_radix == 2 &&
+                    ws.kernels.deinterleave == lora_phy::deinterleave_kernel::reference;
+        lora_phy::table_cache_close(&cache);
+        std::remove(cache_path.c_str());
+        if (!tables_ok) {
+            std::cerr << "profile tables ignore their kernel choice\n";
+            ok = false;
+        }
+    }
+
+    // Files from another CPU model or with unknown kernels are rejected.
+    {
+        std::ofstream f(path);
+        f << "cpu: some other processor\n"
+          << "sf7: deinterleave=transpose fec=simd detect=simd fft_radix=4\n";
+    }
+    if (lora_phy::wisdom_load(&loaded, path.c_str()) == 0) ok = false;
+    {
+        std::ofstream f(path);
+        f << "cpu: " << cpu << "\n"
+          << "sf7: deinterleave=magic fec=simd detect=simd fft_radix=4\n";
+    }
+    if (lora_phy::wisdom_load(&loaded, path.c_str()) == 0) ok = false;
+    std::remove(path.c_str());
+    if (lora_phy::wisdom_load(&loaded, path.c_str()) == 0) ok = false;
+
+    return ok ? 0 : 1;
+}
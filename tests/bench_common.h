@@ -0,0 +1,233 @@
+#pragma once
+#include <lora_phy/phy.hpp>
+#include <lora_phy/ChirpGenerator.hpp>
+#include <complex>
+#include <cstdint>
+#include <cstdlib>
+#include <fstream>
+#include <memory>
+#include <string>
+#include <vector>
+
+#ifdef __linux__
+#include <unistd.h>
+#endif
+#ifdef __SSE2__
+#include <emmintrin.h>
+#endif
+
+// Profile matrix and packet workload shared by the benchmark executables.
+namespace bench {
+
+inline std::string trim(const std::string& s) {
+    const auto start = s.find_first_not_of(" \t\r\n");
+    if (start == std::string::npos) return "";
+    const auto end = s.find_last_not_of(" \t\r\n");
+    return s.substr(start, end - start + 1);
+}
+
+struct Profile {
+    std::string name;
+    unsigned sf{};
+    unsigned bw{};
+    std::string cr;
+    std::string dir;
+    // Benchmark matrix axes; a scalar or a [a, b] list in profiles.yaml.
+    std::vector<unsigned> osr{1};
+    std::vector<std::string> window{"none"};
+    std::vector<size_t> payload{32};
+};
+
+// Items of "[a, b, c]" or a single scalar.
+inline std::vector<std::string> split_list(const std::string& val) {
+    std::string v = trim(val);
+    if (!v.empty() && v.front() == '[' && v.back() == ']') v = v.substr(1, v.size() - 2);
+    std::vector<std::string> out;
+    size_t pos = 0;
+    while (pos <= v.size()) {
+        size_t comma = v.find(',', pos);
+        if (comma == std::string::npos) comma = v.size();
+        std::string item = trim(v.substr(pos, comma - pos));
+        if (!item.empty()) out.push_back(item);
+        pos = comma + 1;
+    }
+    return out;
+}
+
+// Coding rate index 1..4 from "4/5".."4/8", 4 when unparseable.
+inline unsigned cr_index(const std::string& cr) {
+    size_t slash = cr.find('/');
+    if (slash == std::string::npos) return 4;
+    unsigned d = static_cast<unsigned>(std::strtoul(cr.c_str() + slash + 1, nullptr, 10));
+    return d >= 5 && d <= 8 ? d - 4 : 4;
+}
+
+
+inline bool load_profiles(const std::string& path, std::vector<Profile>& out) {
+    std::ifstream f(path);
+    if (!f) return false;
+    std::string line;
+    Profile current;
+    bool in_profile = false;
+    while (std::getline(f, line)) {
+        line = trim(line);
+        if (line.empty() || line[0] == '#') continue;
+        if (line[0] == '-') {
+            if (in_profile) out.push_back(current);
+            current = Profile();
+            in_profile = true;
+            continue;
+        }
+        auto colon = line.find(':');
+        if (colon == std::string::npos) continue;
+        std::string key = trim(line.substr(0, colon));
+        std::string val = trim(line.substr(colon + 1));
+        if (key == "name") current.name = val;
+        else if (key == "sf") current.sf = static_cast<unsigned>(std::stoul(val));
+        else if (key == "bw") current.bw = static_cast<unsigned>(std::stoul(val));
+        else if (key == "cr") current.cr = val;
+        else if (key == "dir") current.dir = val;
+        else if (key == "osr" || key == "payload") {
+            std::vector<size_t> items;
+            for (const auto& item : split_list(val)) items.push_back(std::stoul(item));
+            if (items.empty()) continue;
+            if (key == "payload") current.payload = items;
+            else current.osr.assign(items.begin(), items.end());
+        } else if (key == "window") {
+            std::vector<std::string> items = split_list(val);
+            if (!items.empty()) current.window = items;
+        }
+    }
+    if (in_profile) out.push_back(current);
+    return true;
+}
+
+// Positive integer from environment variable @p name, or @p def.
+inline size_t env_count(const char* name, size_t def) {
+    const char* v = std::getenv(name);
+    if (!v) return def;
+    char* end = nullptr;
+    unsigned long n = std::strtoul(v, &end, 10);
+    return (end != v && *end == '\0' && n > 0) ? static_cast<size_t>(n) : def;
+}
+
+inline std::string run_id() {
+    const char* env_run = std::getenv("RUN_ID");
+    return env_run ? env_run : "run";
+}
+
+// Size of the last-level cache in bytes, 0 when unknown.
+inline size_t llc_bytes() {
+#if defined(__linux__) && defined(_SC_LEVEL3_CACHE_SIZE)
+    long v = sysconf(_SC_LEVEL3_CACHE_SIZE);
+    return v > 0 ? static_cast<size_t>(v) : 0;
+#else
+    return 0;
+#endif
+}
+
+// Evict @p bytes starting at @p p from every cache level.  Returns false
+// where no cache-line flush instruction is available.
+inline bool flush_range(const void* p, size_t bytes) {
+#ifdef __SSE2__
+    const char* c = static_cast<const char*>(p);
+    for (size_t i = 0; i < bytes; i += 64) _mm_clflush(c + i);
+    if (bytes) _mm_clflush(c + bytes - 1);
+    return true;
+#else
+    (void)p;
+    (void)bytes;
+    return false;
+#endif
+}
+
+// One packet of the benchmark: modulate a fixed payload, dechirp it and run
+// lora_demodulate().  Owns every buffer and its own demod workspace, so one
+// instance per thread is independent of the others.
+class DemodWorkload {
+public:
+    static const size_t PAYLOAD_SIZE = 32;
+
+    explicit DemodWorkload(const Profile& p)
+        : _sf(p.sf), _bw(static_cast<lora_phy::bandwidth>(p.bw)),
+          _ws(new lora_phy::lora_demod_workspace()) {
+        // deterministic payload
+        std::vector<uint8_t> payload(PAYLOAD_SIZE);
+        for (size_t i = 0; i < PAYLOAD_SIZE; ++i) payload[i] = static_cast<uint8_t>(i & 0xFF);
+
+        // encode once to get symbol count
+        _symbols.resize(PAYLOAD_SIZE * 2);
+        _symbol_count = lora_phy::lora_encode(payload.data(), payload.size(), _symbols.data(), _sf);
+        _N = size_t(1) << _sf;
+        _sample_count = (_symbol_count + 2) * _N;
+
+        _samples.resize(_sample_count);
+        _dechirped.resize(_sample_count);
+        _scratch.resize(_sample_count);
+        _demod.resize(_symbol_count);
+
+        // precompute downchirp for dechirp
+        _down.resize(_N);
+        float phase = 0.0f;
+        genChirp(_down.data(), static_cast<int>(_N), 1, static_cast<int>(_N), 0.0f, true,
+                 1.0f, phase, lora_phy::bw_scale(_bw));
+
+        lora_phy::lora_demod_init(_ws.get(), _sf, lora_phy::window_type::window_none,
+                                  _scratch.data(), _scratch.size());
+    }
+
+    ~DemodWorkload() { lora_phy::lora_demod_free(_ws.get()); }
+
+    DemodWorkload(const DemodWorkload&) = delete;
+    DemodWorkload& operator=(const DemodWorkload&) = delete;
+
+    void run() {
+        lora_phy::lora_modulate(_symbols.data(), _symbol_count, _samples.data(), _sf, 1, _bw,
+                                1.0f, 0x12);
+        for (size_t s = 0; s < _symbol_count + 2; ++s)
+            for (size_t i = 0; i < _N; ++i)
+                _dechirped[s * _N + i] = _samples[s * _N + i] * _down[i];
+        lora_phy::lora_demodulate(_ws.get(), _dechirped.data(), _sample_count, _demod.data(), 1,
+                                  nullptr);
+    }
+
+    // Evict this instance's buffers and workspace so its next run() starts
+    // cold; false when flushing is unsupported.
+    bool flush() const {
+        const size_t cf = sizeof(std::complex<float>);
+        bool ok = flush_range(_samples.data(), _samples.size() * cf);
+        flush_range(_dechirped.data(), _dechirped.size() * cf);
+        flush_range(_scratch.data(), _scratch.size() * cf);
+        flush_range(_down.data(), _down.size() * cf);
+        flush_range(_symbols.data(), _symbols.size() * sizeof(uint16_t));
+        flush_range(_demod.data(), _demod.size() * sizeof(uint16_t));
+        flush_range(_ws.get(), sizeof(lora_phy::lora_demod_workspace));
+#ifdef __SSE2__
+        _mm_mfence();
+#endif
+        return ok;
+    }
+
+    lora_phy::lora_demod_workspace* workspace() { return _ws.get(); }
+    size_t symbol_count() const { return _symbol_count; }
+    size_t N() const { return _N; }
+
+    // Bytes touched per packet: sample buffers, symbols and the workspace.
+    size_t working_set() const {
+        return 3 * _sample_count * sizeof(std::complex<float>) +
+               _N * sizeof(std::complex<float>) + sizeof(lora_phy::lora_demod_workspace);
+    }
+
+private:
+    unsigned _sf;
+    lora_phy::bandwidth _bw;
+    std::unique_ptr<lora_phy::lora_demod_workspace> _ws;
+    std::vector<uint16_t> _symbols;
+    size_t _symbol_count{};
+    size_t _N{};
+    size_t _sample_count{};
+    std::vector<std::complex<float>> _samples, _dechirped, _scratch, _down;
+    std::vector<uint16_t> _demod;
+};
+
+} // namespace bench
@@ -0,0 +1,144 @@
+#include <lora_phy/phy.hpp>
+#include "bench_common.h"
+#include <algorithm>
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <fstream>
+#include <iostream>
+#include <memory>
+#include <string>
+#include <vector>
+
+#include <unistd.h>
+
+// Cold start with and without the table cache: every sf/bw/osr/window cell of
+// tests/profiles.yaml is written to one cache file, then each repetition
+// initialises a workspace for every cell once by computing the tables and
+// once from the cache, including table_cache_open() and table_cache_close().
+// Exits non-zero when the cached start is not faster.
+
+using bench::env_count;
+using clock_type = std::chrono::steady_clock;
+
+static double elapsed_ns(clock_type::time_point start) {
+    return std::chrono::duration<double, std::nano>(clock_type::now() - start).count();
+}
+
+static double median(std::vector<double> v) {
+    std::sort(v.begin(), v.end());
+    return v[v.size() / 2];
+}
+
+int main() {
+    std::vector<bench::Profile> profiles;
+    if (!bench::load_profiles("tests/profiles.yaml", profiles)) {
+        std::cerr << "Failed to load profiles.yaml\n";
+        return 1;
+    }
+    const size_t REPEATS = env_count("REPEATS", 11);
+    const size_t WARMUP = env_count("WARMUP", 1);
+
+    // One cell per distinct sf/bw/osr/window, as table_cache_build lays out.
+    std::vector<lora_phy::lora_params> cfgs;
+    std::vector<std::string> names;
+    size_t max_n = 0;
+    for (const auto& p : profiles) {
+        for (unsigned osr : p.osr) {
+            for (const auto& w : p.window) {
+                lora_phy::lora_params c;
+                c.sf = p.sf;
+                c.bw = static_cast<lora_phy::bandwidth>(p.bw);
+                c.osr = osr;
+                c.window = w == "hann" ? lora_phy::window_type::window_hann
+                                       : lora_phy::window_type::window_none;
+                bool dup = false;
+                for (const auto& o : cfgs)
+                    dup = dup || (o.sf == c.sf && o.bw == c.bw && o.osr == c.osr &&
+                                  o.window == c.window);
+                if (dup) continue;
+                cfgs.push_back(c);
+                names.push_back("sf" + std::to_string(p.sf) + "_bw" +
+                                std::to_string(p.bw / 1000) + "/osr" +
+                                std::to_string(osr) + '/' + w);
+                max_n = std::max(max_n, size_t(1) << p.sf);
+            }
+        }
+    }
+
+    const std::string path =
+        "/tmp/lora_cold_start_" + std::to_string(::getpid()) + ".bin";
+    std::unique_ptr<lora_phy::lora_profile_tables> tables(new lora_phy::lora_profile_tables);
+    if (lora_phy::table_cache_write(path.c_str(), cfgs.data(), cfgs.size(),
+                                    tables.get()) != 0) {
+        std::cerr << "table_cache_write failed\n";
+        return 1;
+    }
+    lora_phy::lora_table_cache cache;
+    bool covered = lora_phy::table_cache_open(&cache, path.c_str()) == 0;
+    for (const auto& c : cfgs)
+        covered = covered && lora_phy::table_cache_find(&cache, &c, tables.get()) == 0;
+    lora_phy::table_cache_close(&cache);
+    if (!covered) {
+        std::cerr << "cache does not cover every profile\n";
+        std::remove(path.c_str());
+        return 1;
+    }
+
+    std::unique_ptr<lora_phy::lora_workspace> ws(new lora_phy::lora_workspace());
+    std::vector<float> window(max_n);
+    ws->window = window.data();
+
+    // Per-cell init() times, and whole start-up times for all cells.
+    std::vector<std::vector<double>> computed(cfgs.size()), cached(cfgs.size());
+    std::vector<double> computed_total, cached_total;
+    for (size_t iter = 0; iter < WARMUP + REPEATS; ++iter) {
+        double total = 0.0;
+        for (size_t i = 0; i < cfgs.size(); ++i) {
+            const auto start = clock_type::now();
+            lora_phy::init(ws.get(), &cfgs[i]);
+            const double ns = elapsed_ns(start);
+            total += ns;
+            if (iter >= WARMUP) computed[i].push_back(ns);
+        }
+        if (iter >= WARMUP) computed_total.push_back(total);
+
+        const auto open_start = clock_type::now();
+        lora_phy::table_cache_open(&cache, path.c_str());
+        total = elapsed_ns(open_start);
+        for (size_t i = 0; i < cfgs.size(); ++i) {
+            lora_phy::lora_params c = cfgs[i];
+            c.cache = &cache;
+            const auto start = clock_type::now();
+            lora_phy::init(ws.get(), &c);
+            const double ns = elapsed_ns(start);
+            total += ns;
+            if (iter >= WARMUP) cached[i].push_back(ns);
+        }
+        const auto close_start = clock_type::now();
+        lora_phy::table_cache_close(&cache);
+        total += elapsed_ns(close_start);
+        if (iter >= WARMUP) cached_total.push_back(total);
+    }
+    std::remove(path.c_str());
+
+    const std::string run_id = bench::run_id();
+    std::system("mkdir -p logs");
+    std::ofstream csv("logs/cold_start_" + run_id + ".csv");
+    csv << "run_id,profile,sf,N,computed_ns,cached_ns,speedup\n";
+    for (size_t i = 0; i < cfgs.size(); ++i) {
+        const double c = median(computed[i]), m = median(cached[i]);
+        csv << run_id << ',' << names[i] << ',' << cfgs[i].sf << ','
+            << (size_t(1) << cfgs[i].sf) << ',' << c << ',' << m << ',' << c / m << '\n';
+    }
+    const double c = median(computed_total), m = median(cached_total);
+    csv << run_id << ",all,,," << c << ',' << m << ',' << c / m << '\n';
+    std::cout << '[' << run_id << "] " << cfgs.size() << " profiles: computed " << c / 1e3
+              << " us, cached " << m / 1e3 << " us (open and close included), speedup "
+              << c / m << 'x' << std::endl;
+    if (m >= c) {
+        std::cerr << "cached start is not faster than computing the tables\n";
+        return 1;
+    }
+    return 0;
+}
@@ -0,0 +1,84 @@
+#include <lora_phy/LoRaCodes.hpp>
+#include <lora_phy/phy.hpp>
+#include <algorithm>
+#include <cstdint>
+#include <iostream>
+#include <random>
+#include <vector>
+
+// The slice-by-8 CRC must equal sx1272DataChecksum() for every length across
+// more than one period of the output mask, whether fed at once or in chunks.
+static bool check_crc() {
+    std::mt19937 rng(42);
+    std::vector<uint8_t> data(600);
+    for (auto& b : data) b = static_cast<uint8_t>(rng());
+    for (size_t len = 0; len <= data.size(); ++len) {
+        uint16_t ref = sx1272DataChecksum(data.data(), static_cast<int>(len));
+        if (lora_phy::payload_crc(data.data(), len) != ref) {
+            std::cerr << "crc mismatch at length " << len << "\n";
+            return false;
+        }
+        lora_phy::lora_crc_state st;
+        lora_phy::crc_init(&st);
+        size_t pos = 0;
+        while (pos < len) {
+            size_t chunk = std::min<size_t>(len - pos, 1 + rng() % 19);
+            lora_phy::crc_update(&st, data.data() + pos, chunk);
+            pos += chunk;
+        }
+        if (lora_phy::crc_final(&st) != ref) {
+            std::cerr << "incremental crc mismatch at length " << len << "\n";
+            return false;
+        }
+    }
+    return true;
+}
+
+static bool check_bulk() {
+    std::mt19937 rng(3);
+    std::vector<std::vector<uint8_t>> packets(32);
+    for (size_t i = 0; i < packets.size(); ++i) {
+        packets[i].resize(1 + rng() % 64);
+        for (auto& b : packets[i]) b = static_cast<uint8_t>(rng());
+        uint16_t crc = sx1272DataChecksum(packets[i].data(),
+                                          static_cast<int>(packets[i].size()));
+        packets[i].push_back(static_cast<uint8_t>(crc & 0xff));
+        packets[i].push_back(static_cast<uint8_t>(crc >> 8));
+    }
+    packets[5][0] ^= 0x40;
+    packets[17].back() ^= 0x01;
+    std::vector<const uint8_t*> ptrs;
+    std::vector<size_t> lengths;
+    for (const auto& p : packets) {
+        ptrs.push_back(p.data());
+        lengths.push_back(p.size());
+    }
+    bool results[32];
+    size_t passed = lora_phy::crc_verify_bulk(ptrs.data(), lengths.data(),
+                                              packets.size(), results);
+    bool ok = passed == packets.size() - 2 && !results[5] && !results[17] &&
+              results[0] && results[31];
+    if (!ok) std::cerr << "bulk crc verification failed\n";
+    return ok;
+}
+
+static bool check_header() {
+    for (unsigned h0 = 0; h0 < 256; ++h0) {
+        for (unsigned h1 = 0; h1 < 256; h1 += 7) {
+            const uint8_t h[2] = {static_cast<uint8_t>(h0), static_cast<uint8_t>(h1)};
+            if (lora_phy::header_checksum(h) != headerChecksum(h)) {
+                std::cerr << "header checksum mismatch\n";
+                return false;
+            }
+        }
+    }
+    return true;
+}
+
+int crc_test_main() {
+    bool ok = true;
+    ok = check_crc() && ok;
+    ok = check_bulk() && ok;
+    ok = check_header() && ok;
+    return ok ? 0 : 1;
+}
@@ -0,0 +1,74 @@
+#pragma once
+#include <cstddef>
+#include <cstdint>
+
+namespace latency_histogram {
+
+// Log-linear histogram in the style of HdrHistogram: values below 32 get
+// their own bucket, larger ones share a power-of-two magnitude split into
+// 16 buckets, so every bucket is within 1/16 (about 6%) of its values.  The
+// buckets are a fixed array, recording never allocates.
+class Histogram {
+public:
+    static const unsigned SUB_BITS = 5;
+    static const unsigned HALF = 1u << (SUB_BITS - 1);
+    static const size_t BUCKETS = (64 - SUB_BITS + 1) * HALF + HALF;
+
+    Histogram() { reset(); }
+
+    void reset() {
+        for (size_t i = 0; i < BUCKETS; ++i) _counts[i] = 0;
+        _total = 0;
+        _max = 0;
+    }
+
+    void record(uint64_t v) {
+        ++_counts[index(v)];
+        ++_total;
+        if (v > _max) _max = v;
+    }
+
+    uint64_t count() const { return _total; }
+    uint64_t max() const { return _max; }
+
+    // Smallest recorded value v such that at least @p p percent of the
+    // samples are <= v, reported as the top of its bucket (clamped to max()).
+    uint64_t percentile(double p) const {
+        if (_total == 0) return 0;
+        uint64_t rank = static_cast<uint64_t>(p / 100.0 * static_cast<double>(_total) + 0.5);
+        if (rank < 1) rank = 1;
+        if (rank > _total) rank = _total;
+        uint64_t seen = 0;
+        for (size_t i = 0; i < BUCKETS; ++i) {
+            seen += _counts[i];
+            if (seen >= rank) {
+                uint64_t top = highest(i);
+                return top < _max ? top : _max;
+            }
+        }
+        return _max;
+    }
+
+private:
+    static size_t index(uint64_t v) {
+        if (v < 2 * HALF) return static_cast<size_t>(v);
+        unsigned msb = 63;
+        while (!(v >> msb)) --msb;
+        const unsigned shift = msb - (SUB_BITS - 1);
+        return static_cast<size_t>(shift) * HALF + static_cast<size_t>(v >> shift);
+    }
+
+    // Largest value that maps to bucket @p i.
+    static uint64_t highest(size_t i) {
+        if (i < 2 * HALF) return i;
+        const unsigned shift = static_cast<unsigned>((i - HALF) / HALF);
+        const uint64_t sub = i - static_cast<uint64_t>(shift) * HALF;
+        return ((sub + 1) << shift) - 1;
+    }
+
+    uint64_t _counts[BUCKETS];
+    uint64_t _total;
+    uint64_t _max;
+};
+
+} // namespace latency_histogram
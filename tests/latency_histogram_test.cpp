@@ -0,0 +1,45 @@
+#include "latency_histogram.h"
+#include <algorithm>
+#include <cstdint>
+#include <iostream>
+#include <random>
+#include <vector>
+
+// Percentiles must stay within the bucket resolution of the exact order
+// statistics, never undershoot them and never exceed the maximum.
+int latency_histogram_test_main() {
+    latency_histogram::Histogram h;
+    if (h.percentile(50) != 0 || h.count() != 0) return 1;
+
+    for (uint64_t v = 0; v < 32; ++v) h.record(v);
+    if (h.percentile(100) != 31 || h.percentile(50) != 15) {
+        std::cerr << "small values are not exact\n";
+        return 1;
+    }
+
+    std::mt19937_64 rng(9);
+    std::lognormal_distribution<double> dist(12.0, 1.5);
+    std::vector<uint64_t> values(100000);
+    h.reset();
+    for (auto& v : values) {
+        v = static_cast<uint64_t>(dist(rng));
+        h.record(v);
+    }
+    values.push_back(uint64_t(1) << 62);
+    h.record(values.back());
+    std::sort(values.begin(), values.end());
+
+    bool ok = h.count() == values.size() && h.max() == values.back();
+    const double ps[] = {50.0, 90.0, 99.0, 99.9};
+    for (double p : ps) {
+        size_t rank = static_cast<size_t>(p / 100.0 * static_cast<double>(values.size()) + 0.5);
+        uint64_t exact = values[rank - 1];
+        uint64_t got = h.percentile(p);
+        if (got < exact || static_cast<double>(got) > static_cast<double>(exact) * 1.07) {
+            std::cerr << "p" << p << " " << got << " vs " << exact << "\n";
+            ok = false;
+        }
+    }
+    if (h.percentile(100) != values.back()) ok = false;
+    return ok ? 0 : 1;
+}
@@ -0,0 +1,208 @@
+#include "lora_sdr_reference.h"
+#include <algorithm>
+#include <cmath>
+#include <complex>
+#include <cstddef>
+#include <cstdint>
+#include <cstring>
+#include <vector>
+
+// The submodule headers go into their own namespace so their kissfft and
+// LoRaDetector do not collide with the lora_phy templates of the same name
+// at link time.  Their standard includes are already satisfied above.
+namespace lora_sdr_reference {
+namespace orig {
+#include "LoRaCodes.hpp"
+#include "LoRaDetector.hpp"
+} // namespace orig
+} // namespace lora_sdr_reference
+
+// The submodule's ChirpGenerator.hpp pulls in Pothos/Config.hpp; the
+// lora_phy copy is the same generator with an optional bandwidth scale that
+// defaults to 1.
+#include <lora_phy/ChirpGenerator.hpp>
+
+namespace lora_sdr_reference {
+
+namespace {
+
+// LoRaEncoder::encodeFec
+void encode_fec(std::vector<uint8_t>& codewords, unsigned rdd, size_t& cOfs, size_t& dOfs,
+                const uint8_t* bytes, size_t count) {
+    for (size_t i = 0; i < count; i++, dOfs++) {
+        uint8_t nib = (dOfs & 1) ? bytes[dOfs >> 1] >> 4 : bytes[dOfs >> 1] & 0xf;
+        switch (rdd) {
+        case 1: codewords[cOfs++] = orig::encodeParity54(nib); break;
+        case 2: codewords[cOfs++] = orig::encodeParity64(nib); break;
+        case 3: codewords[cOfs++] = orig::encodeHamming74sx(nib); break;
+        default: codewords[cOfs++] = orig::encodeHamming84sx(nib); break;
+        }
+    }
+}
+
+// LoRaDecoder::work's FEC stage.  Uncorrectable codewords are left to the
+// CRC check, as in the block.
+void decode_fec(const uint8_t* codewords, size_t count, unsigned rdd, uint8_t* nibbles) {
+    for (size_t i = 0; i < count; i++) {
+        bool error = false, bad = false;
+        switch (rdd) {
+        case 1: nibbles[i] = orig::checkParity54(codewords[i], error); break;
+        case 2: nibbles[i] = orig::checkParity64(codewords[i], error); break;
+        case 3: nibbles[i] = orig::decodeHamming74sx(codewords[i], error); break;
+        default: nibbles[i] = orig::decodeHamming84sx(codewords[i], error, bad); break;
+        }
+    }
+}
+
+} // namespace
+
+size_t encode(const Config& cfg, const uint8_t* payload, size_t payload_len,
+              uint16_t* symbols, size_t symbol_cap) {
+    const size_t PPM = cfg.sf;
+    const size_t header_cw = cfg.explicit_header ? N_HEADER_CODEWORDS : 0;
+    std::vector<uint8_t> bytes(payload, payload + payload_len);
+    if (cfg.crc) {
+        const uint16_t crc = orig::sx1272DataChecksum(bytes.data(), static_cast<int>(payload_len));
+        bytes.push_back(static_cast<uint8_t>(crc & 0xff));
+        bytes.push_back(static_cast<uint8_t>(crc >> 8));
+    }
+    const size_t numCodewords =
+        orig::roundUp(static_cast<unsigned>(bytes.size() * 2 + header_cw),
+                      static_cast<unsigned>(PPM));
+    const size_t numSymbols = N_HEADER_SYMBOLS + (numCodewords / PPM - 1) * (4 + cfg.rdd);
+    if (numSymbols > symbol_cap) return 0;
+    bytes.resize(numCodewords / 2 + 1);  // zero padding for the last block
+
+    std::vector<uint8_t> codewords(numCodewords);
+    size_t cOfs = 0, dOfs = 0;
+    if (cfg.explicit_header) {
+        uint8_t hdr[3];
+        hdr[0] = static_cast<uint8_t>(payload_len);
+        hdr[1] = static_cast<uint8_t>((cfg.crc ? 1 : 0) | (cfg.rdd << 1));
+        hdr[2] = orig::headerChecksum(hdr);
+        codewords[cOfs++] = orig::encodeHamming84sx(hdr[0] >> 4);
+        codewords[cOfs++] = orig::encodeHamming84sx(hdr[0] & 0xf);
+        codewords[cOfs++] = orig::encodeHamming84sx(hdr[1] & 0xf);
+        codewords[cOfs++] = orig::encodeHamming84sx(hdr[2] >> 4);
+        codewords[cOfs++] = orig::encodeHamming84sx(hdr[2] & 0xf);
+    }
+    encode_fec(codewords, HEADER_RDD, cOfs, dOfs, bytes.data(), PPM - header_cw);
+    orig::Sx1272ComputeWhiteningLfsr(codewords.data() + header_cw,
+                                     static_cast<uint16_t>(PPM - header_cw), 0, HEADER_RDD);
+    if (numCodewords > PPM) {
+        encode_fec(codewords, cfg.rdd, cOfs, dOfs, bytes.data(), numCodewords - PPM);
+        orig::Sx1272ComputeWhiteningLfsr(codewords.data() + PPM,
+                                         static_cast<uint16_t>(numCodewords - PPM),
+                                         static_cast<int>(PPM - header_cw), cfg.rdd);
+    }
+
+    orig::diagonalInterleaveSx(codewords.data(), PPM, symbols, PPM, HEADER_RDD);
+    if (numCodewords > PPM)
+        orig::diagonalInterleaveSx(codewords.data() + PPM, numCodewords - PPM,
+                                   symbols + N_HEADER_SYMBOLS, PPM, cfg.rdd);
+    for (size_t i = 0; i < numSymbols; i++) symbols[i] = orig::grayToBinary16(symbols[i]);
+    return numSymbols;
+}
+
+size_t decode(const Config& cfg, const uint16_t* symbols, size_t symbol_count,
+              uint8_t* payload, size_t payload_cap) {
+    const size_t PPM = cfg.sf;
+    if (symbol_count < N_HEADER_SYMBOLS) return 0;
+    std::vector<uint16_t> grayed(symbol_count);
+    for (size_t i = 0; i < symbol_count; i++) grayed[i] = orig::binaryToGray16(symbols[i]);
+
+    // The header block is always 4/8; the header tells the rate of the rest.
+    std::vector<uint8_t> codewords(PPM);
+    orig::diagonalDeterleaveSx(grayed.data(), N_HEADER_SYMBOLS, codewords.data(), PPM,
+                               HEADER_RDD);
+    const size_t header_cw = cfg.explicit_header ? N_HEADER_CODEWORDS : 0;
+    orig::Sx1272ComputeWhiteningLfsr(codewords.data() + header_cw,
+                                     static_cast<uint16_t>(PPM - header_cw), 0, HEADER_RDD);
+    std::vector<uint8_t> nibbles(PPM);
+    decode_fec(codewords.data(), PPM, HEADER_RDD, nibbles.data());
+    unsigned rdd = cfg.rdd;
+    bool crc = cfg.crc;
+    size_t length;
+    if (cfg.explicit_header) {
+        uint8_t hdr[3];
+        hdr[0] = static_cast<uint8_t>(nibbles[0] << 4 | nibbles[1]);
+        hdr[1] = nibbles[2];
+        hdr[2] = static_cast<uint8_t>(nibbles[3] << 4 | nibbles[4]);
+        rdd = (hdr[1] >> 1) & 0x7;
+        if (orig::headerChecksum(hdr) != hdr[2] || rdd < 1 || rdd > 4) return 0;
+        length = hdr[0];
+        crc = hdr[1] & 1;
+    } else {
+        const size_t blocks = 1 + (symbol_count - N_HEADER_SYMBOLS) / (4 + rdd);
+        length = blocks * PPM / 2 - (crc ? 2 : 0);
+    }
+    if (length > payload_cap) return 0;
+
+    const size_t rest = (symbol_count - N_HEADER_SYMBOLS) / (4 + rdd) * (4 + rdd);
+    const size_t rest_cw = rest / (4 + rdd) * PPM;
+    if (rest_cw) {
+        codewords.resize(PPM + rest_cw);
+        nibbles.resize(PPM + rest_cw);
+        std::fill(codewords.begin() + static_cast<long>(PPM), codewords.end(), 0);
+        orig::diagonalDeterleaveSx(grayed.data() + N_HEADER_SYMBOLS, rest,
+                                   codewords.data() + PPM, PPM, rdd);
+        orig::Sx1272ComputeWhiteningLfsr(codewords.data() + PPM, static_cast<uint16_t>(rest_cw),
+                                         static_cast<int>(PPM - header_cw), rdd);
+        decode_fec(codewords.data() + PPM, rest_cw, rdd, nibbles.data() + PPM);
+    }
+
+    const size_t total = length + (crc ? 2 : 0);
+    if (header_cw + 2 * total > nibbles.size()) return 0;
+    std::vector<uint8_t> bytes(total);
+    for (size_t i = 0; i < total; i++)
+        bytes[i] = static_cast<uint8_t>(nibbles[header_cw + 2 * i] |
+                                        nibbles[header_cw + 2 * i + 1] << 4);
+    if (crc) {
+        const uint16_t expect =
+            orig::sx1272DataChecksum(bytes.data(), static_cast<int>(length));
+        if ((expect & 0xff) != bytes[length] || (expect >> 8) != bytes[length + 1]) return 0;
+    }
+    std::copy(bytes.begin(), bytes.begin() + static_cast<long>(length), payload);
+    return length;
+}
+
+void modulate(unsigned sf, uint8_t sync_word, const uint16_t* symbols, size_t symbol_count,
+              std::complex<float>* iq) {
+    const int N = 1 << sf;
+    const unsigned shift = sf > 4 ? sf - 4 : 0;
+    float phaseAccum = 0.0f;
+    auto chirp = [&](unsigned sym, std::complex<float>* out) {
+        genChirp(out, N, 1, N, float(2 * M_PI * sym) / N, false, 1.0f, phaseAccum);
+    };
+    chirp(static_cast<unsigned>(sync_word >> 4) << shift, iq);
+    chirp(static_cast<unsigned>(sync_word & 0xf) << shift, iq + N);
+    for (size_t s = 0; s < symbol_count; s++) chirp(symbols[s], iq + (s + 2) * N);
+}
+
+struct Demodulator::Impl {
+    explicit Impl(unsigned sf) : N(size_t(1) << sf), detector(N), downChirp(N) {
+        float phaseAccum = 0.0f;
+        genChirp(downChirp.data(), static_cast<int>(N), 1, static_cast<int>(N), 0.0f, true,
+                 1.0f, phaseAccum);
+    }
+
+    size_t N;
+    orig::LoRaDetector<float> detector;
+    std::vector<std::complex<float>> downChirp;
+};
+
+Demodulator::Demodulator(unsigned sf) : _impl(new Impl(sf)) {}
+
+Demodulator::~Demodulator() = default;
+
+void Demodulator::run(const std::complex<float>* iq, size_t symbol_count, uint16_t* symbols) {
+    Impl& d = *_impl;
+    for (size_t s = 0; s < symbol_count; s++) {
+        const std::complex<float>* samps = iq + s * d.N;
+        for (size_t i = 0; i < d.N; i++) d.detector.feed(i, samps[i] * d.downChirp[i]);
+        float power, powerAvg, fIndex;
+        symbols[s] = static_cast<uint16_t>(d.detector.detect(power, powerAvg, fIndex));
+    }
+}
+
+} // namespace lora_sdr_reference
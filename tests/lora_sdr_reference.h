@@ -0,0 +1,53 @@
+#pragma once
+#include <complex>
+#include <cstddef>
+#include <cstdint>
+#include <memory>
+
+// The original LoRa-SDR processing chain, built from the submodule headers
+// (LoRaCodes.hpp, LoRaDetector.hpp, kissfft.hh) with the per-packet logic of
+// its Pothos blocks (LoRaEncoder, LoRaDecoder, LoRaMod, LoRaDemod) minus the
+// framework.  Compiled in its own translation unit: the submodule's
+// kissfft.hh and LoRaDetector clash with the lora_phy copies of the same
+// names.
+namespace lora_sdr_reference {
+
+struct Config {
+    unsigned sf{7};
+    unsigned rdd{1};             // coding rate 4/(4+rdd)
+    bool explicit_header{true};
+    bool crc{true};
+};
+
+// LoRaEncoder::work: CRC, FEC, whitening, interleaving and Gray mapping as
+// whole-packet passes over per-packet vectors.  Returns the symbol count, 0
+// when @p symbol_cap is too small.
+size_t encode(const Config& cfg, const uint8_t* payload, size_t payload_len,
+              uint16_t* symbols, size_t symbol_cap);
+
+// LoRaDecoder::work, the inverse of encode().  Returns the payload length, 0
+// when the header or CRC check fails or @p payload_cap is too small.
+size_t decode(const Config& cfg, const uint16_t* symbols, size_t symbol_count,
+              uint8_t* payload, size_t payload_cap);
+
+// LoRaMod::work for the two sync word symbols and @p symbol_count data
+// symbols; writes (symbol_count + 2) << sf samples.
+void modulate(unsigned sf, uint8_t sync_word, const uint16_t* symbols, size_t symbol_count,
+              std::complex<float>* iq);
+
+// LoRaDemod::work for symbol-aligned input: dechirp each symbol, feed the
+// LoRaDetector and take its peak bin.
+class Demodulator {
+public:
+    explicit Demodulator(unsigned sf);
+    ~Demodulator();
+
+    // Writes one bin per symbol of @p iq (@p symbol_count symbols).
+    void run(const std::complex<float>* iq, size_t symbol_count, uint16_t* symbols);
+
+private:
+    struct Impl;
+    std::unique_ptr<Impl> _impl;
+};
+
+} // namespace lora_sdr_reference
@@ -0,0 +1,124 @@
+#include <lora_phy/phy.hpp>
+#include <lora_phy/ChirpGenerator.hpp>
+#include <complex>
+#include <cstdint>
+#include <iostream>
+#include <random>
+#include <vector>
+
+// Dechirped stream of @p symbols including the two sync symbols.
+static std::vector<std::complex<float>> dechirped_frame(
+    const std::vector<uint16_t>& symbols, unsigned sf) {
+    const size_t N = size_t(1) << sf;
+    std::vector<std::complex<float>> samples((symbols.size() + 2) * N);
+    lora_phy::lora_modulate(symbols.data(), symbols.size(), samples.data(), sf, 1,
+                            lora_phy::bandwidth::bw_125, 1.0f, 0x12);
+    std::vector<std::complex<float>> down(N);
+    float phase = 0.0f;
+    genChirp(down.data(), static_cast<int>(N), 1, static_cast<int>(N), 0.0f, true,
+             1.0f, phase, lora_phy::bw_scale(lora_phy::bandwidth::bw_125));
+    for (size_t i = 0; i < samples.size(); ++i) samples[i] *= down[i % N];
+    return samples;
+}
+
+static size_t symbol_errors(const std::vector<uint16_t>& a,
+                            const std::vector<uint16_t>& b) {
+    size_t e = 0;
+    for (size_t i = 0; i < a.size(); ++i) e += a[i] != b[i];
+    return e;
+}
+
+int mrc_test_main() {
+    const unsigned sf = 8;
+    const size_t N = size_t(1) << sf;
+    std::mt19937 rng(11);
+    std::vector<uint16_t> symbols(200);
+    for (auto& s : symbols) s = static_cast<uint16_t>(rng() % N);
+    const std::vector<std::complex<float>> clean = dechirped_frame(symbols, sf);
+    const size_t sample_count = clean.size();
+
+    // Four branches with distinct gains and phases.
+    const std::complex<float> gains[lora_phy::LORA_MAX_BRANCHES] = {
+        std::polar(0.5f, 0.3f), std::polar(0.35f, 2.1f), std::polar(0.1f, -1.0f),
+        std::polar(0.25f, 1.4f)};
+
+    lora_phy::lora_demod_workspace ws{};
+    std::vector<std::complex<float>> scratch(sample_count);
+    lora_phy::lora_demod_init(&ws, sf, lora_phy::window_type::window_none,
+                              scratch.data(), scratch.size());
+    bool ok = true;
+
+    for (int noisy = 0; noisy < 2; ++noisy) {
+        std::normal_distribution<float> noise(0.0f, noisy ? 1.6f : 0.0f);
+        std::vector<std::vector<std::complex<float>>> streams(lora_phy::LORA_MAX_BRANCHES);
+        const std::complex<float>* ptrs[lora_phy::LORA_MAX_BRANCHES];
+        for (size_t b = 0; b < streams.size(); ++b) {
+            streams[b].resize(sample_count);
+            for (size_t i = 0; i < sample_count; ++i)
+                streams[b][i] = gains[b] * clean[i] +
+                                std::complex<float>(noise(rng), noise(rng));
+            ptrs[b] = streams[b].data();
+        }
+
+        std::vector<uint16_t> combined(symbols.size());
+        uint8_t sync = 0;
+        size_t n = lora_phy::lora_demodulate_mrc(&ws, ptrs, streams.size(), sample_count,
+                                                 combined.data(), 1, &sync);
+        if (n != symbols.size() || ws.metrics.branches != streams.size()) {
+            std::cerr << "MRC produced " << n << " symbols\n";
+            ok = false;
+            continue;
+        }
+        // Branch SNR follows the branch gains.
+        for (size_t b = 0; b + 1 < streams.size(); ++b) {
+            const bool stronger = std::abs(gains[b]) > std::abs(gains[b + 1]);
+            if (noisy && stronger != (ws.metrics.branch_snr[b] > ws.metrics.branch_snr[b + 1])) {
+                std::cerr << "branch " << b << " SNR " << ws.metrics.branch_snr[b]
+                          << " out of order\n";
+                ok = false;
+            }
+        }
+        const size_t mrc_errors = symbol_errors(combined, symbols);
+
+        if (!noisy) {
+            if (mrc_errors != 0 || sync != 0x12) {
+                std::cerr << "MRC noise-free errors " << mrc_errors << "\n";
+                ok = false;
+            }
+            continue;
+        }
+
+        // Against the best single branch through the ordinary demodulator.
+        std::vector<uint16_t> single(symbols.size());
+        lora_phy::lora_demodulate(&ws, ptrs[0], sample_count, single.data(), 1);
+        const size_t single_errors = symbol_errors(single, symbols);
+        if (mrc_errors * 4 >= single_errors || single_errors == 0) {
+            std::cerr << "MRC errors " << mrc_errors << " vs best branch "
+                      << single_errors << "\n";
+            ok = false;
+        }
+    }
+
+    // Branch counts outside 1..LORA_MAX_BRANCHES are rejected.
+    std::vector<uint16_t> out(symbols.size());
+    const std::complex<float>* one[lora_phy::LORA_MAX_BRANCHES + 1] = {
+        clean.data(), clean.data(), clean.data(), clean.data(), clean.data()};
+    if (lora_phy::lora_demodulate_mrc(&ws, one, 0, sample_count, out.data(), 1) != 0 ||
+        lora_phy::lora_demodulate_mrc(&ws, one, lora_phy::LORA_MAX_BRANCHES + 1,
+                                      sample_count, out.data(), 1) != 0)
+        ok = false;
+    // A single branch reduces to the plain demodulator and clears the SNR of
+    // the branches the previous four-branch call reported.
+    if (lora_phy::lora_demodulate_mrc(&ws, one, 1, sample_count, out.data(), 1) !=
+            symbols.size() ||
+        out != symbols)
+        ok = false;
+    for (size_t b = 1; b < lora_phy::LORA_MAX_BRANCHES; ++b)
+        if (ws.metrics.branch_snr[b] != 0.0f) {
+            std::cerr << "stale SNR for branch " << b << "\n";
+            ok = false;
+        }
+
+    lora_phy::lora_demod_free(&ws);
+    return ok ? 0 : 1;
+}
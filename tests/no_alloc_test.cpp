@@ -105,6 +105,38 @@ int main() {
         return 1;
     }
 
+    // Full encode/decode chain through the workspace API.
+    {
+        const size_t N = size_t(1) << sf;
+        std::vector<std::complex<float>> fft_in(N), fft_out(N);
+        lora_phy::lora_workspace pws{};
+        pws.fft_in = fft_in.data();
+        pws.fft_out = fft_out.data();
+        lora_phy::lora_params p{};
+        p.sf = sf;
+        p.explicit_header = true;
+        p.crc = true;
+        lora_phy::init(&pws, &p);
+        std::vector<uint8_t> payload(32, 0x5a), out(payload.size());
+        std::vector<uint16_t> coded(lora_phy::encoded_symbol_count(&pws, payload.size()));
+
+        alloc_tracker::Guard guard;
+        ssize_t n = lora_phy::encode(&pws, payload.data(), payload.size(),
+                                     coded.data(), coded.size());
+        ssize_t m = n < 0 ? -1
+                          : lora_phy::decode(&pws, coded.data(), static_cast<size_t>(n),
+                                             out.data(), out.size());
+        if (guard.count() != 0) {
+            std::cerr << "Allocation occurred in encode/decode" << std::endl;
+            return 1;
+        }
+        if (m != static_cast<ssize_t>(payload.size()) || out != payload ||
+            !pws.metrics.crc_ok) {
+            std::cerr << "Encode/decode round-trip mismatch" << std::endl;
+            return 1;
+        }
+    }
+
     std::cout << "No allocations detected" << std::endl;
     return 0;
 }
@@ -0,0 +1,99 @@
+#pragma once
+#include <cstddef>
+#include <cstdint>
+#include <cstring>
+
+#ifdef __linux__
+#include <linux/perf_event.h>
+#include <sys/ioctl.h>
+#include <sys/syscall.h>
+#include <unistd.h>
+#endif
+
+namespace perf_counters {
+
+// Hardware events read as one group, in this order.
+enum Event { CYCLES, INSTRUCTIONS, L1D_MISSES, LLC_MISSES, BRANCH_MISSES, EVENT_COUNT };
+
+static const char* const EVENT_NAMES[EVENT_COUNT] = {
+    "core_cycles", "instructions", "l1d_misses", "llc_misses", "branch_misses"};
+
+// User-space hardware counters of the calling thread through Linux
+// perf_event_open().  Events the kernel or CPU refuses (no PMU in a VM,
+// perf_event_paranoid, non-Linux builds) are left out; available() tells
+// which ones count.  read() fills every slot, zero for missing events.
+class Group {
+public:
+    Group() {
+        for (int e = 0; e < EVENT_COUNT; ++e) _fd[e] = -1;
+#ifdef __linux__
+        static const uint32_t types[EVENT_COUNT] = {
+            PERF_TYPE_HARDWARE, PERF_TYPE_HARDWARE, PERF_TYPE_HW_CACHE,
+            PERF_TYPE_HARDWARE, PERF_TYPE_HARDWARE};
+        static const uint64_t configs[EVENT_COUNT] = {
+            PERF_COUNT_HW_CPU_CYCLES, PERF_COUNT_HW_INSTRUCTIONS,
+            PERF_COUNT_HW_CACHE_L1D | (PERF_COUNT_HW_CACHE_OP_READ << 8) |
+                (PERF_COUNT_HW_CACHE_RESULT_MISS << 16),
+            PERF_COUNT_HW_CACHE_MISSES, PERF_COUNT_HW_BRANCH_MISSES};
+        for (int e = 0; e < EVENT_COUNT; ++e) {
+            perf_event_attr attr;
+            std::memset(&attr, 0, sizeof(attr));
+            attr.size = sizeof(attr);
+            attr.type = types[e];
+            attr.config = configs[e];
+            attr.disabled = _leader < 0;
+            attr.exclude_kernel = 1;
+            attr.exclude_hv = 1;
+            attr.read_format = PERF_FORMAT_GROUP;
+            int fd = static_cast<int>(syscall(SYS_perf_event_open, &attr, 0, -1,
+                                              _leader, 0));
+            if (fd < 0) continue;
+            if (_leader < 0) _leader = fd;
+            _fd[e] = fd;
+            _slot[_open++] = e;
+        }
+        if (_leader >= 0) {
+            ioctl(_leader, PERF_EVENT_IOC_RESET, PERF_IOC_FLAG_GROUP);
+            ioctl(_leader, PERF_EVENT_IOC_ENABLE, PERF_IOC_FLAG_GROUP);
+        }
+#endif
+    }
+
+    ~Group() {
+#ifdef __linux__
+        for (int e = 0; e < EVENT_COUNT; ++e)
+            if (_fd[e] >= 0) close(_fd[e]);
+#endif
+    }
+
+    Group(const Group&) = delete;
+    Group& operator=(const Group&) = delete;
+
+    bool available(int event) const { return _fd[event] >= 0; }
+    bool any() const { return _leader >= 0; }
+
+    void read(uint64_t* values) const {
+        for (int e = 0; e < EVENT_COUNT; ++e) values[e] = 0;
+#ifdef __linux__
+        if (_leader < 0) return;
+        uint64_t buf[1 + EVENT_COUNT];
+        ssize_t n = ::read(_leader, buf, sizeof(buf));
+        if (n < static_cast<ssize_t>(sizeof(uint64_t))) return;
+        for (uint64_t i = 0; i < buf[0] && i < static_cast<uint64_t>(_open); ++i)
+            values[_slot[i]] = buf[1 + i];
+#endif
+    }
+
+    // Adapter for lora_stage_times::read_counters.
+    static void read_into(void* ctx, uint64_t* values) {
+        static_cast<const Group*>(ctx)->read(values);
+    }
+
+private:
+    int _fd[EVENT_COUNT];
+    int _slot[EVENT_COUNT]{};
+    int _open{0};
+    int _leader{-1};
+};
+
+} // namespace perf_counters
@@ -1,141 +1,376 @@
 #include <lora_phy/phy.hpp>
-#include <lora_phy/ChirpGenerator.hpp>
+#include "bench_common.h"
+#include "latency_histogram.h"
+#include "perf_counters.h"
+#include <algorithm>
 #include <chrono>
 #include <complex>
 #include <cstdint>
 #include <cstdlib>
 #include <fstream>
 #include <iostream>
+#include <memory>
 #include <string>
 #include <vector>
 #include <x86intrin.h>
 
-struct Profile {
-    std::string name;
-    unsigned sf{};
-    unsigned bw{};
-    std::string cr;
-    std::string dir;
+using bench::env_count;
+
+// CSV column prefix of each lora_phy::demod_stage.
+static const char* const STAGE_NAMES[] = {"normalize", "offsets", "cfo", "fft", "argmax"};
+static const size_t STAGE_COUNT = static_cast<size_t>(lora_phy::demod_stage::count);
+static_assert(perf_counters::EVENT_COUNT == lora_phy::LORA_STAGE_COUNTERS,
+              "stage counter slots must match the perf event group");
+
+// Hardware counter columns: per-symbol counts of every event except
+// instructions, plus IPC.  Empty when the event is unavailable.
+static void counter_header(std::ostream& csv, const std::string& prefix) {
+    for (int e = 0; e < perf_counters::EVENT_COUNT; ++e)
+        if (e != perf_counters::INSTRUCTIONS)
+            csv << ',' << prefix << perf_counters::EVENT_NAMES[e] << "_per_symbol";
+    csv << ',' << prefix << "ipc";
+}
+
+static void counter_values(std::ostream& csv, const perf_counters::Group* pmu,
+                           const uint64_t* delta, double symbols) {
+    for (int e = 0; e < perf_counters::EVENT_COUNT; ++e) {
+        if (e == perf_counters::INSTRUCTIONS) continue;
+        csv << ',';
+        if (pmu && pmu->available(e)) csv << static_cast<double>(delta[e]) / symbols;
+    }
+    csv << ',';
+    if (pmu && pmu->available(perf_counters::CYCLES) &&
+        pmu->available(perf_counters::INSTRUCTIONS) && delta[perf_counters::CYCLES])
+        csv << static_cast<double>(delta[perf_counters::INSTRUCTIONS]) /
+                   static_cast<double>(delta[perf_counters::CYCLES]);
+}
+
+// One cell of the benchmark matrix: a phy workspace configured for one
+// profile/osr/window/payload combination, with the canonical input of every
+// op prepared up front.  Each op is timed on its own input: encode() on the
+// payload, modulate() and decode() on the encoded symbols and demodulate() on
+// the modulated samples.
+class MatrixCell {
+public:
+    static const char* const OPS[];
+    static const size_t OP_COUNT = 4;
+
+    MatrixCell(const bench::Profile& p, unsigned osr, lora_phy::window_type window,
+               size_t payload_len)
+        : _N(size_t(1) << p.sf), _fft_in(_N), _fft_out(_N * osr), _window(_N),
+          _payload(payload_len), _decoded(payload_len) {
+        _ws.fft_in = _fft_in.data();
+        _ws.fft_out = _fft_out.data();
+        _ws.window = _window.data();
+        lora_phy::lora_params cfg;
+        cfg.sf = p.sf;
+        cfg.bw = static_cast<lora_phy::bandwidth>(p.bw);
+        cfg.cr = bench::cr_index(p.cr);
+        cfg.osr = osr;
+        cfg.window = window;
+        cfg.explicit_header = true;
+        cfg.crc = true;
+        if (lora_phy::init(&_ws, &cfg) != 0) return;
+        for (size_t i = 0; i < payload_len; ++i) _payload[i] = static_cast<uint8_t>(i * 7 + 1);
+        _symbols.resize(lora_phy::encoded_symbol_count(&_ws, payload_len));
+        _demod.resize(_symbols.size() + 2);
+        _iq.resize((_symbols.size() + 2) * _N * osr);
+        _ok = lora_phy::encode(&_ws, _payload.data(), _payload.size(), _symbols.data(),
+                               _symbols.size()) == static_cast<ssize_t>(_symbols.size()) &&
+              lora_phy::modulate(&_ws, _symbols.data(), _symbols.size(), _iq.data(),
+                                 _iq.size()) == static_cast<ssize_t>(_iq.size());
+    }
+
+    bool ok() const { return _ok; }
+    size_t symbol_count() const { return _symbols.size(); }
+    size_t N() const { return _N; }
+
+    void run(size_t op) {
+        switch (op) {
+        case 0:
+            lora_phy::encode(&_ws, _payload.data(), _payload.size(), _symbols.data(),
+                             _symbols.size());
+            break;
+        case 1:
+            lora_phy::modulate(&_ws, _symbols.data(), _symbols.size(), _iq.data(), _iq.size());
+            break;
+        case 2:
+            lora_phy::demodulate(&_ws, _iq.data(), _iq.size(), _demod.data(), _demod.size());
+            break;
+        default:
+            lora_phy::decode(&_ws, _symbols.data(), _symbols.size(), _decoded.data(),
+                             _decoded.size());
+            break;
+        }
+    }
+
+private:
+    size_t _N;
+    std::vector<std::complex<float>> _fft_in, _fft_out;
+    std::vector<float> _window;
+    lora_phy::lora_workspace _ws{};
+    bool _ok{false};
+    std::vector<uint8_t> _payload, _decoded;
+    std::vector<uint16_t> _symbols, _demod;
+    std::vector<std::complex<float>> _iq;
 };
 
-static std::string trim(const std::string& s) {
-    const auto start = s.find_first_not_of(" \t\r\n");
-    if (start == std::string::npos) return "";
-    const auto end = s.find_last_not_of(" \t\r\n");
-    return s.substr(start, end - start + 1);
+const char* const MatrixCell::OPS[] = {"encode", "modulate", "demodulate", "decode"};
+
+// Time every op of every profile x osr x window x payload cell into
+// logs/matrix_<RUN_ID>.csv.  The profile column names the whole cell so
+// compare_perf.py diffs each one separately.
+static int run_matrix(const std::vector<bench::Profile>& profiles, const std::string& run_id,
+                      size_t packets, size_t repeats, size_t warmup) {
+    std::ofstream csv("logs/matrix_" + run_id + ".csv");
+    csv << "run_id,profile,rep,sf,N,cr,osr,window,payload,op,pps,ns_per_packet,"
+           "ns_per_symbol,lat_p50_ns,lat_p99_ns\n";
+    latency_histogram::Histogram latency;
+    int failed = 0;
+    for (const auto& p : profiles) {
+        for (unsigned osr : p.osr) {
+            for (const auto& wname : p.window) {
+                const lora_phy::window_type window = wname == "hann"
+                                                         ? lora_phy::window_type::window_hann
+                                                         : lora_phy::window_type::window_none;
+                for (size_t payload : p.payload) {
+                    const std::string cell = p.name + "/osr" + std::to_string(osr) + '/' +
+                                             wname + "/p" + std::to_string(payload);
+                    MatrixCell work(p, osr, window, payload);
+                    if (!work.ok()) {
+                        std::cerr << cell << ": setup failed\n";
+                        failed = 1;
+                        continue;
+                    }
+                    for (size_t op = 0; op < MatrixCell::OP_COUNT; ++op) {
+                        const char* name = MatrixCell::OPS[op];
+                        for (size_t iter = 0; iter < warmup + repeats; ++iter) {
+                            latency.reset();
+                            auto t_start = std::chrono::steady_clock::now();
+                            for (size_t pkt = 0; pkt < packets; ++pkt) {
+                                auto p_start = std::chrono::steady_clock::now();
+                                work.run(op);
+                                latency.record(static_cast<uint64_t>(
+                                    std::chrono::duration_cast<std::chrono::nanoseconds>(
+                                        std::chrono::steady_clock::now() - p_start).count()));
+                            }
+                            const double seconds = std::chrono::duration<double>(
+                                std::chrono::steady_clock::now() - t_start).count();
+                            if (iter < warmup) continue;
+                            const double ns = seconds * 1e9 / static_cast<double>(packets);
+                            csv << run_id << ',' << cell << '/' << name << ',' << iter - warmup
+                                << ',' << p.sf << ',' << work.N() << ',' << p.cr << ',' << osr
+                                << ',' << wname << ',' << payload << ',' << name << ','
+                                << static_cast<double>(packets) / seconds << ',' << ns << ','
+                                << ns / static_cast<double>(work.symbol_count()) << ','
+                                << latency.percentile(50.0) << ',' << latency.percentile(99.0)
+                                << '\n';
+                        }
+                        std::cout << '[' << run_id << "] " << cell << ' ' << name << ": p50 "
+                                  << latency.percentile(50.0) / 1000.0 << " us" << std::endl;
+                    }
+                }
+            }
+        }
+    }
+    return failed;
 }
 
-static bool load_profiles(const std::string& path, std::vector<Profile>& out) {
-    std::ifstream f(path);
-    if (!f) return false;
-    std::string line;
-    Profile current;
-    bool in_profile = false;
-    while (std::getline(f, line)) {
-        line = trim(line);
-        if (line.empty() || line[0] == '#') continue;
-        if (line[0] == '-') {
-            if (in_profile) out.push_back(current);
-            current = Profile();
-            in_profile = true;
-            continue;
+// Many-channel gateway model: rotate through @p workspaces independent
+// workloads, whose buffers together exceed the last-level cache, instead of
+// looping on one.  Rows per profile: warm (one workload, as above), cold
+// (round-robin) and, with @p flush, cold_flush (each workload is also evicted
+// with clflush before it runs).  Only run() is timed.
+static void run_cold(const std::vector<bench::Profile>& profiles, const std::string& run_id,
+                     size_t packets, size_t repeats, size_t warmup, size_t workspaces,
+                     bool flush) {
+    static const char* const MODES[] = {"warm", "cold", "cold_flush"};
+    const size_t llc = bench::llc_bytes();
+    std::ofstream csv("logs/cold_" + run_id + ".csv");
+    csv << "run_id,profile,rep,sf,N,mode,workspaces,working_set_bytes,workspace_bytes,pps,"
+           "lat_p50_ns,lat_p99_ns\n";
+    latency_histogram::Histogram latency;
+    for (const auto& p : profiles) {
+        std::vector<std::unique_ptr<bench::DemodWorkload>> work;
+        work.emplace_back(new bench::DemodWorkload(p));
+        const size_t working_set = work[0]->working_set();
+        // Default to twice the LLC (32 MiB assumed when unknown).
+        size_t m = workspaces;
+        if (!m) m = 2 * (llc ? llc : size_t(32) << 20) / working_set + 1;
+        m = std::max<size_t>(m, 2);
+        while (work.size() < m) work.emplace_back(new bench::DemodWorkload(p));
+        if (flush && !work[0]->flush()) {
+            std::cerr << "cache-line flush unavailable; cold_flush skipped\n";
+            flush = false;
+        }
+
+        double pps[3] = {};
+        for (size_t mode = 0; mode < (flush ? 3u : 2u); ++mode) {
+            std::vector<double> reps;
+            for (size_t iter = 0; iter < warmup + repeats; ++iter) {
+                latency.reset();
+                double seconds = 0.0;
+                for (size_t pkt = 0; pkt < packets; ++pkt) {
+                    bench::DemodWorkload& w = *work[mode == 0 ? 0 : pkt % m];
+                    if (mode == 2) w.flush();
+                    auto p_start = std::chrono::steady_clock::now();
+                    w.run();
+                    auto elapsed = std::chrono::steady_clock::now() - p_start;
+                    seconds += std::chrono::duration<double>(elapsed).count();
+                    latency.record(static_cast<uint64_t>(
+                        std::chrono::duration_cast<std::chrono::nanoseconds>(elapsed).count()));
+                }
+                if (iter < warmup) continue;
+                reps.push_back(static_cast<double>(packets) / seconds);
+                const std::string name = p.name + '/' + MODES[mode];
+                csv << run_id << ',' << name << ',' << iter - warmup << ',' << p.sf << ','
+                    << work[0]->N() << ',' << MODES[mode] << ',' << (mode == 0 ? 1 : m) << ','
+                    << working_set << ',' << sizeof(lora_phy::lora_demod_workspace) << ','
+                    << reps.back() << ',' << latency.percentile(50.0) << ','
+                    << latency.percentile(99.0) << '\n';
+            }
+            std::sort(reps.begin(), reps.end());
+            pps[mode] = reps[reps.size() / 2];
         }
-        auto colon = line.find(':');
-        if (colon == std::string::npos) continue;
-        std::string key = trim(line.substr(0, colon));
-        std::string val = trim(line.substr(colon + 1));
-        if (key == "name") current.name = val;
-        else if (key == "sf") current.sf = static_cast<unsigned>(std::stoul(val));
-        else if (key == "bw") current.bw = static_cast<unsigned>(std::stoul(val));
-        else if (key == "cr") current.cr = val;
-        else if (key == "dir") current.dir = val;
+        std::cout << '[' << run_id << "] " << p.name << " SF" << p.sf << ": warm " << pps[0]
+                  << " pps, cold " << pps[1] << " pps (" << 100.0 * pps[1] / pps[0]
+                  << "% of warm, " << m << " workspaces x " << working_set / 1024 << " KiB";
+        if (flush)
+            std::cout << "), cold_flush " << pps[2] << " pps (" << 100.0 * pps[2] / pps[0]
+                      << "% of warm";
+        std::cout << ')' << std::endl;
     }
-    if (in_profile) out.push_back(current);
-    return true;
 }
 
 int main() {
-    std::vector<Profile> profiles;
-    if (!load_profiles("tests/profiles.yaml", profiles)) {
+    std::vector<bench::Profile> profiles;
+    if (!bench::load_profiles("tests/profiles.yaml", profiles)) {
         std::cerr << "Failed to load profiles.yaml\n";
         return 1;
     }
 
-    const size_t PACKETS = 1000;
-    const size_t PAYLOAD_SIZE = 32;
+    const size_t PACKETS = env_count("PACKETS", 1000);
+    // Every repetition becomes one CSV row so compare_perf.py can judge the
+    // spread; warmup repetitions run first and are not recorded.
+    const size_t REPEATS = env_count("REPEATS", 5);
+    const size_t WARMUP = env_count("WARMUP", 1);
+    // COUNTERS=1 adds perf_event_open hardware counters; they are read
+    // around every stage when the stage timers are compiled in as well.
+    const bool COUNTERS = env_count("COUNTERS", 0) != 0;
+    std::unique_ptr<perf_counters::Group> pmu;
+    if (COUNTERS) {
+        pmu.reset(new perf_counters::Group());
+        if (!pmu->any()) {
+            std::cerr << "hardware counters unavailable; counter columns left empty\n";
+            pmu.reset();
+        }
+    }
 
-    const char* env_run = std::getenv("RUN_ID");
-    std::string run_id = env_run ? env_run : "run";
+    const std::string run_id = bench::run_id();
     std::string path = "logs/performance_" + run_id + ".csv";
 
     std::system("mkdir -p logs");
     std::ofstream csv(path);
-    csv << "run_id,profile,sf,N,pps,cycles_per_symbol\n";
+    // Stage columns stay empty unless the library was built with
+    // LORA_PHY_STAGE_TIMERS.
+    csv << "run_id,profile,rep,sf,N,pps,cycles_per_symbol";
+    for (size_t st = 0; st < STAGE_COUNT; ++st) csv << ',' << STAGE_NAMES[st] << "_cycles_per_symbol";
+    // Per-packet latency percentiles; jitter is p99 - p50.
+    csv << ",lat_p50_ns,lat_p90_ns,lat_p99_ns,lat_p999_ns,lat_max_ns,jitter_ns";
+    counter_header(csv, "");
+    for (size_t st = 0; st < STAGE_COUNT; ++st)
+        counter_header(csv, std::string(STAGE_NAMES[st]) + "_");
+    csv << '\n';
 
     for (const auto& p : profiles) {
-        // deterministic payload
-        std::vector<uint8_t> payload(PAYLOAD_SIZE);
-        for (size_t i = 0; i < PAYLOAD_SIZE; ++i) payload[i] = static_cast<uint8_t>(i & 0xFF);
-
-        // encode once to get symbol count
-        std::vector<uint16_t> symbols(PAYLOAD_SIZE * 2);
-        const size_t symbol_count = lora_phy::lora_encode(payload.data(), payload.size(), symbols.data(), p.sf);
-        const size_t samples_per_symbol = 1u << p.sf;
-        const size_t sample_count = (symbol_count + 2) * samples_per_symbol;
-
-        std::vector<std::complex<float>> samples(sample_count);
-        std::vector<std::complex<float>> dechirped(sample_count);
-        std::vector<std::complex<float>> scratch(sample_count);
-        std::vector<uint16_t> demod(symbol_count);
-
-        // precompute downchirp for dechirp
-        std::vector<std::complex<float>> down(samples_per_symbol);
-        float phase = 0.0f;
-        float scale = lora_phy::bw_scale(static_cast<lora_phy::bandwidth>(p.bw));
-        genChirp(down.data(), static_cast<int>(samples_per_symbol), 1,
-                 static_cast<int>(samples_per_symbol), 0.0f, true, 1.0f, phase,
-                 scale);
-
-        lora_phy::lora_demod_workspace ws{};
-        lora_phy::lora_demod_init(&ws, p.sf, lora_phy::window_type::window_none,
-                                   scratch.data(), scratch.size());
-
-        auto t_start = std::chrono::high_resolution_clock::now();
-        unsigned long long c_start = __rdtsc();
-
-        for (size_t pkt = 0; pkt < PACKETS; ++pkt) {
-            lora_phy::lora_modulate(symbols.data(), symbol_count, samples.data(),
-                                    p.sf, 1,
-                                    static_cast<lora_phy::bandwidth>(p.bw), 1.0f,
-                                    0x12);
-            for (size_t s = 0; s < symbol_count + 2; ++s) {
-                for (size_t i = 0; i < samples_per_symbol; ++i) {
-                    dechirped[s * samples_per_symbol + i] =
-                        samples[s * samples_per_symbol + i] * down[i];
-                }
+        bench::DemodWorkload work(p);
+        const size_t symbol_count = work.symbol_count();
+        lora_phy::lora_demod_workspace& ws = *work.workspace();
+        lora_phy::lora_stage_times stages;
+        ws.stage_times = &stages;
+        latency_histogram::Histogram latency;
+        uint64_t pmu_start[perf_counters::EVENT_COUNT] = {};
+        uint64_t pmu_delta[perf_counters::EVENT_COUNT] = {};
+
+        for (size_t iter = 0; iter < WARMUP + REPEATS; ++iter) {
+            stages = lora_phy::lora_stage_times();
+            if (pmu) {
+                stages.read_counters = &perf_counters::Group::read_into;
+                stages.counter_ctx = pmu.get();
             }
-            lora_phy::lora_demodulate(&ws, dechirped.data(), sample_count,
-                                      demod.data(), 1, nullptr);
-        }
+            latency.reset();
+            auto t_start = std::chrono::high_resolution_clock::now();
+            if (pmu) pmu->read(pmu_start);
+            unsigned long long c_start = __rdtsc();
 
-        unsigned long long c_end = __rdtsc();
-        auto t_end = std::chrono::high_resolution_clock::now();
+            for (size_t pkt = 0; pkt < PACKETS; ++pkt) {
+                auto p_start = std::chrono::steady_clock::now();
+                work.run();
+                latency.record(static_cast<uint64_t>(
+                    std::chrono::duration_cast<std::chrono::nanoseconds>(
+                        std::chrono::steady_clock::now() - p_start).count()));
+            }
 
-        lora_phy::lora_demod_free(&ws);
+            unsigned long long c_end = __rdtsc();
+            auto t_end = std::chrono::high_resolution_clock::now();
+            if (pmu) {
+                pmu->read(pmu_delta);
+                for (int e = 0; e < perf_counters::EVENT_COUNT; ++e)
+                    pmu_delta[e] -= pmu_start[e];
+            }
 
-        double seconds = std::chrono::duration<double>(t_end - t_start).count();
-        double pps = static_cast<double>(PACKETS) / seconds;
-        double cycles = static_cast<double>(c_end - c_start);
-        double cycles_per_symbol = cycles / (static_cast<double>(symbol_count) * PACKETS);
-        unsigned N = 1u << p.sf;
+            if (iter < WARMUP) continue;
+            const size_t rep = iter - WARMUP;
 
-        csv << run_id << ',' << p.name << ',' << p.sf << ',' << N << ','
-            << pps << ',' << cycles_per_symbol << '\n';
-        std::cout << '[' << run_id << "] " << p.name << ": " << pps
-                  << " pps, " << cycles_per_symbol << " cycles/symbol"
-                  << std::endl;
+            double seconds = std::chrono::duration<double>(t_end - t_start).count();
+            double pps = static_cast<double>(PACKETS) / seconds;
+            double cycles = static_cast<double>(c_end - c_start);
+            double cycles_per_symbol = cycles / (static_cast<double>(symbol_count) * PACKETS);
+            unsigned N = 1u << p.sf;
+
+            csv << run_id << ',' << p.name << ',' << rep << ',' << p.sf << ',' << N << ','
+                << pps << ',' << cycles_per_symbol;
+            for (size_t st = 0; st < STAGE_COUNT; ++st) {
+                csv << ',';
+                if (lora_phy::LORA_STAGE_TIMERS)
+                    csv << static_cast<double>(stages.cycles[st]) /
+                               (static_cast<double>(symbol_count) * PACKETS);
+            }
+            const uint64_t p50 = latency.percentile(50.0);
+            const uint64_t p99 = latency.percentile(99.0);
+            csv << ',' << p50 << ',' << latency.percentile(90.0) << ',' << p99 << ','
+                << latency.percentile(99.9) << ',' << latency.max() << ',' << (p99 - p50);
+            const double total_symbols = static_cast<double>(symbol_count) * PACKETS;
+            counter_values(csv, pmu.get(), pmu_delta, total_symbols);
+            for (size_t st = 0; st < STAGE_COUNT; ++st)
+                counter_values(csv, lora_phy::LORA_STAGE_TIMERS ? pmu.get() : nullptr,
+                               stages.counters[st], total_symbols);
+            csv << '\n';
+            std::cout << '[' << run_id << "] " << p.name << " #" << rep << ": " << pps
+                      << " pps, " << cycles_per_symbol << " cycles/symbol, latency p50 "
+                      << p50 / 1000.0 << " us, p99 " << p99 / 1000.0 << " us, max "
+                      << latency.max() / 1000.0 << " us" << std::endl;
+            if (lora_phy::LORA_STAGE_TIMERS) {
+                std::cout << "    ";
+                for (size_t st = 0; st < STAGE_COUNT; ++st)
+                    std::cout << STAGE_NAMES[st] << ' '
+                              << static_cast<double>(stages.cycles[st]) /
+                                     (static_cast<double>(symbol_count) * PACKETS)
+                              << (st + 1 < STAGE_COUNT ? ", " : " cycles/symbol\n");
+            }
+        }
     }
 
-    return 0;
-}
+    // COLD=1 adds the cold-cache comparison: COLD_WORKSPACES workloads
+    // (default: enough to cover twice the LLC) in rotation, and with FLUSH=1
+    // an explicit flush of each before it runs.
+    if (env_count("COLD", 0) != 0)
+        run_cold(profiles, run_id, PACKETS, REPEATS, WARMUP, env_count("COLD_WORKSPACES", 0),
+                 env_count("FLUSH", 0) != 0);
 
+    // MATRIX=0 skips the per-op matrix over the osr/window/payload axes of
+    // profiles.yaml; MATRIX_PACKETS sets its packets per repetition.
+    const char* matrix = std::getenv("MATRIX");
+    if (matrix && std::string(matrix) == "0") return 0;
+    return run_matrix(profiles, run_id, env_count("MATRIX_PACKETS", 50), REPEATS, WARMUP);
+}
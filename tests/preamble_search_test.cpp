@@ -0,0 +1,76 @@
+#include <lora_phy/phy.hpp>
+#include <cmath>
+#include <complex>
+#include <cstdint>
+#include <iostream>
+#include <random>
+#include <vector>
+
+// Build a dechirped stream of noise followed by a preamble (a steady tone on
+// one bin, as the upchirps look after dechirping) and check that the
+// hierarchical search lands on the first preamble symbol.  The search runs in
+// audit mode so the coarse pass's misses are counted as well.
+static bool check_search(unsigned sf, unsigned decim, float snr_db) {
+    const size_t N = size_t(1) << sf;
+    const size_t lead = 5, preamble = 4, tail = 3;
+    const size_t bin = N / 3;
+    std::vector<std::complex<float>> iq((lead + preamble + tail) * N);
+
+    std::mt19937 rng(sf);
+    float sigma = std::pow(10.0f, -snr_db / 20.0f) / std::sqrt(2.0f);
+    std::normal_distribution<float> noise(0.0f, sigma);
+    const float two_pi = 6.283185307179586f;
+    for (size_t i = 0; i < iq.size(); ++i) {
+        iq[i] = std::complex<float>(noise(rng), noise(rng));
+        size_t sym = i / N;
+        if (sym >= lead && sym < lead + preamble) {
+            float ph = two_pi * static_cast<float>(bin * (i % N)) /
+                       static_cast<float>(N);
+            iq[i] += std::polar(1.0f, ph);
+        }
+    }
+
+    std::vector<std::complex<float>> fft_in(N), fft_out(N);
+    lora_phy::lora_workspace ws{};
+    ws.fft_in = fft_in.data();
+    ws.fft_out = fft_out.data();
+    lora_phy::lora_params params{};
+    params.sf = sf;
+    if (lora_phy::init(&ws, &params) != 0) return false;
+
+    static lora_phy::lora_preamble_search search;
+    search.decim = decim;
+    search.audit = true;
+    if (lora_phy::preamble_search_init(&search, &ws) != 0) return false;
+
+    ssize_t found = lora_phy::preamble_search(&search, &ws, iq.data(), iq.size());
+    bool ok = found == static_cast<ssize_t>(lead * N);
+    ok = ok && search.windows == lead + 2;
+    ok = ok && search.detections == 2 && search.false_alarms == 0;
+    ok = ok && lora_phy::preamble_detection_probability(&search) == 1.0f;
+    if (!ok)
+        std::cerr << "sf" << sf << " decim " << search.decim << ": found "
+                  << found << " windows " << search.windows << " promoted "
+                  << search.promoted << " detections " << search.detections
+                  << " false alarms " << search.false_alarms << " missed "
+                  << search.missed << "\n";
+
+    // Pure noise never confirms a preamble.
+    std::vector<std::complex<float>> quiet(8 * N);
+    for (auto& v : quiet) v = std::complex<float>(noise(rng), noise(rng));
+    lora_phy::preamble_search_init(&search, &ws);
+    ok = ok && lora_phy::preamble_search(&search, &ws, quiet.data(),
+                                         quiet.size()) == -1;
+    ok = ok && search.detections == 0;
+    return ok;
+}
+
+int preamble_search_test_main() {
+    bool ok = true;
+    ok = check_search(7, 8, 10.0f) && ok;
+    ok = check_search(9, 4, -5.0f) && ok;
+    ok = check_search(12, 8, -10.0f) && ok;
+    // Decimation is reduced so the coarse FFT keeps at least 16 bins.
+    ok = check_search(7, 64, 10.0f) && ok;
+    return ok ? 0 : 1;
+}
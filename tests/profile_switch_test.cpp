@@ -0,0 +1,153 @@
+#include <lora_phy/phy.hpp>
+#include <cstdint>
+#include <complex>
+#include <algorithm>
+#include <fstream>
+#include <iostream>
+#include <string>
+#include <vector>
+
+struct Profile {
+    std::string name;
+    unsigned sf{};
+    unsigned bw{};
+    std::string cr;
+    std::string dir; // optional
+};
+
+static std::string trim(const std::string& s) {
+    const auto start = s.find_first_not_of(" \t\r\n");
+    if (start == std::string::npos) return "";
+    const auto end = s.find_last_not_of(" \t\r\n");
+    return s.substr(start, end - start + 1);
+}
+
+static bool load_profiles(const std::string& path, std::vector<Profile>& out) {
+    std::ifstream f(path);
+    if (!f) return false;
+    std::string line;
+    Profile current;
+    bool in_profile = false;
+    while (std::getline(f, line)) {
+        line = trim(line);
+        if (line.empty() || line[0] == '#') continue;
+        if (line[0] == '-') {
+            if (in_profile) out.push_back(current);
+            current = Profile();
+            in_profile = true;
+            continue;
+        }
+        auto colon = line.find(':');
+        if (colon == std::string::npos) continue;
+        std::string key = trim(line.substr(0, colon));
+        std::string val = trim(line.substr(colon + 1));
+        if (key == "name") current.name = val;
+        else if (key == "sf") current.sf = static_cast<unsigned>(std::stoul(val));
+        else if (key == "bw") current.bw = static_cast<unsigned>(std::stoul(val));
+        else if (key == "cr") current.cr = val;
+        else if (key == "dir") current.dir = val;
+    }
+    if (in_profile) out.push_back(current);
+    return true;
+}
+
+struct Reference {
+    std::vector<std::complex<float>> iq;
+    std::vector<uint16_t> symbols;
+    lora_phy::lora_metrics metrics;
+};
+
+// Demodulate with a workspace initialised from scratch by init().
+static bool make_reference(const lora_phy::lora_params& p, Reference& ref) {
+    const size_t N = size_t(1) << p.sf;
+    const std::vector<uint16_t> tx = {1, 17, 42, static_cast<uint16_t>(N - 3)};
+    std::vector<uint16_t> symbuf(N);
+    std::vector<std::complex<float>> fft_in(N), fft_out(N * p.osr);
+    std::vector<float> window(N);
+    lora_phy::lora_workspace ws{};
+    ws.symbol_buf = symbuf.data();
+    ws.fft_in = fft_in.data();
+    ws.fft_out = fft_out.data();
+    ws.window = window.data();
+    if (lora_phy::init(&ws, &p) != 0) return false;
+
+    ref.iq.assign((tx.size() + 2) * N * p.osr, {});
+    ssize_t n = lora_phy::modulate(&ws, tx.data(), tx.size(), ref.iq.data(),
+                                   ref.iq.size());
+    if (n <= 0) return false;
+    ref.symbols.assign(tx.size(), 0);
+    if (lora_phy::demodulate(&ws, ref.iq.data(), ref.iq.size(),
+                             ref.symbols.data(), ref.symbols.size()) < 0)
+        return false;
+    ref.metrics = ws.metrics;
+    return true;
+}
+
+int profile_switch_test_main() {
+    std::vector<Profile> profiles;
+    if (!load_profiles("tests/profiles.yaml", profiles)) {
+        std::cerr << "Failed to load profiles.yaml\n";
+        return 1;
+    }
+
+    std::vector<lora_phy::lora_params> params;
+    for (const auto& prof : profiles) {
+        lora_phy::lora_params p{};
+        p.sf = prof.sf;
+        p.bw = static_cast<lora_phy::bandwidth>(prof.bw);
+        params.push_back(p);
+    }
+    // Exercise the window and a non-default bandwidth as well.
+    lora_phy::lora_params extra{};
+    extra.sf = 9;
+    extra.bw = lora_phy::bandwidth::bw_250;
+    extra.window = lora_phy::window_type::window_hann;
+    params.push_back(extra);
+
+    std::vector<lora_phy::lora_profile_tables> tables(params.size());
+    std::vector<Reference> refs(params.size());
+    size_t max_n = 0;
+    for (size_t i = 0; i < params.size(); ++i) {
+        if (lora_phy::init_profile(&tables[i], &params[i]) != 0 ||
+            !make_reference(params[i], refs[i])) {
+            std::cerr << "Failed to prepare profile " << i << "\n";
+            return 1;
+        }
+        max_n = std::max(max_n, size_t(1) << params[i].sf);
+    }
+
+    // One workspace sized for the largest profile serves all of them.
+    std::vector<uint16_t> symbuf(max_n);
+    std::vector<std::complex<float>> fft_in(max_n), fft_out(max_n);
+    lora_phy::lora_workspace ws{};
+    ws.symbol_buf = symbuf.data();
+    ws.fft_in = fft_in.data();
+    ws.fft_out = fft_out.data();
+
+    bool ok = true;
+    std::vector<size_t> order;
+    for (size_t i = 0; i < params.size(); ++i) order.push_back(i);
+    for (size_t i = params.size(); i-- > 0;) order.push_back(i);
+    for (size_t i : order) {
+        if (lora_phy::select_profile(&ws, &tables[i]) != 0) return 1;
+        std::vector<uint16_t> out(refs[i].symbols.size());
+        lora_phy::demodulate(&ws, refs[i].iq.data(), refs[i].iq.size(),
+                             out.data(), out.size());
+        if (out != refs[i].symbols || ws.metrics.cfo != refs[i].metrics.cfo ||
+            ws.metrics.time_offset != refs[i].metrics.time_offset) {
+            std::cerr << "Profile " << i << " differs after switching\n";
+            ok = false;
+        }
+    }
+
+    // init() detaches the workspace from the prebuilt tables again.
+    std::vector<float> window(max_n);
+    ws.window = window.data();
+    lora_phy::init(&ws, &params[0]);
+    ok = ok && ws.profile == nullptr;
+    ok = ok && lora_phy::select_profile(&ws, nullptr) == -1;
+    lora_phy::lora_params bad{};
+    bad.sf = 13;
+    ok = ok && lora_phy::init_profile(&tables[0], &bad) == -1;
+    return ok ? 0 : 1;
+}
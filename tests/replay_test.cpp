@@ -0,0 +1,241 @@
+#include <lora_phy/phy.hpp>
+#include "bench_common.h"
+#include "latency_histogram.h"
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <complex>
+#include <cstdint>
+#include <cstdlib>
+#include <fstream>
+#include <iostream>
+#include <string>
+#include <thread>
+#include <vector>
+
+// Real-time replay: a producer thread releases a looped packet stream in
+// CHUNK-sample chunks at the configured sample rate into a fixed ring, and
+// the receiver thread reassembles packet frames from it and runs
+// demodulate() + decode() on each.  Reports whether the host keeps up: the
+// real-time factor, ring high-water mark, dropped and late chunks and the
+// packet latency from the arrival of a frame's last sample to its decode.
+
+using bench::env_count;
+using clock_type = std::chrono::steady_clock;
+
+struct Slot {
+    size_t offset{};            // stream index of the chunk's first sample
+    clock_type::time_point arrival{};
+};
+
+struct ReplayResult {
+    double stream_seconds{};
+    double busy_seconds{};
+    size_t frames{};
+    size_t chunks{};
+    size_t dropped{};
+    size_t late{};
+    size_t high_water{};        // most chunks queued at once
+    latency_histogram::Histogram latency;
+};
+
+// Float32 IQ pairs, as written by tx_runner and lora_phy_vector_dump.
+static bool read_iq(const std::string& path, std::vector<std::complex<float>>& out) {
+    std::ifstream f(path, std::ios::binary);
+    if (!f) return false;
+    float iq[2];
+    while (f.read(reinterpret_cast<char*>(iq), sizeof(iq))) out.emplace_back(iq[0], iq[1]);
+    return true;
+}
+
+// Stream @p frame (a whole number of @p N sample symbols) in a loop for
+// @p chunk_count chunks at @p rate samples/s.
+static void replay(lora_phy::lora_workspace& ws, const std::vector<std::complex<float>>& frame,
+                   size_t N, size_t chunk, size_t slots, size_t chunk_count, double rate,
+                   ReplayResult& r) {
+    const size_t frame_len = frame.size();
+    std::vector<Slot> ring(slots);
+    std::vector<std::complex<float>> ring_samples(slots * chunk);
+    std::atomic<size_t> head{0}, tail{0};
+    std::atomic<bool> done{false};
+    const auto period = std::chrono::duration_cast<clock_type::duration>(
+        std::chrono::duration<double>(static_cast<double>(chunk) / rate));
+
+    std::thread producer([&] {
+        const auto start = clock_type::now();
+        size_t offset = 0;
+        for (size_t k = 0; k < chunk_count; ++k, offset += chunk) {
+            // A chunk exists once its last sample would have been received.
+            const auto deadline = start + period * static_cast<long>(k + 1);
+            std::this_thread::sleep_until(deadline);
+            const auto now = clock_type::now();
+            if (now - deadline > period) ++r.late;
+            const size_t h = head.load(std::memory_order_relaxed);
+            const size_t queued = h - tail.load(std::memory_order_acquire);
+            if (queued == slots) {
+                ++r.dropped;
+                continue;
+            }
+            Slot& s = ring[h % slots];
+            std::complex<float>* dst = &ring_samples[(h % slots) * chunk];
+            for (size_t i = 0; i < chunk; ++i) dst[i] = frame[(offset + i) % frame_len];
+            s.offset = offset;
+            s.arrival = now;
+            head.store(h + 1, std::memory_order_release);
+            r.high_water = std::max(r.high_water, queued + 1);
+        }
+        done.store(true, std::memory_order_release);
+    });
+
+    std::vector<std::complex<float>> rx(frame_len);
+    std::vector<uint16_t> symbols(frame_len / N);
+    std::vector<uint8_t> payload(symbols.size() * 2);
+    size_t fill = 0;
+    size_t expected = 0;
+    for (;;) {
+        const size_t t = tail.load(std::memory_order_relaxed);
+        if (t == head.load(std::memory_order_acquire)) {
+            if (done.load(std::memory_order_acquire) && t == head.load(std::memory_order_acquire))
+                break;
+            std::this_thread::yield();
+            continue;
+        }
+        const Slot& s = ring[t % slots];
+        const std::complex<float>* src = &ring_samples[(t % slots) * chunk];
+        // A dropped chunk breaks the frame in progress; wait for the next
+        // frame boundary.
+        if (s.offset != expected) fill = 0;
+        expected = s.offset + chunk;
+        for (size_t i = 0; i < chunk;) {
+            const size_t pos = (s.offset + i) % frame_len;
+            if (pos != fill) {
+                fill = 0;
+                i += frame_len - pos;
+                continue;
+            }
+            const size_t n = std::min(chunk - i, frame_len - pos);
+            std::copy(src + i, src + i + n, rx.begin() + static_cast<long>(fill));
+            fill += n;
+            i += n;
+            if (fill < frame_len) continue;
+            fill = 0;
+            const auto busy_start = clock_type::now();
+            ssize_t count = lora_phy::demodulate(&ws, rx.data(), rx.size(), symbols.data(),
+                                                 symbols.size());
+            if (count > 0)
+                lora_phy::decode(&ws, symbols.data(), static_cast<size_t>(count),
+                                 payload.data(), payload.size());
+            const auto busy_end = clock_type::now();
+            r.busy_seconds += std::chrono::duration<double>(busy_end - busy_start).count();
+            r.latency.record(static_cast<uint64_t>(
+                std::chrono::duration_cast<std::chrono::nanoseconds>(busy_end - s.arrival)
+                    .count()));
+            ++r.frames;
+        }
+        tail.store(t + 1, std::memory_order_release);
+    }
+    producer.join();
+    r.chunks = chunk_count;
+    r.stream_seconds = static_cast<double>(chunk_count * chunk) / rate;
+}
+
+int main() {
+    std::vector<bench::Profile> profiles;
+    if (!bench::load_profiles("tests/profiles.yaml", profiles)) {
+        std::cerr << "Failed to load profiles.yaml\n";
+        return 1;
+    }
+
+    // IQ_FILE replays a float32 IQ capture (e.g. test_output.iq) instead of
+    // a synthesized packet; PROFILE restricts the run to one profile, which
+    // is what a capture recorded at one SF/BW usually wants.
+    const char* iq_file = std::getenv("IQ_FILE");
+    const char* only = std::getenv("PROFILE");
+    const size_t CHUNK = env_count("CHUNK", 1024);
+    const size_t RING = env_count("RING", 64);
+    const size_t DURATION_MS = env_count("DURATION_MS", 2000);
+    const size_t PAYLOAD = env_count("PAYLOAD", 32);
+    // RATE overrides the sample rate (default: the profile bandwidth) to
+    // replay faster than the air interface.
+    const size_t RATE = env_count("RATE", 0);
+    // Headroom kept free when converting the real-time factor into channels
+    // per core.
+    const double MARGIN = static_cast<double>(env_count("MARGIN_PERCENT", 25)) / 100.0;
+
+    std::vector<std::complex<float>> capture;
+    if (iq_file && (!read_iq(iq_file, capture) || capture.empty())) {
+        std::cerr << "Unable to read " << iq_file << "\n";
+        return 1;
+    }
+
+    const std::string run_id = bench::run_id();
+    std::system("mkdir -p logs");
+    std::ofstream csv("logs/replay_" + run_id + ".csv");
+    csv << "run_id,profile,sf,bw,sample_rate,chunk,ring,frames,chunks,dropped_chunks,"
+           "late_chunks,ring_high_water,rtf,lat_p50_ns,lat_p99_ns,lat_max_ns,"
+           "channels_per_core\n";
+
+    int failed = 0;
+    for (const auto& p : profiles) {
+        if (only && p.name != only) continue;
+        const size_t N = size_t(1) << p.sf;
+        std::vector<std::complex<float>> fft_in(N), fft_out(N);
+        lora_phy::lora_workspace ws{};
+        ws.fft_in = fft_in.data();
+        ws.fft_out = fft_out.data();
+        lora_phy::lora_params cfg;
+        cfg.sf = p.sf;
+        cfg.bw = static_cast<lora_phy::bandwidth>(p.bw);
+        cfg.cr = bench::cr_index(p.cr);
+        cfg.explicit_header = true;
+        cfg.crc = true;
+        if (lora_phy::init(&ws, &cfg) != 0) {
+            std::cerr << p.name << ": init failed\n";
+            failed = 1;
+            continue;
+        }
+
+        std::vector<std::complex<float>> frame;
+        if (iq_file) {
+            frame.assign(capture.begin(), capture.begin() + static_cast<long>(
+                                                             capture.size() / N * N));
+        } else {
+            std::vector<uint8_t> payload(PAYLOAD);
+            for (size_t i = 0; i < PAYLOAD; ++i) payload[i] = static_cast<uint8_t>(i * 7 + 1);
+            std::vector<uint16_t> symbols(lora_phy::encoded_symbol_count(&ws, PAYLOAD));
+            frame.resize((symbols.size() + 2) * N);
+            if (lora_phy::encode(&ws, payload.data(), PAYLOAD, symbols.data(), symbols.size()) < 0 ||
+                lora_phy::modulate(&ws, symbols.data(), symbols.size(), frame.data(),
+                                   frame.size()) < 0)
+                frame.clear();
+        }
+        if (frame.size() < 2 * N) {
+            std::cerr << p.name << ": stream shorter than two symbols\n";
+            failed = 1;
+            continue;
+        }
+
+        const double rate = RATE ? static_cast<double>(RATE) : static_cast<double>(p.bw);
+        const size_t chunks =
+            std::max<size_t>(1, static_cast<size_t>(rate * DURATION_MS / 1000.0) / CHUNK);
+        ReplayResult r;
+        replay(ws, frame, N, CHUNK, RING, chunks, rate, r);
+
+        if (r.frames == 0)
+            std::cerr << p.name << ": no complete frame in " << DURATION_MS
+                      << " ms; raise DURATION_MS\n";
+        const double rtf = r.busy_seconds / r.stream_seconds;
+        const size_t channels = rtf > 0.0 ? static_cast<size_t>((1.0 - MARGIN) / rtf) : 0;
+        csv << run_id << ',' << p.name << ',' << p.sf << ',' << p.bw << ',' << rate << ','
+            << CHUNK << ',' << RING << ',' << r.frames << ',' << r.chunks << ',' << r.dropped
+            << ',' << r.late << ',' << r.high_water << ',' << rtf << ','
+            << r.latency.percentile(50.0) << ',' << r.latency.percentile(99.0) << ','
+            << r.latency.max() << ',' << channels << '\n';
+        std::cout << '[' << run_id << "] " << p.name << ": real-time factor " << rtf << ", "
+                  << r.frames << " frames, ring high water " << r.high_water << '/' << RING
+                  << ", dropped " << r.dropped << ", late " << r.late << ", latency p99 "
+                  << r.latency.percentile(99.0) / 1000.0 << " us, " << channels
+                  << " channels/core at " << MARGIN * 100.0 << "% margin" << std::endl;
+    }
+    return failed;
+}
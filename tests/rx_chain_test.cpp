@@ -0,0 +1,94 @@
+#include <lora_phy/phy.hpp>
+#include <complex>
+#include <cstdint>
+#include <iostream>
+#include <random>
+#include <vector>
+
+int rx_chain_test_main() {
+    std::mt19937 rng(123);
+    bool ok = true;
+    for (unsigned sf = 7; sf <= 12; ++sf) {
+        const size_t N = size_t(1) << sf;
+        std::vector<std::complex<float>> fft_in(N), fft_out(N);
+        lora_phy::lora_workspace ws{};
+        ws.fft_in = fft_in.data();
+        ws.fft_out = fft_out.data();
+        for (unsigned cr = 1; cr <= 4; ++cr) {
+            for (int framing = 0; framing < 4; ++framing) {
+                lora_phy::lora_params p{};
+                p.sf = sf;
+                p.cr = cr;
+                p.explicit_header = (framing & 1) != 0;
+                p.crc = (framing & 2) != 0;
+                for (size_t len : {size_t(1), size_t(11), size_t(64), size_t(255)}) {
+                    // Implicit framing needs the length up front.
+                    p.payload_len = p.explicit_header ? 0 : len;
+                    lora_phy::init(&ws, &p);
+                    std::vector<uint8_t> payload(len);
+                    for (auto& b : payload) b = static_cast<uint8_t>(rng());
+                    std::vector<uint16_t> syms(lora_phy::encoded_symbol_count(&ws, len));
+                    ssize_t n = lora_phy::encode(&ws, payload.data(), len,
+                                                 syms.data(), syms.size());
+                    std::vector<uint8_t> out(len);
+                    ssize_t m = lora_phy::decode(&ws, syms.data(), syms.size(),
+                                                 out.data(), out.size());
+                    if (n < 0 || m != static_cast<ssize_t>(len) || out != payload ||
+                        ws.metrics.crc_ok != p.crc || ws.metrics.fec_corrected ||
+                        ws.metrics.fec_uncorrectable) {
+                        std::cerr << "sf" << sf << " cr" << cr << " framing "
+                                  << framing << " len " << len << " round trip failed\n";
+                        ok = false;
+                        continue;
+                    }
+
+                    // An off-by-one bin flips a single Gray bit, i.e. one bit
+                    // of one codeword in the block.
+                    if (syms.size() > 8) {
+                        std::vector<uint16_t> bad = syms;
+                        bad[8] = static_cast<uint16_t>((bad[8] + 1) & (N - 1));
+                        m = lora_phy::decode(&ws, bad.data(), bad.size(), out.data(),
+                                             out.size());
+                        if (cr >= 3) {
+                            if (m != static_cast<ssize_t>(len) || out != payload ||
+                                ws.metrics.crc_ok != p.crc ||
+                                ws.metrics.fec_corrected != 1 ||
+                                ws.metrics.fec_uncorrectable != 0)
+                                ok = false;
+                        } else if (ws.metrics.fec_uncorrectable != 1) {
+                            ok = false;
+                        }
+                    }
+
+                    // Too small an output buffer or too few symbols is rejected.
+                    if (lora_phy::decode(&ws, syms.data(), syms.size(), out.data(),
+                                         len - 1) != -1)
+                        ok = false;
+                    if (syms.size() > 8 &&
+                        lora_phy::decode(&ws, syms.data(), syms.size() - 1,
+                                         out.data(), out.size()) != -1)
+                        ok = false;
+                }
+            }
+        }
+    }
+
+    // A corrupted explicit header is refused.
+    {
+        std::vector<std::complex<float>> fft_in(128), fft_out(128);
+        lora_phy::lora_workspace ws{};
+        ws.fft_in = fft_in.data();
+        ws.fft_out = fft_out.data();
+        lora_phy::lora_params p{};
+        p.sf = 7;
+        p.cr = 1;
+        p.explicit_header = true;
+        lora_phy::init(&ws, &p);
+        uint8_t payload[4] = {1, 2, 3, 4}, out[4];
+        std::vector<uint16_t> syms(lora_phy::encoded_symbol_count(&ws, 4));
+        lora_phy::encode(&ws, payload, 4, syms.data(), syms.size());
+        for (size_t i = 0; i < 8; ++i) syms[i] = static_cast<uint16_t>(syms[i] ^ 0x55);
+        if (lora_phy::decode(&ws, syms.data(), syms.size(), out, 4) != -1) ok = false;
+    }
+    return ok ? 0 : 1;
+}
@@ -0,0 +1,130 @@
+#include <lora_phy/phy.hpp>
+#include "bench_common.h"
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <cstdlib>
+#include <fstream>
+#include <iostream>
+#include <memory>
+#include <string>
+#include <thread>
+#include <vector>
+
+#ifdef __linux__
+#include <pthread.h>
+#include <sched.h>
+#endif
+
+// Multi-core throughput scaling: for every profile run 1..THREADS threads,
+// each demodulating its own channel with its own workspace, and report the
+// aggregate packet rate and the efficiency relative to one thread.
+
+using bench::env_count;
+
+static bool pin_to_cpu(std::thread& t, size_t cpu) {
+#ifdef __linux__
+    cpu_set_t set;
+    CPU_ZERO(&set);
+    CPU_SET(static_cast<int>(cpu % CPU_SETSIZE), &set);
+    return pthread_setaffinity_np(t.native_handle(), sizeof(set), &set) == 0;
+#else
+    (void)t;
+    (void)cpu;
+    return false;
+#endif
+}
+
+// Run @p threads workers of PACKETS packets each; returns the aggregate
+// packet rate over the slowest worker's wall time.
+static double run_threads(const bench::Profile& p, size_t threads, size_t packets,
+                          bool pin) {
+    const size_t cpus = std::max(1u, std::thread::hardware_concurrency());
+    std::vector<std::unique_ptr<bench::DemodWorkload>> work;
+    for (size_t t = 0; t < threads; ++t) work.emplace_back(new bench::DemodWorkload(p));
+    // Each worker warms up on its own data, then waits until all are ready so
+    // the timed regions overlap.
+    std::atomic<size_t> ready{0};
+    std::atomic<bool> go{false};
+    std::vector<double> seconds(threads, 0.0);
+    std::vector<std::thread> pool;
+    for (size_t t = 0; t < threads; ++t) {
+        pool.emplace_back([&, t] {
+            work[t]->run();
+            ready.fetch_add(1);
+            while (!go.load(std::memory_order_acquire)) std::this_thread::yield();
+            auto start = std::chrono::steady_clock::now();
+            for (size_t pkt = 0; pkt < packets; ++pkt) work[t]->run();
+            seconds[t] = std::chrono::duration<double>(std::chrono::steady_clock::now() -
+                                                       start).count();
+        });
+        if (pin && !pin_to_cpu(pool.back(), t % cpus) && t == 0)
+            std::cerr << "CPU pinning unavailable; threads float\n";
+    }
+    while (ready.load() < threads) std::this_thread::yield();
+    go.store(true, std::memory_order_release);
+    for (auto& th : pool) th.join();
+    const double wall = *std::max_element(seconds.begin(), seconds.end());
+    return static_cast<double>(threads * packets) / wall;
+}
+
+int main() {
+    std::vector<bench::Profile> profiles;
+    if (!bench::load_profiles("tests/profiles.yaml", profiles)) {
+        std::cerr << "Failed to load profiles.yaml\n";
+        return 1;
+    }
+
+    const size_t hw = std::max(1u, std::thread::hardware_concurrency());
+    const size_t THREADS = env_count("THREADS", hw);
+    const size_t PACKETS = env_count("PACKETS", 200);
+    // PIN=1 pins worker t to CPU t (modulo the CPU count) for reproducible
+    // placement.
+    const bool PIN = env_count("PIN", 0) != 0;
+    // Scaling counts as flat once a thread count drops below this efficiency.
+    const double KNEE = static_cast<double>(env_count("KNEE_PERCENT", 80)) / 100.0;
+    const size_t llc = bench::llc_bytes();
+
+    const std::string run_id = bench::run_id();
+    std::system("mkdir -p logs");
+    std::ofstream csv("logs/scaling_" + run_id + ".csv");
+    csv << "run_id,profile,sf,threads,pps,pps_per_thread,efficiency,working_set_bytes,"
+           "exceeds_llc\n";
+
+    for (const auto& p : profiles) {
+        size_t working_set;
+        {
+            bench::DemodWorkload probe(p);
+            working_set = probe.working_set();
+        }
+        double single = 0.0;
+        size_t knee = 0;
+        for (size_t t = 1; t <= THREADS; ++t) {
+            const double pps = run_threads(p, t, PACKETS, PIN);
+            if (t == 1) single = pps;
+            const double efficiency = pps / (static_cast<double>(t) * single);
+            const bool exceeds = llc && t * working_set > llc;
+            if (!knee && efficiency < KNEE) knee = t;
+            csv << run_id << ',' << p.name << ',' << p.sf << ',' << t << ',' << pps << ','
+                << pps / static_cast<double>(t) << ',' << efficiency << ',' << working_set
+                << ',' << (llc ? (exceeds ? "1" : "0") : "") << '\n';
+            std::cout << '[' << run_id << "] " << p.name << " x" << t << ": " << pps
+                      << " pps, efficiency " << efficiency * 100.0 << "%" << std::endl;
+        }
+        if (knee) {
+            // Past the shared cache the workers compete for memory bandwidth;
+            // below it they compete for cache capacity and shared core
+            // resources (SMT siblings, frequency).
+            std::cout << "    " << p.name << ": scaling flattens at " << knee
+                      << " threads ("
+                      << (llc == 0 ? "cache size unknown"
+                          : knee * working_set > llc ? "working sets exceed the LLC, likely memory bandwidth"
+                                                     : "working sets fit the LLC, likely shared-cache or core contention")
+                      << ")\n";
+        } else {
+            std::cout << "    " << p.name << ": near-linear up to " << THREADS << " threads\n";
+        }
+    }
+    return 0;
+}
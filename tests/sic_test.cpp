@@ -0,0 +1,145 @@
+#include <lora_phy/phy.hpp>
+#include <lora_phy/ChirpGenerator.hpp>
+#include <algorithm>
+#include <complex>
+#include <cstdint>
+#include <iostream>
+#include <random>
+#include <vector>
+
+// Add one dechirped packet carrying @p payload to @p buf, starting at sample
+// @p offset, with complex gain @p gain and a carrier offset of @p cfo_bins
+// FFT bins.
+static void add_packet(lora_phy::lora_workspace* ws, unsigned sf,
+                       const std::vector<uint8_t>& payload, std::complex<float> gain,
+                       float cfo_bins, size_t offset,
+                       std::vector<std::complex<float>>& buf) {
+    const size_t N = size_t(1) << sf;
+    std::vector<uint16_t> syms(lora_phy::encoded_symbol_count(ws, payload.size()));
+    lora_phy::encode(ws, payload.data(), payload.size(), syms.data(), syms.size());
+    std::vector<std::complex<float>> iq((syms.size() + 2) * N);
+    lora_phy::lora_modulate(syms.data(), syms.size(), iq.data(), sf, 1,
+                            lora_phy::bandwidth::bw_125, 1.0f, 0x12);
+    std::vector<std::complex<float>> down(N);
+    float phase = 0.0f;
+    genChirp(down.data(), static_cast<int>(N), 1, static_cast<int>(N), 0.0f, true,
+             1.0f, phase, lora_phy::bw_scale(lora_phy::bandwidth::bw_125));
+    const float w = 2.0f * float(M_PI) * cfo_bins / static_cast<float>(N);
+    for (size_t i = 0; i < iq.size() && offset + i < buf.size(); ++i)
+        buf[offset + i] += gain * iq[i] * down[i % N] *
+                           std::polar(1.0f, w * static_cast<float>(i));
+}
+
+int sic_test_main() {
+    const unsigned sf = 8;
+    const size_t N = size_t(1) << sf;
+    std::vector<std::complex<float>> fft_in(N), fft_out(N);
+    lora_phy::lora_workspace ws{};
+    ws.fft_in = fft_in.data();
+    ws.fft_out = fft_out.data();
+    lora_phy::lora_params p{};
+    p.sf = sf;
+    p.cr = 4;
+    p.explicit_header = true;
+    p.crc = true;
+    lora_phy::init(&ws, &p);
+    // Transmitter using a different coding rate than the receiver's
+    // configuration; decode() follows the header, the replica must too.
+    std::vector<std::complex<float>> tx_fft_in(N), tx_fft_out(N);
+    lora_phy::lora_workspace tx_ws{};
+    tx_ws.fft_in = tx_fft_in.data();
+    tx_ws.fft_out = tx_fft_out.data();
+    lora_phy::lora_params tx_p = p;
+    tx_p.cr = 1;
+    lora_phy::init(&tx_ws, &tx_p);
+
+    std::mt19937 rng(21);
+    std::vector<uint8_t> strong(24), weak(16);
+    for (auto& b : strong) b = static_cast<uint8_t>(rng());
+    for (auto& b : weak) b = static_cast<uint8_t>(rng());
+
+    const size_t symbol_count =
+        lora_phy::encoded_symbol_count(&ws, strong.size()) + 2;
+    const size_t sample_count = symbol_count * N;
+    std::vector<std::complex<float>> scratch(sample_count + N);
+    lora_phy::lora_demod_workspace dws{};
+    lora_phy::lora_demod_init(&dws, sf, lora_phy::window_type::window_none,
+                              scratch.data(), scratch.size());
+
+    std::vector<uint16_t> symbols(symbol_count);
+    std::vector<uint8_t> out0(255), out1(255), out2(255);
+    bool ok = true;
+
+    // Rounds: strong packet alone; colliding with a weak one; colliding with
+    // the strong packet sent at 4/5 instead of the configured 4/8; the weak
+    // packet starting a few samples, a fraction of a symbol and whole symbols
+    // late; and a late echo of the strong packet, which must not be reported
+    // twice when it survives the strong packet's cancellation.
+    struct round_cfg {
+        int weak_offset; ///< -1 without a weak packet
+        bool cr45;
+        bool echo;
+    };
+    const round_cfg rounds[] = {
+        {-1, false, false}, {0, false, false}, {0, true, false},  {3, false, false},
+        {40, false, false}, {256, false, false}, {800, false, false}, {-1, false, true},
+    };
+    for (int round = 0; round < static_cast<int>(sizeof(rounds) / sizeof(rounds[0]));
+         ++round) {
+        const round_cfg& rc = rounds[round];
+        const bool collide = rc.weak_offset >= 0;
+        std::vector<std::complex<float>> buf(sample_count);
+        std::normal_distribution<float> noise(0.0f, 0.05f);
+        for (auto& x : buf) x = std::complex<float>(noise(rng), noise(rng));
+        add_packet(rc.cr45 ? &tx_ws : &ws, sf, strong, std::polar(0.8f, 0.7f),
+                   rc.cr45 ? 0.0f : 0.02f, 0, buf);
+        if (collide)
+            add_packet(&ws, sf, weak, std::polar(0.4f, -1.2f), 0.0f,
+                       static_cast<size_t>(rc.weak_offset), buf);
+        if (rc.echo) add_packet(&ws, sf, strong, std::polar(0.4f, 0.3f), 0.0f, 40, buf);
+
+        // Without cancellation only the strong packet comes out.
+        lora_phy::lora_sic sic;
+        lora_phy::lora_sic_packet pkts[3];
+        pkts[0].payload = out0.data();
+        pkts[0].capacity = out0.size();
+        pkts[1].payload = out1.data();
+        pkts[1].capacity = out1.size();
+        pkts[2].payload = out2.data();
+        pkts[2].capacity = out2.size();
+        std::vector<std::complex<float>> copy = buf;
+        size_t n = lora_phy::sic_receive(&sic, &ws, &dws, copy.data(), copy.size(),
+                                         symbols.data(), symbols.size(), pkts, 1);
+        if (n != 1 || pkts[0].length != static_cast<ssize_t>(strong.size()) ||
+            !std::equal(strong.begin(), strong.end(), out0.begin())) {
+            std::cerr << "strong packet not decoded\n";
+            ok = false;
+        }
+
+        n = lora_phy::sic_receive(&sic, &ws, &dws, buf.data(), buf.size(),
+                                  symbols.data(), symbols.size(), pkts, 3);
+        const size_t expected = collide ? 2 : 1;
+        if (n != expected || sic.packets != 1 + expected ||
+            sic.recovered != expected - 1) {
+            std::cerr << "round " << round << ": " << n << " packets, "
+                      << sic.recovered << " recovered\n";
+            ok = false;
+            continue;
+        }
+        if (std::abs(std::abs(pkts[0].amplitude) - 0.8f) > 0.05f) {
+            std::cerr << "replica amplitude " << std::abs(pkts[0].amplitude) << "\n";
+            ok = false;
+        }
+        if (collide && (!pkts[1].cancelled ||
+                        pkts[1].length != static_cast<ssize_t>(weak.size()) ||
+                        !std::equal(weak.begin(), weak.end(), out1.begin()) ||
+                        pkts[1].delay != rc.weak_offset)) {
+            std::cerr << "round " << round << ": weak packet not recovered at "
+                      << rc.weak_offset << " (fitted at " << pkts[1].delay << ")\n";
+            ok = false;
+        }
+    }
+
+    lora_phy::lora_demod_free(&dws);
+    return ok ? 0 : 1;
+}
@@ -0,0 +1,71 @@
+#include <lora_phy/phy.hpp>
+#include <cmath>
+#include <complex>
+#include <cstdint>
+#include <iostream>
+#include <vector>
+
+// Place a modulated frame at an arbitrary sample offset and check that the
+// sliding DFT search recovers that offset exactly, both with the recursive
+// update and when every shift is re-anchored to a full FFT.
+static bool check_offset(unsigned sf, unsigned osr, size_t offset,
+                         unsigned reanchor, float tolerance = 0.0f) {
+    const size_t N = size_t(1) << sf;
+    const size_t step = N * osr;
+    const std::vector<uint16_t> symbols = {3, 77, 12, 100, 5, 64};
+
+    std::vector<std::complex<float>> frame((symbols.size() + 2) * step);
+    lora_phy::lora_modulate(symbols.data(), symbols.size(), frame.data(), sf,
+                            osr, lora_phy::bandwidth::bw_125, 1.0f, 0x12);
+    std::vector<std::complex<float>> iq(offset + frame.size() + step);
+    for (size_t i = 0; i < frame.size(); ++i) iq[offset + i] = frame[i];
+
+    std::vector<std::complex<float>> fft_in(N), fft_out(N * osr), bins(2 * N);
+    lora_phy::lora_workspace ws{};
+    ws.fft_in = fft_in.data();
+    ws.fft_out = fft_out.data();
+    ws.sdft_bins = bins.data();
+    lora_phy::lora_params params{};
+    params.sf = sf;
+    params.osr = osr;
+    if (lora_phy::init(&ws, &params) != 0) return false;
+
+    // Coarse estimate is only known to within a symbol.
+    ws.metrics.time_offset = static_cast<float>(step);
+    if (lora_phy::refine_timing(&ws, iq.data(), iq.size(), 2 * step,
+                                reanchor) != 0)
+        return false;
+    if (std::fabs(ws.metrics.time_offset - static_cast<float>(offset)) >
+        tolerance) {
+        std::cerr << "sf" << sf << " osr" << osr << " reanchor " << reanchor
+                  << ": expected " << offset << " got "
+                  << ws.metrics.time_offset << "\n";
+        return false;
+    }
+    return true;
+}
+
+int sliding_dft_test_main() {
+    bool ok = true;
+    ok = check_offset(7, 1, 37, 64) && ok;
+    ok = check_offset(7, 1, 37, 1) && ok;
+    ok = check_offset(8, 1, 201, 1000) && ok;
+    // Oversampled chirps of non-zero symbols wrap by 2*pi/osr in
+    // lora_modulate() and are not clean base-rate chirps once decimated, so
+    // allow one base-rate sample of slack.
+    ok = check_offset(7, 2, 53, 64, 2.0f) && ok;
+
+    // A buffer shorter than the two sync symbols is rejected.
+    std::vector<std::complex<float>> fft_in(128), fft_out(128), bins(256);
+    std::vector<std::complex<float>> short_iq(200);
+    lora_phy::lora_workspace ws{};
+    ws.fft_in = fft_in.data();
+    ws.fft_out = fft_out.data();
+    ws.sdft_bins = bins.data();
+    lora_phy::lora_params params{};
+    params.sf = 7;
+    lora_phy::init(&ws, &params);
+    ok = ok && lora_phy::refine_timing(&ws, short_iq.data(), short_iq.size(),
+                                       64) == -1;
+    return ok ? 0 : 1;
+}
@@ -0,0 +1,190 @@
+#include "alloc_tracker.h"
+#include <lora_phy/phy.hpp>
+#include <lora_phy/ChirpGenerator.hpp>
+#include "bench_common.h"
+#include "latency_histogram.h"
+#include <algorithm>
+#include <chrono>
+#include <complex>
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <fstream>
+#include <iostream>
+#include <string>
+#include <vector>
+
+#ifdef __linux__
+#include <unistd.h>
+#endif
+
+// Soak: demodulate a continuous synthetic stream for DURATION_S seconds and
+// sample throughput, latency, resident memory, allocations and symbol errors
+// every INTERVAL_S seconds.  The receiver's downchirp comes from genChirp()
+// with one phase accumulator carried across the whole run, so precision loss
+// in it, denormal slow-downs or leaks show up as drift against a baseline
+// taken after warm-up.
+
+using bench::env_count;
+using clock_type = std::chrono::steady_clock;
+
+// Current resident set size in bytes, 0 when unknown.
+static size_t rss_bytes() {
+#ifdef __linux__
+    std::FILE* f = std::fopen("/proc/self/statm", "r");
+    if (!f) return 0;
+    unsigned long pages = 0, resident = 0;
+    const int n = std::fscanf(f, "%lu %lu", &pages, &resident);
+    std::fclose(f);
+    return n == 2 ? static_cast<size_t>(resident) * static_cast<size_t>(sysconf(_SC_PAGESIZE))
+                  : 0;
+#else
+    return 0;
+#endif
+}
+
+template <typename T>
+static T median(std::vector<T> v) {
+    std::sort(v.begin(), v.end());
+    return v[v.size() / 2];
+}
+
+int main() {
+    std::vector<bench::Profile> profiles;
+    if (!bench::load_profiles("tests/profiles.yaml", profiles) || profiles.empty()) {
+        std::cerr << "Failed to load profiles.yaml\n";
+        return 1;
+    }
+    const char* only = std::getenv("PROFILE");
+    const bench::Profile* p = &profiles[0];
+    for (const auto& q : profiles)
+        if (only && q.name == only) p = &q;
+
+    const size_t DURATION_S = env_count("DURATION_S", 3600);
+    const size_t INTERVAL_S = env_count("INTERVAL_S", 60);
+    // Interval 0 warms up and is never judged; the baseline is the median of
+    // the next BASELINE_INTERVALS.  An interval drifts when its throughput or
+    // median latency is DRIFT_PERCENT worse than the baseline, or resident
+    // memory grew by more than RSS_GROWTH_KB, and the soak fails once
+    // DRIFT_INTERVALS consecutive intervals drift, so a single noisy interval
+    // does not.  Allocations and symbol errors fail it in any interval.
+    const size_t BASELINE = env_count("BASELINE_INTERVALS", 3);
+    const size_t SUSTAIN = env_count("DRIFT_INTERVALS", 3);
+    const double DRIFT = static_cast<double>(env_count("DRIFT_PERCENT", 10)) / 100.0;
+    const size_t RSS_GROWTH = env_count("RSS_GROWTH_KB", 1024) * 1024;
+
+    const unsigned sf = p->sf;
+    const size_t N = size_t(1) << sf;
+    const lora_phy::bandwidth bw = static_cast<lora_phy::bandwidth>(p->bw);
+    const float bw_scale = lora_phy::bw_scale(bw);
+
+    // One packet of random symbols per stream position, regenerated from a
+    // fixed seed so the stream never repeats within a run.
+    const size_t symbols = 64;
+    const size_t samples = (symbols + 2) * N;
+    std::vector<uint16_t> tx(symbols), rx(symbols);
+    std::vector<std::complex<float>> iq(samples), scratch(samples);
+    lora_phy::lora_demod_workspace* ws = new lora_phy::lora_demod_workspace();
+    lora_phy::lora_demod_init(ws, sf, lora_phy::window_type::window_none, scratch.data(),
+                              scratch.size());
+    latency_histogram::Histogram latency;
+
+    const std::string run_id = bench::run_id();
+    std::system("mkdir -p logs");
+    std::ofstream csv("logs/soak_" + run_id + ".csv");
+    csv << "run_id,profile,interval,elapsed_s,packets,pps,lat_p50_ns,lat_p99_ns,lat_max_ns,"
+           "rss_bytes,allocations,symbol_errors,phase_accum,drift,drift_streak,failed\n";
+
+    uint32_t lfsr = 0x1234567u;
+    float phase = 0.0f;  // receiver downchirp phase, never reset
+    std::vector<double> base_pps;
+    std::vector<uint64_t> base_p50;
+    std::vector<size_t> base_rss;
+    base_pps.reserve(BASELINE);
+    base_p50.reserve(BASELINE);
+    base_rss.reserve(BASELINE);
+    size_t streak = 0;
+    size_t flagged = 0;
+    const auto run_start = clock_type::now();
+    for (size_t interval = 0;; ++interval) {
+        const auto start = clock_type::now();
+        if (start - run_start >= std::chrono::seconds(DURATION_S)) break;
+        const auto end = start + std::chrono::seconds(INTERVAL_S);
+        latency.reset();
+        size_t packets = 0;
+        size_t errors = 0;
+        double busy = 0.0;
+        const size_t allocs = alloc_tracker::get();
+        while (clock_type::now() < end) {
+            for (size_t s = 0; s < symbols; ++s) {
+                lfsr = lfsr * 1664525u + 1013904223u;
+                tx[s] = static_cast<uint16_t>((lfsr >> 16) & (N - 1));
+            }
+            lora_phy::lora_modulate(tx.data(), symbols, iq.data(), sf, 1, bw, 1.0f, 0x12);
+            const auto p_start = clock_type::now();
+            for (size_t s = 0; s < symbols + 2; ++s) {
+                // Dechirp in place with a freshly generated downchirp.
+                std::complex<float>* sym = &iq[s * N];
+                std::complex<float>* down = &scratch[s * N];
+                genChirp(down, static_cast<int>(N), 1, static_cast<int>(N), 0.0f, true, 1.0f,
+                         phase, bw_scale);
+                for (size_t i = 0; i < N; ++i) sym[i] *= down[i];
+            }
+            const size_t got = lora_phy::lora_demodulate(ws, iq.data(), samples, rx.data(), 1);
+            const auto elapsed = clock_type::now() - p_start;
+            busy += std::chrono::duration<double>(elapsed).count();
+            latency.record(static_cast<uint64_t>(
+                std::chrono::duration_cast<std::chrono::nanoseconds>(elapsed).count()));
+            for (size_t s = 0; s < symbols; ++s) errors += s >= got || rx[s] != tx[s];
+            ++packets;
+        }
+        const size_t interval_allocs = alloc_tracker::get() - allocs;
+        const size_t rss = rss_bytes();
+        const double pps = static_cast<double>(packets) / busy;
+        const uint64_t p50 = latency.percentile(50.0);
+        std::string drift;
+        if (interval == 0) {
+            drift = "warmup;";
+        } else if (interval <= BASELINE) {
+            base_pps.push_back(pps);
+            base_p50.push_back(p50);
+            base_rss.push_back(rss);
+            drift = "baseline;";
+        } else {
+            if (pps < median(base_pps) * (1.0 - DRIFT)) drift += "throughput;";
+            if (static_cast<double>(p50) > static_cast<double>(median(base_p50)) * (1.0 + DRIFT))
+                drift += "latency;";
+            if (rss > median(base_rss) + RSS_GROWTH) drift += "rss;";
+            streak = drift.empty() ? 0 : streak + 1;
+        }
+        if (interval_allocs) drift += "allocations;";
+        if (errors) drift += "symbol_errors;";
+        if (!drift.empty()) drift.pop_back();
+        const bool failed = streak >= SUSTAIN || interval_allocs || errors;
+        if (failed) ++flagged;
+
+        const double elapsed_s =
+            std::chrono::duration<double>(clock_type::now() - run_start).count();
+        csv << run_id << ',' << p->name << ',' << interval << ',' << elapsed_s << ','
+            << packets << ',' << pps << ',' << p50 << ',' << latency.percentile(99.0) << ','
+            << latency.max() << ',' << rss << ',' << interval_allocs << ',' << errors << ','
+            << phase << ',' << drift << ',' << streak << ',' << failed << std::endl;
+        std::cout << '[' << run_id << "] " << p->name << " t=" << elapsed_s << "s: " << pps
+                  << " pps, p50 " << p50 / 1000.0 << " us, p99 "
+                  << latency.percentile(99.0) / 1000.0 << " us, rss " << rss / 1024
+                  << " KiB, " << interval_allocs << " allocations, " << errors
+                  << " symbol errors" << (drift.empty() ? "" : ", ") << drift
+                  << (failed ? " (FAILED)" : "") << std::endl;
+    }
+
+    lora_phy::lora_demod_free(ws);
+    delete ws;
+    if (base_rss.size() < BASELINE)
+        std::cout << "run too short for a baseline; drift was not checked\n";
+    if (flagged) {
+        std::cout << flagged << " interval(s) failed: sustained drift from the baseline, "
+                     "allocations or symbol errors\n";
+        return 1;
+    }
+    return 0;
+}
@@ -0,0 +1,192 @@
+#include <lora_phy/phy.hpp>
+#include <lora_phy/LoRaCodes.hpp>
+#include <algorithm>
+#include <complex>
+#include <cstdint>
+#include <iostream>
+#include <random>
+#include <vector>
+
+// Brute force max-log LLRs: one pass over all bins per bit.
+static void reference_llrs(const std::vector<std::complex<float>>& bins,
+                           unsigned sf, float* llrs) {
+    for (unsigned b = 0; b < sf; ++b) {
+        float max0 = 0.0f, max1 = 0.0f;
+        for (size_t k = 0; k < bins.size(); ++k) {
+            float m = std::abs(bins[k]);
+            if ((binaryToGray16(static_cast<uint16_t>(k)) >> b) & 1)
+                max1 = std::max(max1, m);
+            else
+                max0 = std::max(max0, m);
+        }
+        llrs[b] = max0 - max1;
+    }
+}
+
+// FFT bins of a symbol at @p idx with complex Gaussian noise.
+static void noisy_bins(std::vector<std::complex<float>>& bins, size_t idx,
+                       float amplitude, float sigma, std::mt19937& rng) {
+    std::normal_distribution<float> n(0.0f, sigma);
+    for (auto& b : bins) b = std::complex<float>(n(rng), n(rng));
+    bins[idx] += std::complex<float>(amplitude, 0.0f);
+}
+
+static bool check_llrs() {
+    std::mt19937 rng(5);
+    std::normal_distribution<float> n(0.0f, 1.0f);
+    for (unsigned sf = 7; sf <= 12; ++sf) {
+        std::vector<std::complex<float>> bins(size_t(1) << sf);
+        std::vector<float> scratch(bins.size());
+        for (int trial = 0; trial < 8; ++trial) {
+            for (auto& b : bins) b = std::complex<float>(n(rng), n(rng));
+            float got[12], ref[12];
+            lora_phy::symbol_llrs(bins.data(), sf, got, scratch.data());
+            reference_llrs(bins, sf, ref);
+            for (unsigned b = 0; b < sf; ++b) {
+                if (std::abs(got[b] - ref[b]) > 1e-4f) {
+                    std::cerr << "sf" << sf << " bit " << b << " llr " << got[b]
+                              << " expected " << ref[b] << "\n";
+                    return false;
+                }
+            }
+        }
+    }
+    return true;
+}
+
+// Clean LLRs decode to the sent nibble, and a single weak wrong bit is
+// repaired for every code, including the parity codes the hard decoder can
+// only flag.
+static bool check_fec_soft() {
+    for (unsigned rdd = 0; rdd <= 4; ++rdd) {
+        const unsigned bits = 4 + rdd;
+        for (unsigned x = 0; x < 16; ++x) {
+            uint8_t cw = fecEncodeTable[rdd][x];
+            float llrs[8];
+            for (unsigned i = 0; i < bits; ++i) llrs[i] = (cw >> i) & 1 ? -4.0f : 4.0f;
+            uint8_t out = 0xff;
+            lora_phy::lora_fec_stats stats;
+            lora_phy::fec_decode_soft(llrs, 1, &out, rdd, &stats);
+            if (out != x || stats.corrected != 0) return false;
+            if (rdd == 0) continue;
+            for (unsigned i = 0; i < bits; ++i) {
+                float flipped[8];
+                std::copy(llrs, llrs + bits, flipped);
+                flipped[i] = -0.5f * flipped[i];
+                lora_phy::fec_decode_soft(flipped, 1, &out, rdd, &stats);
+                if (out != x) {
+                    std::cerr << "rdd " << rdd << " nibble " << x << " bit " << i
+                              << " not repaired\n";
+                    return false;
+                }
+            }
+            if (stats.corrected != bits) return false;
+        }
+    }
+    return true;
+}
+
+// Encode frames, turn the symbols into noisy FFT bins and decode them both
+// from argmax decisions and from LLRs.  Noise-free frames must come back
+// exactly; under noise the soft path must recover more packets.
+static bool check_chain() {
+    const unsigned sf = 7;
+    const size_t N = size_t(1) << sf;
+    std::vector<std::complex<float>> fft_in(N), fft_out(N);
+    lora_phy::lora_workspace ws{};
+    ws.fft_in = fft_in.data();
+    ws.fft_out = fft_out.data();
+    std::mt19937 rng(17);
+    std::vector<std::complex<float>> bins(N);
+    std::vector<float> scratch(N);
+    bool ok = true;
+    for (unsigned cr = 1; cr <= 4; ++cr) {
+        lora_phy::lora_params p{};
+        p.sf = sf;
+        p.cr = cr;
+        p.explicit_header = true;
+        p.crc = true;
+        lora_phy::init(&ws, &p);
+        const size_t len = 16;
+        std::vector<uint16_t> syms(lora_phy::encoded_symbol_count(&ws, len));
+        std::vector<uint16_t> hard(syms.size());
+        std::vector<float> llrs(syms.size() * sf);
+        std::vector<uint8_t> payload(len), out(len);
+        int hard_ok = 0, soft_ok = 0;
+        for (int trial = 0; trial < 200; ++trial) {
+            for (auto& b : payload) b = static_cast<uint8_t>(rng());
+            lora_phy::encode(&ws, payload.data(), len, syms.data(), syms.size());
+            const float sigma = trial == 0 ? 0.0f : 0.6f;
+            for (size_t s = 0; s < syms.size(); ++s) {
+                noisy_bins(bins, syms[s], 3.0f, sigma, rng);
+                size_t best = 0;
+                for (size_t k = 1; k < N; ++k)
+                    if (std::norm(bins[k]) > std::norm(bins[best])) best = k;
+                hard[s] = static_cast<uint16_t>(best);
+                lora_phy::symbol_llrs(bins.data(), sf, llrs.data() + s * sf,
+                                      scratch.data());
+            }
+            bool h = lora_phy::decode(&ws, hard.data(), hard.size(), out.data(),
+                                      out.size()) == static_cast<ssize_t>(len) &&
+                     ws.metrics.crc_ok && out == payload;
+            bool sd = lora_phy::decode_soft(&ws, llrs.data(), syms.size(), out.data(),
+                                            out.size()) == static_cast<ssize_t>(len) &&
+                      ws.metrics.crc_ok && out == payload;
+            if (trial == 0 && !(h && sd && ws.metrics.fec_corrected == 0)) {
+                std::cerr << "cr" << cr << " noise-free decode failed\n";
+                ok = false;
+            }
+            hard_ok += h;
+            soft_ok += sd;
+        }
+        if (soft_ok <= hard_ok) {
+            std::cerr << "cr" << cr << " soft " << soft_ok << " <= hard " << hard_ok
+                      << "\n";
+            ok = false;
+        }
+    }
+    return ok;
+}
+
+// demodulate_soft() sees the same bins as demodulate(), so the LLR signs
+// must reproduce the Gray label of every hard decision.
+static bool check_demodulate_soft() {
+    const unsigned sf = 8;
+    const size_t N = size_t(1) << sf;
+    std::vector<std::complex<float>> fft_in(N), fft_out(N);
+    lora_phy::lora_workspace ws{};
+    ws.fft_in = fft_in.data();
+    ws.fft_out = fft_out.data();
+    lora_phy::lora_params p{};
+    p.sf = sf;
+    lora_phy::init(&ws, &p);
+    std::mt19937 rng(3);
+    std::vector<uint16_t> syms(12);
+    for (auto& s : syms) s = static_cast<uint16_t>(rng() % N);
+    std::vector<std::complex<float>> iq((syms.size() + 2) * N);
+    lora_phy::modulate(&ws, syms.data(), syms.size(), iq.data(), iq.size());
+    std::vector<uint16_t> hard(syms.size());
+    std::vector<float> llrs(syms.size() * sf);
+    ssize_t n = lora_phy::demodulate(&ws, iq.data(), iq.size(), hard.data(), hard.size());
+    ssize_t m = lora_phy::demodulate_soft(&ws, iq.data(), iq.size(), llrs.data(),
+                                          syms.size());
+    if (n < 0 || n != m) return false;
+    for (ssize_t s = 0; s < n; ++s) {
+        uint16_t g = binaryToGray16(hard[s]);
+        for (unsigned b = 0; b < sf; ++b)
+            if (((g >> b) & 1) != (llrs[s * sf + b] < 0.0f)) return false;
+    }
+    return true;
+}
+
+int soft_decode_test_main() {
+    bool ok = true;
+    if (!check_llrs()) ok = false;
+    if (!check_fec_soft()) ok = false;
+    if (!check_chain()) ok = false;
+    if (!check_demodulate_soft()) {
+        std::cerr << "demodulate_soft disagrees with demodulate\n";
+        ok = false;
+    }
+    return ok ? 0 : 1;
+}
@@ -0,0 +1,71 @@
+#include <lora_phy/phy.hpp>
+#include <lora_phy/ChirpGenerator.hpp>
+#include <complex>
+#include <cstdint>
+#include <iostream>
+#include <vector>
+
+// Fake counter source: every read advances counter k by k + 1.
+static void fake_counters(void* ctx, uint64_t* values) {
+    uint64_t* reads = static_cast<uint64_t*>(ctx);
+    ++*reads;
+    for (size_t k = 0; k < lora_phy::LORA_STAGE_COUNTERS; ++k)
+        values[k] = *reads * (k + 1);
+}
+
+// The stage hooks only record when built with LORA_PHY_STAGE_TIMERS; either
+// way they must not change the demodulated symbols.
+int stage_timers_test_main() {
+    const unsigned sf = 7;
+    const size_t N = size_t(1) << sf;
+    const std::vector<uint16_t> tx = {3, 90, 17, 127, 0, 64};
+    std::vector<std::complex<float>> samples((tx.size() + 2) * N);
+    lora_phy::lora_modulate(tx.data(), tx.size(), samples.data(), sf, 1,
+                            lora_phy::bandwidth::bw_125, 1.0f, 0x12);
+    std::vector<std::complex<float>> down(N);
+    float phase = 0.0f;
+    genChirp(down.data(), static_cast<int>(N), 1, static_cast<int>(N), 0.0f, true, 1.0f,
+             phase, 1.0f);
+    for (size_t i = 0; i < samples.size(); ++i) samples[i] *= down[i % N];
+
+    std::vector<std::complex<float>> scratch(samples.size());
+    lora_phy::lora_demod_workspace ws{};
+    lora_phy::lora_demod_init(&ws, sf, lora_phy::window_type::window_none,
+                              scratch.data(), scratch.size());
+    lora_phy::lora_stage_times times;
+    uint64_t reads = 0;
+    times.read_counters = &fake_counters;
+    times.counter_ctx = &reads;
+    ws.stage_times = &times;
+
+    std::vector<uint16_t> rx(tx.size());
+    bool ok = lora_phy::lora_demodulate(&ws, samples.data(), samples.size(), rx.data(), 1) ==
+                  tx.size() &&
+              rx == tx;
+
+    const size_t symbols = tx.size() + 2;
+    const size_t cfo = static_cast<size_t>(lora_phy::demod_stage::cfo);
+    const size_t fft = static_cast<size_t>(lora_phy::demod_stage::fft);
+    const size_t argmax = static_cast<size_t>(lora_phy::demod_stage::argmax);
+    if (lora_phy::LORA_STAGE_TIMERS) {
+        // Two reads per timed region; each region sees counter k advance by
+        // k + 1 between them.
+        uint64_t calls = 0;
+        for (size_t s = 0; s < static_cast<size_t>(lora_phy::demod_stage::count); ++s) {
+            calls += times.calls[s];
+            for (size_t k = 0; k < lora_phy::LORA_STAGE_COUNTERS; ++k)
+                if (times.counters[s][k] != times.calls[s] * (k + 1)) ok = false;
+        }
+        if (times.calls[cfo] != symbols || times.calls[fft] != symbols ||
+            times.calls[argmax] + 2 < symbols || reads != 2 * calls) {
+            std::cerr << "stage calls " << times.calls[cfo] << " " << times.calls[fft]
+                      << " " << times.calls[argmax] << "\n";
+            ok = false;
+        }
+    } else if (reads != 0 || times.calls[cfo] != 0) {
+        ok = false;
+    }
+
+    lora_phy::lora_demod_free(&ws);
+    return ok ? 0 : 1;
+}
@@ -0,0 +1,126 @@
+#include <lora_phy/phy.hpp>
+#include <complex>
+#include <cstdint>
+#include <cstdio>
+#include <fstream>
+#include <iostream>
+#include <memory>
+#include <string>
+#include <vector>
+
+#include <unistd.h>
+
+// Demodulate a short frame and return the symbols, letting init() pick up
+// tables from @p cache when given.
+static std::vector<uint16_t> run(lora_phy::lora_params p,
+                                 const lora_phy::lora_table_cache* cache) {
+    const size_t N = size_t(1) << p.sf;
+    const std::vector<uint16_t> tx = {5, 60, static_cast<uint16_t>(N - 1)};
+    std::vector<std::complex<float>> fft_in(N), fft_out(N * p.osr);
+    std::vector<std::complex<float>> iq((tx.size() + 2) * N * p.osr);
+    std::vector<float> window(N);
+    lora_phy::lora_workspace ws{};
+    ws.fft_in = fft_in.data();
+    ws.fft_out = fft_out.data();
+    ws.window = window.data();
+    p.cache = cache;
+    std::vector<uint16_t> out(tx.size());
+    if (lora_phy::init(&ws, &p) != 0) return {};
+    lora_phy::modulate(&ws, tx.data(), tx.size(), iq.data(), iq.size());
+    lora_phy::demodulate(&ws, iq.data(), iq.size(), out.data(), out.size());
+    return out;
+}
+
+static bool write_bytes(const std::string& path, const std::vector<char>& data) {
+    std::ofstream f(path, std::ios::binary);
+    f.write(data.data(), static_cast<std::streamsize>(data.size()));
+    return static_cast<bool>(f);
+}
+
+int table_cache_test_main() {
+    const std::string path =
+        "/tmp/lora_table_cache_test_" + std::to_string(::getpid()) + ".bin";
+    std::vector<lora_phy::lora_params> cfgs(3);
+    cfgs[0].sf = 7;
+    cfgs[1].sf = 8;
+    cfgs[2].sf = 9;
+    cfgs[2].bw = lora_phy::bandwidth::bw_250;
+    cfgs[2].window = lora_phy::window_type::window_hann;
+
+    std::unique_ptr<lora_phy::lora_profile_tables> scratch(
+        new lora_phy::lora_profile_tables);
+    std::unique_ptr<lora_phy::lora_profile_tables> entry(
+        new lora_phy::lora_profile_tables);
+    if (lora_phy::table_cache_write(path.c_str(), cfgs.data(), cfgs.size(),
+                                    scratch.get()) != 0) {
+        std::cerr << "table_cache_write failed\n";
+        return 1;
+    }
+
+    bool ok = true;
+    lora_phy::lora_table_cache cache;
+    ok = ok && lora_phy::table_cache_open(&cache, path.c_str()) == 0;
+    ok = ok && cache.count == cfgs.size();
+
+    // Cached entries match freshly computed tables and give the same output.
+    for (size_t i = 0; ok && i < cfgs.size(); ++i) {
+        ok = lora_phy::table_cache_find(&cache, &cfgs[i], entry.get()) == 0;
+        lora_phy::init_profile(scratch.get(), &cfgs[i]);
+        const size_t N = size_t(1) << cfgs[i].sf;
+        ok = ok && entry->params.sf == cfgs[i].sf &&
+             entry->plan_fwd.nfft == static_cast<int>(N) &&
+             entry->plan_inv.inverse && entry->plan_fwd.stages == scratch->plan_fwd.stages &&
+             entry->plan_fwd.stageRadix[0] == scratch->plan_fwd.stageRadix[0];
+        for (size_t k = 0; ok && k < N; ++k)
+            ok = entry->plan_fwd.twiddles[k] == scratch->plan_fwd.twiddles[k] &&
+                 entry->plan_inv.twiddles[k] == scratch->plan_inv.twiddles[k] &&
+                 entry->window[k] == scratch->window[k] &&
+                 entry->downchirp[k] == scratch->downchirp[k];
+
+        std::vector<uint16_t> cached = run(cfgs[i], &cache);
+        std::vector<uint16_t> computed = run(cfgs[i], nullptr);
+        ok = ok && !cached.empty() && cached == computed;
+    }
+
+    // Parameters outside the cache fall back to computing the tables.
+    lora_phy::lora_params other{};
+    other.sf = 10;
+    ok = ok && lora_phy::table_cache_find(&cache, &other, entry.get()) == -1;
+    ok = ok && !run(other, &cache).empty();
+    lora_phy::table_cache_close(&cache);
+    ok = ok && cache.map == nullptr && cache.count == 0;
+
+    // Stale versions and truncated files are rejected at open; a corrupt
+    // entry only fails when it is looked up and init() then computes its
+    // tables instead.
+    std::vector<char> bytes;
+    {
+        std::ifstream f(path, std::ios::binary);
+        bytes.assign(std::istreambuf_iterator<char>(f),
+                     std::istreambuf_iterator<char>());
+    }
+    std::vector<char> corrupt = bytes;
+    corrupt[corrupt.size() - 1] ^= 0x01; // last entry
+    ok = ok && write_bytes(path, corrupt) &&
+         lora_phy::table_cache_open(&cache, path.c_str()) == 0;
+    ok = ok && lora_phy::table_cache_find(&cache, &cfgs[0], entry.get()) == 0 &&
+         lora_phy::table_cache_find(&cache, &cfgs[2], entry.get()) == -1;
+    ok = ok && run(cfgs[2], &cache) == run(cfgs[2], nullptr);
+    lora_phy::table_cache_close(&cache);
+    std::vector<char> index = bytes;
+    index[64] ^= 0x01; // first index record
+    ok = ok && write_bytes(path, index) &&
+         lora_phy::table_cache_open(&cache, path.c_str()) == -1;
+    std::vector<char> stale = bytes;
+    stale[8] = static_cast<char>(stale[8] + 1); // version field
+    ok = ok && write_bytes(path, stale) &&
+         lora_phy::table_cache_open(&cache, path.c_str()) == -1;
+    std::vector<char> truncated(bytes.begin(), bytes.end() - 16);
+    ok = ok && write_bytes(path, truncated) &&
+         lora_phy::table_cache_open(&cache, path.c_str()) == -1;
+    std::remove(path.c_str());
+    ok = ok && lora_phy::table_cache_open(&cache, path.c_str()) == -1;
+
+    if (!ok) std::cerr << "table cache check failed\n";
+    return ok ? 0 : 1;
+}
@@ -4,6 +4,23 @@ int bit_exact_test_main();
 int e2e_chain_test_main();
 int no_alloc_test_main();
 int gr_lora_sdr_interop_main();
+int sliding_dft_test_main();
+int goertzel_verify_test_main();
+int preamble_search_test_main();
+int profile_switch_test_main();
+int table_cache_test_main();
+int fec_lut_test_main();
+int interleaver_test_main();
+int whitening_test_main();
+int crc_test_main();
+int tx_chain_test_main();
+int rx_chain_test_main();
+int soft_decode_test_main();
+int mrc_test_main();
+int sic_test_main();
+int autotune_test_main();
+int latency_histogram_test_main();
+int stage_timers_test_main();
 
 int main() {
     int result = 0;
@@ -20,6 +37,57 @@ int main() {
     r = gr_lora_sdr_interop_main();
     result |= r;
     if (r) std::printf("gr_lora_sdr_interop_test failed\n");
+    r = sliding_dft_test_main();
+    result |= r;
+    if (r) std::printf("sliding_dft_test failed\n");
+    r = goertzel_verify_test_main();
+    result |= r;
+    if (r) std::printf("goertzel_verify_test failed\n");
+    r = preamble_search_test_main();
+    result |= r;
+    if (r) std::printf("preamble_search_test failed\n");
+    r = profile_switch_test_main();
+    result |= r;
+    if (r) std::printf("profile_switch_test failed\n");
+    r = table_cache_test_main();
+    result |= r;
+    if (r) std::printf("table_cache_test failed\n");
+    r = fec_lut_test_main();
+    result |= r;
+    if (r) std::printf("fec_lut_test failed\n");
+    r = interleaver_test_main();
+    result |= r;
+    if (r) std::printf("interleaver_test failed\n");
+    r = whitening_test_main();
+    result |= r;
+    if (r) std::printf("whitening_test failed\n");
+    r = crc_test_main();
+    result |= r;
+    if (r) std::printf("crc_test failed\n");
+    r = tx_chain_test_main();
+    result |= r;
+    if (r) std::printf("tx_chain_test failed\n");
+    r = rx_chain_test_main();
+    result |= r;
+    if (r) std::printf("rx_chain_test failed\n");
+    r = soft_decode_test_main();
+    result |= r;
+    if (r) std::printf("soft_decode_test failed\n");
+    r = mrc_test_main();
+    result |= r;
+    if (r) std::printf("mrc_test failed\n");
+    r = sic_test_main();
+    result |= r;
+    if (r) std::printf("sic_test failed\n");
+    r = autotune_test_main();
+    result |= r;
+    if (r) std::printf("autotune_test failed\n");
+    r = latency_histogram_test_main();
+    result |= r;
+    if (r) std::printf("latency_histogram_test failed\n");
+    r = stage_timers_test_main();
+    result |= r;
+    if (r) std::printf("stage_timers_test failed\n");
     if (result != 0) {
         std::printf("Some tests failed\n");
     }
@@ -1,5 +1,8 @@
 #include <lora_phy/LoRaCodes.hpp>
+#include <lora_phy/phy.hpp>
 #include <cstdint>
+#include <iostream>
+#include <random>
 #include <string>
 #include <vector>
 
@@ -25,6 +28,52 @@ static std::vector<uint8_t> decode_base64(const std::string& in) {
     return out;
 }
 
+// The precomputed sequences must match the reference generators for every
+// RDD, a spread of bit offsets and lengths that straddle the 8-byte XOR.
+static bool check_tables() {
+    std::mt19937 rng(7);
+    std::vector<uint8_t> data(600);
+    for (auto& b : data) b = static_cast<uint8_t>(rng());
+    for (unsigned rdd = 1; rdd <= 4; ++rdd) {
+        for (unsigned ofs : {0u, 1u, 2u, 7u, 64u, 255u, 509u}) {
+            for (size_t len : {size_t(0), size_t(1), size_t(7), size_t(8),
+                               size_t(13), size_t(257), size_t(600)}) {
+                std::vector<uint8_t> ref(data.begin(), data.begin() + len);
+                std::vector<uint8_t> fast = ref;
+                Sx1272ComputeWhiteningLfsr(ref.data(), static_cast<uint16_t>(len),
+                                           static_cast<int>(ofs), rdd);
+                lora_phy::whiten_lfsr(fast.data(), len, ofs, rdd);
+                if (ref != fast) {
+                    std::cerr << "lfsr whitening rdd " << rdd << " ofs " << ofs
+                              << " len " << len << "\n";
+                    return false;
+                }
+                ref.assign(data.begin(), data.begin() + len);
+                fast = ref;
+                Sx1272ComputeWhitening(ref.data(), static_cast<uint16_t>(len),
+                                       static_cast<int>(ofs), static_cast<int>(rdd));
+                lora_phy::whiten_sx1272(fast.data(), len, ofs, rdd);
+                if (ref != fast) {
+                    std::cerr << "sx1272 whitening rdd " << rdd << " ofs " << ofs
+                              << " len " << len << "\n";
+                    return false;
+                }
+            }
+        }
+    }
+    for (size_t len : {size_t(0), size_t(5), size_t(511), size_t(600)}) {
+        std::vector<uint8_t> ref(data.begin(), data.begin() + len);
+        std::vector<uint8_t> fast = ref;
+        SX1232RadioComputeWhitening(ref.data(), static_cast<uint16_t>(len));
+        lora_phy::whiten_sx1232(fast.data(), len);
+        if (ref != fast) {
+            std::cerr << "sx1232 whitening len " << len << "\n";
+            return false;
+        }
+    }
+    return true;
+}
+
 int whitening_test_main() {
     // Payload+CRC (little endian) and whitening reference encoded in base64
     const std::string plain_b64 = "3q2+73AN"; // DE AD BE EF 70 0D
@@ -42,6 +91,12 @@ int whitening_test_main() {
     Sx1272ComputeWhiteningLfsr(tmp.data(), tmp.size(), 0, 4);
     ok = ok && (tmp == plain);
 
+    // Same vector through the precomputed sequence
+    std::vector<uint8_t> fast = plain;
+    lora_phy::whiten_lfsr(fast.data(), fast.size(), 0, 4);
+    ok = ok && (fast == expected_whiten);
+    ok = check_tables() && ok;
+
     // CRC check on de-whitened data
     uint16_t crc_calc = sx1272DataChecksum(tmp.data(), tmp.size() - 2);
     uint16_t crc_buf = static_cast<uint16_t>(tmp[tmp.size() - 2]) |